@@ -99,6 +99,11 @@ parser.add_argument(
     "--ssl", nargs=2, help="Use SSL with <CERT_FILE <KEY_FILE>", default=None
 )
 parser.add_argument("--log-level", default="DEBUG", help="Set logging level")
+parser.add_argument(
+    "--count-profile-reads",
+    action="store_true",
+    help="Report most frequently read profile settings on shutdown",
+)
 
 args = parser.parse_args()
 
@@ -144,6 +149,9 @@ async def start_rhasspy() -> None:
         args.profile, system_profiles_dir, user_profiles_dir, actor_system=system
     )
 
+    if args.count_profile_reads:
+        core.profile.count_reads()
+
     # Set environment variables
     os.environ["RHASSPY_BASE_DIR"] = os.getcwd()
     os.environ["RHASSPY_PROFILE"] = core.profile.name
@@ -270,11 +270,14 @@ cp -R "${opengrm_dir}"/build/lib/*.so* "${venv}/lib/"
 
 if [[ ! -d "${phonetisaurus_dir}/build" ]]; then
     echo "Installing phonetisaurus (${phonetisaurus_file})"
+    pip3 install pybindgen
     tar -C "${build_dir}" -xf "${phonetisaurus_file}" && \
         cd "${phonetisaurus_dir}" && \
+        PYTHON="${venv}/bin/python3" \
         ./configure "--prefix=${phonetisaurus_dir}/build" \
                     --with-openfst-includes="${venv}/include" \
-                    --with-openfst-libs="${venv}/lib" && \
+                    --with-openfst-libs="${venv}/lib" \
+                    --enable-python && \
         make -j "${make_threads}" && \
         make install
 fi
@@ -282,6 +285,13 @@ fi
 # Copy build artifacts into virtual environment
 cp -R "${phonetisaurus_dir}"/build/bin/* "${venv}/bin/"
 
+# Python bindings keep the g2p model loaded (rhasspy.g2p)
+if [[ -f "${phonetisaurus_dir}/.libs/Phonetisaurus.so" ]]; then
+    cp "${phonetisaurus_dir}/.libs/Phonetisaurus.so" "${phonetisaurus_dir}/python/"
+    cd "${phonetisaurus_dir}/python" && \
+        python3 setup.py install
+fi
+
 # -----------------------------------------------------------------------------
 # kaldi
 # https://kaldi-asr.org
@@ -1,7 +1,6 @@
 """Rhasspy command-line interface"""
 import argparse
 import asyncio
-import io
 import json
 import logging
 # Configure logging
@@ -11,12 +10,12 @@ import sys
 import threading
 import time
 import wave
-from typing import Any
+from typing import Any, Iterable, List
 
 from rhasspy.audio_recorder import AudioData
 from rhasspy.core import RhasspyCore
 from rhasspy.profiles import Profile
-from rhasspy.utils import buffer_to_wav
+from rhasspy.utils import buffer_to_wav, make_wav_header
 from rhasspy.wake import WakeWordDetected
 
 logger = logging.getLogger("rhasspy")
@@ -189,6 +188,12 @@ async def main() -> None:
         default=0.01,
         help="Seconds to wait before sending next chunk (default=0.01)",
     )
+    wav2mqtt_parser.add_argument(
+        "--batch",
+        type=int,
+        default=1,
+        help="Audio frame WAVs to send in each MQTT message (default=1)",
+    )
 
     # text2wav
     text2wav_parser = sub_parsers.add_parser(
@@ -534,26 +539,65 @@ async def word2wav(core: RhasspyCore, profile: Profile, args: Any) -> None:
 # -----------------------------------------------------------------------------
 
 
-def _send_frame(
+def _send_frames(
     core: RhasspyCore,
     topic: str,
-    audio_data: bytes,
+    chunks: Iterable[bytes],
     rate: int,
     width: int,
     channels: int,
+    batch: int = 1,
+    pause: float = 0,
 ) -> None:
-    """Send a single audio frame via MQTT"""
-    with io.BytesIO() as mqtt_buffer:
-        mqtt_file: wave.Wave_write = wave.open(mqtt_buffer, mode="wb")
-        with mqtt_file:
-            mqtt_file.setframerate(rate)
-            mqtt_file.setsampwidth(width)
-            mqtt_file.setnchannels(channels)
-            mqtt_file.writeframes(audio_data)
-
-        # Send audio frame WAV
-        mqtt_payload = mqtt_buffer.getvalue()
-        core.mqtt_publish(topic, mqtt_payload)
+    """Send audio chunks via MQTT, several WAV frames per message"""
+    frames: List[bytes] = []
+    for audio_data in chunks:
+        frames.append(make_wav_header(len(audio_data), rate, width, channels))
+        frames.append(audio_data)
+
+        if len(frames) >= (2 * batch):
+            # Send batch of audio frame WAVs
+            core.mqtt_publish(topic, b"".join(frames))
+            frames.clear()
+            time.sleep(pause * batch)
+
+    if frames:
+        # Send partial batch
+        core.mqtt_publish(topic, b"".join(frames))
+        time.sleep(pause * (len(frames) // 2))
+
+
+def _read_chunks(wav_file: wave.Wave_read, args: Any) -> Iterable[bytes]:
+    """Split WAV audio into chunks with optional silence before and after"""
+    if args.frames <= 0:
+        # Send all at once
+        yield wav_file.readframes(wav_file.getnframes())
+        return
+
+    rate = wav_file.getframerate()
+    width = wav_file.getsampwidth()
+    channels = wav_file.getnchannels()
+    chunk_size = args.frames * width * channels
+
+    if args.silence_before > 0:
+        # Silence
+        num_chunks = int((args.silence_before * rate * width * channels) / chunk_size)
+        for _ in range(num_chunks):
+            yield bytes(chunk_size)
+
+    # Read actual audio data
+    audio_data = wav_file.readframes(args.frames)
+    while audio_data:
+        yield audio_data
+
+        # Read next chunk
+        audio_data = wav_file.readframes(args.frames)
+
+    if args.silence_after > 0:
+        # Silence
+        num_chunks = int((args.silence_after * rate * width * channels) / chunk_size)
+        for _ in range(num_chunks):
+            yield bytes(chunk_size)
 
 
 async def wav2mqtt(core: RhasspyCore, profile: Profile, args: Any) -> None:
@@ -565,48 +609,16 @@ async def wav2mqtt(core: RhasspyCore, profile: Profile, args: Any) -> None:
         # Read WAV paths from argument list
         for wav_path in args.wav_files:
             with wave.open(wav_path, "rb") as wav_file:
-                rate = wav_file.getframerate()
-                width = wav_file.getsampwidth()
-                channels = wav_file.getnchannels()
-
-                if args.frames > 0:
-                    # Split into chunks
-                    chunk_size = args.frames * width * channels
-                    if args.silence_before > 0:
-                        # Silence
-                        num_chunks = int(
-                            (args.silence_before * rate * width * channels) / chunk_size
-                        )
-                        for _ in range(num_chunks):
-                            _send_frame(
-                                core, topic, bytes(chunk_size), rate, width, channels
-                            )
-                            time.sleep(args.pause)
-
-                    # Read actual audio data
-                    audio_data = wav_file.readframes(args.frames)
-
-                    while audio_data:
-                        _send_frame(core, topic, audio_data, rate, width, channels)
-                        time.sleep(args.pause)
-
-                        # Read next chunk
-                        audio_data = wav_file.readframes(args.frames)
-
-                    if args.silence_after > 0:
-                        # Silence
-                        num_chunks = int(
-                            (args.silence_after * rate * width * channels) / chunk_size
-                        )
-                        for _ in range(num_chunks):
-                            _send_frame(
-                                core, topic, bytes(chunk_size), rate, width, channels
-                            )
-                            time.sleep(args.pause)
-                else:
-                    # Send all at once
-                    audio_data = wav_file.readframes(wav_file.getnframes())
-                    _send_frame(core, topic, audio_data, rate, width, channels)
+                _send_frames(
+                    core,
+                    topic,
+                    _read_chunks(wav_file, args),
+                    wav_file.getframerate(),
+                    wav_file.getsampwidth(),
+                    wav_file.getnchannels(),
+                    batch=max(1, args.batch),
+                    pause=args.pause,
+                )
 
             print(wav_path)
 
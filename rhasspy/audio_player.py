@@ -1,12 +1,36 @@
 """Support for playing sounds."""
+import io
 import os
+import queue
 import re
 import subprocess
+import threading
+import time
 import uuid
-from typing import Any, Dict, List, Optional, Type
+import wave
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Type
 
 from rhasspy.actor import RhasspyActor
-from rhasspy.events import MqttPublish, PlayWavData, PlayWavFile, WavPlayed
+from rhasspy.events import (
+    MqttPublish,
+    PlayWavData,
+    PlayWavFile,
+    StopPlaying,
+    WavPlayed,
+)
+
+# Sample width (bytes) -> aplay format
+APLAY_FORMATS = {1: "U8", 2: "S16_LE", 3: "S24_3LE", 4: "S32_LE"}
+
+# Size of audio chunks written to aplay
+APLAY_CHUNK_SEC = 0.02
+
+# How far audio is written ahead of playback
+APLAY_LEAD_SEC = 0.1
+
+# Format of feedback sounds: (rate, width in bytes, channels)
+FEEDBACK_WAV_FORMAT = (16000, 2, 1)
 
 # -----------------------------------------------------------------------------
 
@@ -49,48 +73,299 @@ class DummyAudioPlayer(RhasspyActor):
 
 
 class APlayAudioPlayer(RhasspyActor):
-    """Plays WAV files using aplay command."""
+    """Plays WAV files using aplay command.
+
+    Sounds are queued and played by a separate thread, which writes raw audio
+    to a long-running aplay process. WavPlayed is sent when each sound
+    finishes (or is stopped), so the actor never blocks on playback.
+
+    If feedback_stream is True, an idle aplay process is kept running (or
+    restarted) in the feedback sound format instead of being stopped.
+    """
 
     def __init__(self):
         super().__init__()
         self.device: Optional[str] = None
+        self.idle_timeout_sec = 5.0
+        self.feedback_stream = True
+        self.preload_max_bytes = 1024 * 1024
+
+        # (receiver, WAV data, generation)
+        self.clips: "queue.Queue[Optional[Tuple[Any, bytes, int]]]" = queue.Queue()
+        self.generation = 0
+        self.play_thread: Optional[threading.Thread] = None
+
+        # path -> (mtime, WAV data) for short sounds
+        self.preloaded: Dict[str, Tuple[float, bytes]] = {}
+
+        # Current output stream
+        self.stream: Optional[subprocess.Popen] = None
+        self.stream_format: Optional[Tuple[int, int, int]] = None
+        self.stream_clock = 0.0
 
     def to_started(self, from_state: str) -> None:
         """Transition to started state."""
         self.device = self.config.get("device") or self.profile.get(
             "sounds.aplay.device"
         )
+        self.idle_timeout_sec = float(
+            self.profile.get("sounds.aplay.idle_timeout_sec", self.idle_timeout_sec)
+        )
+        self.feedback_stream = self.profile.get(
+            "sounds.aplay.feedback_stream", self.feedback_stream
+        )
+
+        self.play_thread = threading.Thread(target=self.play_clips, daemon=True)
+        self.play_thread.start()
 
     def in_started(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in started state."""
         if isinstance(message, PlayWavFile):
-            self.play_file(message.wav_path)
-            self.send(message.receiver or sender, WavPlayed())
+            if message.preempt:
+                self.stop_playing()
+
+            self.play_file(message.wav_path, message.receiver or sender)
         elif isinstance(message, PlayWavData):
-            self.play_data(message.wav_data)
-            self.send(message.receiver or sender, WavPlayed())
+            if message.preempt:
+                self.stop_playing()
+
+            self.play_data(message.wav_data, message.receiver or sender)
+        elif isinstance(message, StopPlaying):
+            self.stop_playing()
+
+    def to_stopped(self, from_state: str) -> None:
+        """Transition to stopped state."""
+        self.stop_playing()
+        self.clips.put(None)
 
     # -------------------------------------------------------------------------
 
-    def play_file(self, path: str) -> None:
-        """Play a WAV file using aplay."""
+    def play_file(self, path: str, receiver: Any = None) -> None:
+        """Queue a WAV file for playback."""
         if not os.path.exists(path):
             self._logger.warning("Path does not exist: %s", path)
+            if receiver is not None:
+                self.send(receiver, WavPlayed())
+
             return
 
-        aplay_cmd = ["aplay", "-q"]
+        # Keep short sounds (beeps) in memory
+        mtime = os.path.getmtime(path)
+        wav_mtime, wav_data = self.preloaded.get(path, (None, bytes()))
+        if wav_mtime != mtime:
+            with open(path, "rb") as wav_file:
+                wav_data = wav_file.read()
+
+            if len(wav_data) <= self.preload_max_bytes:
+                self.preloaded[path] = (mtime, wav_data)
+
+        self.play_data(wav_data, receiver)
+
+    def play_data(self, wav_data: bytes, receiver: Any = None) -> None:
+        """Queue a WAV buffer for playback."""
+        self.clips.put((receiver, wav_data, self.generation))
+
+    def stop_playing(self) -> None:
+        """Stop current sound and drop queued sounds."""
+        self.generation += 1
+        while True:
+            try:
+                clip = self.clips.get_nowait()
+            except queue.Empty:
+                break
+
+            if clip is None:
+                # Keep exit request
+                self.clips.put(None)
+                return
+
+            receiver, _, _ = clip
+            if receiver is not None:
+                self.send(receiver, WavPlayed())
+
+        # Wake up playback thread to cut off current sound
+        self.clips.put((None, bytes(), self.generation))
+
+    # -------------------------------------------------------------------------
+
+    def play_clips(self) -> None:
+        """Play queued sounds in a separate thread."""
+        # (end time, receiver) for sounds still playing
+        playing: Deque[Tuple[float, Any]] = deque()
+        generation = self.generation
+
+        try:
+            while True:
+                # Report finished sounds
+                now = time.monotonic()
+                while playing and (playing[0][0] <= now):
+                    _, receiver = playing.popleft()
+                    if receiver is not None:
+                        self.send(receiver, WavPlayed())
+
+                # Keep stream open forever if idle timeout is not positive
+                timeout: Optional[float] = None
+                if playing:
+                    timeout = playing[0][0] - now
+                elif self.idle_timeout_sec > 0:
+                    timeout = self.idle_timeout_sec
+
+                try:
+                    clip = self.clips.get(timeout=timeout)
+                except queue.Empty:
+                    if not playing:
+                        self.idle_stream()
+
+                    continue
+
+                if clip is None:
+                    break
+
+                receiver, wav_data, clip_generation = clip
+                if clip_generation != generation:
+                    # Stopped or preempted
+                    generation = clip_generation
+                    self.close_stream(drain=False)
+                    while playing:
+                        _, playing_receiver = playing.popleft()
+                        if playing_receiver is not None:
+                            self.send(playing_receiver, WavPlayed())
+
+                if wav_data and (clip_generation == self.generation):
+                    try:
+                        self.play_clip(wav_data, clip_generation)
+                    except Exception:
+                        self._logger.exception("play_clips")
+                        self.close_stream(drain=False)
+
+                # Sounds are queued back to back in the output stream
+                playing.append((self.stream_clock, receiver))
+        finally:
+            self.close_stream(drain=False)
+            for _, receiver in playing:
+                if receiver is not None:
+                    self.send(receiver, WavPlayed())
+
+    def play_clip(self, wav_data: bytes, generation: int) -> None:
+        """Write a WAV buffer to the output stream in (almost) real time."""
+        try:
+            with io.BytesIO(wav_data) as wav_io:
+                wav_file: wave.Wave_read = wave.open(wav_io, "rb")
+                with wav_file:
+                    rate = wav_file.getframerate()
+                    width = wav_file.getsampwidth()
+                    channels = wav_file.getnchannels()
+                    frames = wav_file.readframes(wav_file.getnframes())
+        except (wave.Error, EOFError):
+            rate, width = 0, 0
+
+        if (width not in APLAY_FORMATS) or (rate < 1):
+            # Not a PCM WAV file, so let aplay figure it out
+            self.close_stream()
+            self.play_blocking(wav_data)
+            self.stream_clock = time.monotonic()
+            return
+
+        stream = self.open_stream((rate, width, channels))
+        assert stream.stdin is not None
+
+        frame_size = width * channels
+        bytes_per_sec = rate * frame_size
+        chunk_size = max(1, int(rate * APLAY_CHUNK_SEC)) * frame_size
+
+        self.stream_clock = max(self.stream_clock, time.monotonic())
+        for offset in range(0, len(frames), chunk_size):
+            if generation != self.generation:
+                # Stopped or preempted
+                self.close_stream(drain=False)
+                return
+
+            chunk = frames[offset : offset + chunk_size]
+            stream.stdin.write(chunk)
+            stream.stdin.flush()
+            self.stream_clock += len(chunk) / bytes_per_sec
+
+            # Don't get too far ahead, so sound can be cut off quickly
+            ahead_sec = self.stream_clock - time.monotonic()
+            if ahead_sec > APLAY_LEAD_SEC:
+                time.sleep(ahead_sec - APLAY_LEAD_SEC)
+
+    def open_stream(self, wav_format: Tuple[int, int, int]) -> subprocess.Popen:
+        """Get running aplay process for an audio format."""
+        if (
+            (self.stream is not None)
+            and (self.stream_format == wav_format)
+            and (self.stream.poll() is None)
+        ):
+            return self.stream
+
+        self.close_stream()
+        rate, width, channels = wav_format
+        aplay_cmd = [
+            "aplay",
+            "-q",
+            "-t",
+            "raw",
+            "-r",
+            str(rate),
+            "-f",
+            APLAY_FORMATS[width],
+            "-c",
+            str(channels),
+        ]
 
         if self.device is not None:
             aplay_cmd.extend(["-D", str(self.device)])
 
-        # Play file
-        aplay_cmd.append(path)
-
         self._logger.debug(aplay_cmd)
-        subprocess.run(aplay_cmd, check=True)
-
-    def play_data(self, wav_data: bytes) -> None:
-        """Play a WAV buffer using aplay."""
+        self.stream = subprocess.Popen(aplay_cmd, stdin=subprocess.PIPE)
+        self.stream_format = wav_format
+        self.stream_clock = time.monotonic()
+
+        return self.stream
+
+    def idle_stream(self) -> None:
+        """Release audio device while idle, or keep it ready for feedback sounds."""
+        if (
+            (not self.feedback_stream)
+            or (self.stream is None)
+            or (self.stream.poll() is not None)
+        ):
+            self.close_stream()
+        elif self.stream_format != FEEDBACK_WAV_FORMAT:
+            # Next wake sound won't have to wait for aplay to start
+            self.close_stream()
+            self.open_stream(FEEDBACK_WAV_FORMAT)
+
+    def close_stream(self, drain: bool = True) -> None:
+        """Stop aplay process.
+
+        If drain is True, aplay is left to finish playing any buffered audio.
+        Otherwise, it is killed and the buffered audio is cut off.
+        """
+        if self.stream is not None:
+            if drain:
+                try:
+                    assert self.stream.stdin is not None
+                    self.stream.stdin.close()
+                    self.stream.wait(
+                        timeout=max(0, self.stream_clock - time.monotonic()) + 1
+                    )
+                except (BrokenPipeError, subprocess.TimeoutExpired):
+                    self._logger.warning("aplay did not finish playing, stopping it")
+                    drain = False
+
+            if not drain:
+                self.stream.kill()
+                self.stream.wait()
+
+            self.stream = None
+            self.stream_format = None
+
+        self.stream_clock = time.monotonic()
+
+    def play_blocking(self, wav_data: bytes) -> None:
+        """Play a WAV buffer using a single aplay process."""
         aplay_cmd = ["aplay", "-q"]
 
         if self.device is not None:
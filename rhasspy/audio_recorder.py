@@ -11,14 +11,14 @@ import time
 import wave
 from collections import defaultdict
 from http.server import BaseHTTPRequestHandler, HTTPServer
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Dict, List, Optional, Tuple, Type
 
 from rhasspy.actor import RhasspyActor
 from rhasspy.events import (AudioData, IntentRecognized, MqttMessage,
                             MqttSubscribe, StartRecordingToBuffer,
                             StartStreaming, StopRecordingToBuffer,
                             StopStreaming, WavTranscription)
-from rhasspy.utils import convert_wav
+from rhasspy.utils import convert_wav, make_wav_header, parse_wav_header
 
 # -----------------------------------------------------------------------------
 
@@ -566,12 +566,22 @@ class HermesAudioRecorder(RhasspyActor):
     def __init__(self) -> None:
         RhasspyActor.__init__(self)
         self.receivers: List[RhasspyActor] = []
+        self.all_site_receivers: List[RhasspyActor] = []
         self.buffers: Dict[str, bytes] = {}
         self.mqtt: Optional[RhasspyActor] = None
         self.site_ids: List[str] = []
+
+        # site id -> receivers of audio from just that site
+        self.site_receivers: Dict[str, List[RhasspyActor]] = defaultdict(list)
         self.site_id = "default"
         self.topic_audio_frame = ""
 
+        # audioFrame topic -> site id
+        self.site_topics: Dict[str, str] = {}
+
+        # site id -> (rate, width, channels) of last audio frame
+        self.site_formats: Dict[str, Tuple[int, int, int]] = {}
+
     def to_started(self, from_state: str) -> None:
         """Transition to started state."""
         self.mqtt = self.config["mqtt"]
@@ -581,12 +591,24 @@ class HermesAudioRecorder(RhasspyActor):
         else:
             self.site_id = "default"
         self.topic_audio_frame = f"hermes/audioServer/{self.site_id}/audioFrame"
-        self.send(self.mqtt, MqttSubscribe(self.topic_audio_frame))
+
+        # Audio from other sites is only streamed to all-site receivers
+        for site_id in self.site_ids or [self.site_id]:
+            site_topic = f"hermes/audioServer/{site_id}/audioFrame"
+            self.site_topics[site_topic] = site_id
+
+        if len(self.site_topics) > 1:
+            # Frames from unknown sites are ignored below
+            self.send(self.mqtt, MqttSubscribe("hermes/audioServer/+/audioFrame"))
+        else:
+            self.send(self.mqtt, MqttSubscribe(self.topic_audio_frame))
 
     def in_started(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in started state."""
         if isinstance(message, StartStreaming):
-            self.receivers.append(message.receiver or sender)
+            self.add_receiver(
+                message.receiver or sender, message.all_sites, message.site_id
+            )
             self.transition("recording")
         elif isinstance(message, StartRecordingToBuffer):
             self.buffers[message.buffer_name] = bytes()
@@ -599,40 +621,52 @@ class HermesAudioRecorder(RhasspyActor):
     def in_recording(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in recording state."""
         if isinstance(message, MqttMessage):
-            if message.topic == self.topic_audio_frame:
+            site_id = self.site_topics.get(message.topic)
+            is_main_site = message.topic == self.topic_audio_frame
+            site_receivers = self.site_receivers.get(site_id or "", [])
+
+            # Skip other sites if no one is listening to them
+            if (site_id is not None) and (
+                is_main_site or self.all_site_receivers or site_receivers
+            ):
                 # Extract audio data
-                with io.BytesIO(message.payload) as wav_buffer:
-                    with wave.open(wav_buffer, mode="rb") as wav_file:
-                        rate, width, channels = (
-                            wav_file.getframerate(),
-                            wav_file.getsampwidth(),
-                            wav_file.getnchannels(),
-                        )
-                        if (rate != 16000) or (width != 2) or (channels != 1):
-                            audio_data = convert_wav(message.payload)
-                        else:
-                            # Use original data
-                            audio_data = wav_file.readframes(wav_file.getnframes())
-
-                        data_message = AudioData(audio_data)
+                audio_data = self.get_audio_data(message.payload, site_id)
+                data_message = AudioData(audio_data, site_id=site_id)
 
                 # Forward to subscribers
-                for receiver in self.receivers:
+                for receiver in self.all_site_receivers:
                     self.send(receiver, data_message)
 
-                # Append to buffers
-                for buffer_name in self.buffers:
-                    self.buffers[buffer_name] += audio_data
+                for receiver in site_receivers:
+                    self.send(receiver, data_message)
+
+                if is_main_site:
+                    for receiver in self.receivers:
+                        self.send(receiver, data_message)
+
+                    # Append to buffers
+                    for buffer_name in self.buffers:
+                        self.buffers[buffer_name] += audio_data
         elif isinstance(message, StartStreaming):
-            self.receivers.append(message.receiver or sender)
+            self.add_receiver(
+                message.receiver or sender, message.all_sites, message.site_id
+            )
         elif isinstance(message, StartRecordingToBuffer):
             self.buffers[message.buffer_name] = bytes()
         elif isinstance(message, StopStreaming):
             if message.receiver is None:
                 # Clear all receivers
                 self.receivers.clear()
-            else:
+                self.all_site_receivers.clear()
+                self.site_receivers.clear()
+            elif message.receiver in self.all_site_receivers:
+                self.all_site_receivers.remove(message.receiver)
+            elif message.receiver in self.receivers:
                 self.receivers.remove(message.receiver)
+            else:
+                for site_receivers in self.site_receivers.values():
+                    if message.receiver in site_receivers:
+                        site_receivers.remove(message.receiver)
         elif isinstance(message, StopRecordingToBuffer):
             if message.buffer_name is None:
                 # Clear all buffers
@@ -642,6 +676,93 @@ class HermesAudioRecorder(RhasspyActor):
                 buffer = self.buffers.pop(message.buffer_name, bytes())
                 self.send(message.receiver or sender, AudioData(buffer))
 
+    def add_receiver(
+        self, receiver: RhasspyActor, all_sites: bool = False, site_id: str = ""
+    ) -> None:
+        """Stream audio from the main site (or one/all sites) to a receiver."""
+        if all_sites:
+            self.all_site_receivers.append(receiver)
+        elif site_id and (site_id != self.site_id):
+            self.site_receivers[site_id].append(receiver)
+        else:
+            self.receivers.append(receiver)
+
+    def get_audio_data(self, payload: bytes, site_id: str) -> bytes:
+        """Get 16-bit 16Khz mono audio from one or more WAV frames."""
+        payload_view = memoryview(payload)
+        chunks: List[memoryview] = []
+        offset = 0
+
+        # Frames may be batched as WAV files back to back
+        while offset < len(payload_view):
+            header = parse_wav_header(payload_view, offset)
+            if header is None:
+                # Not a canonical WAV header, so fall back to wave module.
+                # The RIFF chunk size tells where the next frame starts.
+                wav_end = len(payload_view)
+                if payload_view[offset : offset + 4] == b"RIFF":
+                    riff_size = int.from_bytes(
+                        payload_view[offset + 4 : offset + 8], "little"
+                    )
+                    if 4 <= riff_size <= (len(payload_view) - offset - 8):
+                        wav_end = offset + 8 + riff_size
+
+                chunks.append(
+                    memoryview(
+                        self.convert_frame(
+                            payload_view[offset:wav_end].tobytes(), site_id
+                        )
+                    )
+                )
+                offset = wav_end
+                continue
+
+            rate, width, channels, data_offset, data_size = header
+            frame_format = (rate, width, channels)
+            if frame_format != self.site_formats.get(site_id):
+                self._logger.debug("Audio format for %s: %s", site_id, frame_format)
+                self.site_formats[site_id] = frame_format
+
+            data_end = data_offset + data_size
+            if frame_format == (16000, 2, 1):
+                # Use original data
+                chunks.append(payload_view[data_offset:data_end])
+            else:
+                chunks.append(
+                    memoryview(
+                        convert_wav(
+                            make_wav_header(data_size, rate, width, channels)
+                            + payload_view[data_offset:data_end]
+                        )
+                    )
+                )
+
+            offset = data_end
+
+        if len(chunks) == 1:
+            return chunks[0].tobytes()
+
+        return b"".join(chunks)
+
+    def convert_frame(self, wav_data: bytes, site_id: str) -> bytes:
+        """Extract audio from a WAV frame with the wave module."""
+        with io.BytesIO(wav_data) as wav_buffer:
+            with wave.open(wav_buffer, mode="rb") as wav_file:
+                frame_format = (
+                    wav_file.getframerate(),
+                    wav_file.getsampwidth(),
+                    wav_file.getnchannels(),
+                )
+                if frame_format != self.site_formats.get(site_id):
+                    self._logger.debug("Audio format for %s: %s", site_id, frame_format)
+                    self.site_formats[site_id] = frame_format
+
+                if frame_format != (16000, 2, 1):
+                    return convert_wav(wav_data)
+
+                # Use original data
+                return wav_file.readframes(wav_file.getnframes())
+
     # -----------------------------------------------------------------------------
 
     @classmethod
@@ -137,7 +137,9 @@ class WebrtcvadCommandListener(RhasspyActor):
             self.receiver = message.receiver or sender
             self.transition("listening")
             self.handle = message.handle
-            self.send(self.recorder, StartStreaming(self.myAddress))
+            self.send(
+                self.recorder, StartStreaming(self.myAddress, site_id=message.site_id)
+            )
 
     def to_listening(self, from_state: str) -> None:
         """Transition to listening state."""
@@ -350,7 +352,9 @@ class OneShotCommandListener(RhasspyActor):
                 # Use default timeout
                 timeout_sec = self.timeout_sec
 
-            self.send(self.recorder, StartStreaming(self.myAddress))
+            self.send(
+                self.recorder, StartStreaming(self.myAddress, site_id=message.site_id)
+            )
             self.wakeupAfter(timedelta(seconds=timeout_sec))
 
     def in_listening(self, message: Any, sender: RhasspyActor) -> None:
@@ -55,7 +55,7 @@ from rhasspy.events import (
     WordSpoken,
 )
 from rhasspy.profiles import Profile
-from rhasspy.utils import numbers_to_words
+from rhasspy.utils import get_dictionary_index, numbers_to_words
 
 # -----------------------------------------------------------------------------
 
@@ -417,6 +417,10 @@ class RhasspyCore:
 
     async def shutdown(self) -> None:
         """Shut down actors."""
+        # Report settings that were read most often
+        for path, count in self.profile.most_read(20):
+            self._logger.info("Profile setting %s read %s time(s)", path, count)
+
         # Clear environment variables
         rhasspy_vars = [v for v in os.environ if v.startswith("RHASSPY")]
 
@@ -722,6 +726,44 @@ class RhasspyCore:
                     else:
                         shutil.copy2(extract_path, dest_path)
 
+        # Index base dictionary once so training/lookups avoid loading it
+        self._index_base_dictionary()
+
+    def _index_base_dictionary(self) -> None:
+        """Build memory-mapped index of base dictionary (if present)."""
+        stt_system = self.profile.get("speech_to_text.system", "dummy")
+        base_dictionary_path = self.profile.read_path(
+            self.profile.get(
+                f"speech_to_text.{stt_system}.base_dictionary", "base_dictionary.txt"
+            )
+        )
+
+        if not os.path.isfile(base_dictionary_path):
+            return
+
+        index_dir = self.profile.write_path(
+            self.profile.get("speech_to_text.dictionary_index_dir", "dictionary_index")
+        )
+
+        # Training looks up words with forced casing, pronunciation without
+        word_casing = self.profile.get("speech_to_text.dictionary_casing", "").lower()
+        if word_casing not in ["upper", "lower"]:
+            word_casing = ""
+
+        for casing in set(["", word_casing]):
+            try:
+                status = f"Indexing {base_dictionary_path} ({casing or 'ignore'})"
+                self.download_status.append(status)
+                self._logger.debug(status)
+                get_dictionary_index(
+                    base_dictionary_path,
+                    index_dir,
+                    casing,
+                    silence_words=set(["<s>", "</s>"]),
+                ).close()
+            except Exception:
+                self._logger.exception("Failed to index %s", base_dictionary_path)
+
     # -------------------------------------------------------------------------
 
     async def get_problems(self) -> Dict[str, Any]:
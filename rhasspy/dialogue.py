@@ -19,8 +19,12 @@ from rhasspy.actor import (
     StateTransition,
     WakeupMessage,
 )
-from rhasspy.audio_player import get_sound_class
-from rhasspy.audio_recorder import HTTPAudioRecorder, get_microphone_class
+from rhasspy.audio_player import FEEDBACK_WAV_FORMAT, get_sound_class
+from rhasspy.audio_recorder import (
+    HermesAudioRecorder,
+    HTTPAudioRecorder,
+    get_microphone_class,
+)
 from rhasspy.command_listener import get_command_class
 from rhasspy.events import (
     AudioData,
@@ -68,7 +72,7 @@ from rhasspy.stt import get_decoder_class
 from rhasspy.stt_train import get_speech_trainer_class
 from rhasspy.train import train_profile
 from rhasspy.tts import get_speech_class
-from rhasspy.utils import buffer_to_wav
+from rhasspy.utils import buffer_to_wav, maybe_convert_wav
 from rhasspy.wake import get_wake_class
 
 # -----------------------------------------------------------------------------
@@ -139,6 +143,9 @@ class DialogueManager(RhasspyActor):
         # MQTT site id
         self.site_id: str = "default"
 
+        # Site where wake word was detected (multi-site)
+        self.wake_site_id: str = ""
+
         # Text to speech
         self.speech_class: Optional[Type] = None
         self._speech: Optional[RhasspyActor] = None
@@ -173,6 +180,9 @@ class DialogueManager(RhasspyActor):
         # Webhooks
         self.webhooks: Dict[str, List[str]] = {}
 
+        # Feedback sounds (name -> WAV data)
+        self.sounds: Dict[str, bytes] = {}
+
     # -------------------------------------------------------------------------
 
     @property
@@ -370,19 +380,24 @@ class DialogueManager(RhasspyActor):
     def to_asleep(self, from_state: str) -> None:
         """Transition to asleep state."""
         self.listen_entities = []
+        self.wake_site_id = ""
 
     def in_asleep(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in asleep state."""
         if isinstance(message, WakeWordDetected):
             self._logger.debug("Awake!")
             self.wake_detected_name = message.name
+            self.wake_site_id = message.site_id
             self.transition("awake")
             if self.wake_receiver is not None:
                 self.send(self.wake_receiver, message)
 
             awake_hooks = self.webhooks.get("awake", [])
             if awake_hooks:
-                hook_json = {"wakewordId": message.name, "siteId": self.site_id}
+                hook_json = {
+                    "wakewordId": message.name,
+                    "siteId": message.site_id or self.site_id,
+                }
                 for hook_url in awake_hooks:
                     self._logger.debug("POST-ing to %s", hook_url)
                     requests.post(hook_url, json=hook_json)
@@ -402,16 +417,17 @@ class DialogueManager(RhasspyActor):
         """Transition to awake state."""
         self.send(self.wake, StopListeningForWakeWord())
 
-        # Wake up beep
-        wav_path = os.path.expandvars(self.profile.get("sounds.wake", None))
-        if wav_path is not None:
-            self.send(self.player, PlayWavFile(wav_path))
+        # Wake up beep (cuts off any other sound)
+        self.play_sound("wake", preempt=True)
 
         # Listen for a voice command
         self.send(
             self.command,
             ListenForCommand(
-                self.myAddress, handle=self.handle, timeout=self.listen_timeout_sec
+                self.myAddress,
+                handle=self.handle,
+                timeout=self.listen_timeout_sec,
+                site_id=self.wake_site_id,
             ),
         )
 
@@ -419,9 +435,7 @@ class DialogueManager(RhasspyActor):
         """Handle messages in awake state."""
         if isinstance(message, VoiceCommand):
             # Recorded beep
-            wav_path = os.path.expandvars(self.profile.get("sounds.recorded", None))
-            if wav_path is not None:
-                self.send(self.player, PlayWavFile(wav_path))
+            self.play_sound("recorded")
 
             # speech -> text
             wav_data = buffer_to_wav(message.data)
@@ -460,7 +474,7 @@ class DialogueManager(RhasspyActor):
             # Send to MQTT
             payload = json.dumps(
                 {
-                    "siteId": self.site_id,
+                    "siteId": self.wake_site_id or self.site_id,
                     "text": message.text,
                     "likelihood": 1,
                     "seconds": 0,
@@ -500,18 +514,14 @@ class DialogueManager(RhasspyActor):
             if not pydash.get(message.intent, "intent.name", ""):
                 if self.profile.get("intent.error_sound", True):
                     # Play error sound when not recognized
-                    wav_path = os.path.expandvars(
-                        self.profile.get("sounds.error", None)
-                    )
-                    if wav_path is not None:
-                        self.send(self.player, PlayWavFile(wav_path))
+                    self.play_sound("error")
 
             if self.recorder_class == HTTPAudioRecorder:
                 # Forward to audio recorder
                 self.send(self.recorder, message)
 
             message.intent["wakeId"] = self.wake_detected_name or ""
-            message.intent["siteId"] = self.site_id
+            message.intent["siteId"] = self.wake_site_id or self.site_id
 
             # Augment with extra entities
             entities = message.intent.get("entities", [])
@@ -723,7 +733,7 @@ class DialogueManager(RhasspyActor):
                     play=message.play,
                     voice=message.voice,
                     language=message.language,
-                    siteId=message.siteId,
+                    siteId=message.siteId or self.wake_site_id or None,
                 ),
             )
         elif isinstance(message, TrainProfile):
@@ -824,9 +834,52 @@ class DialogueManager(RhasspyActor):
     # Utilities
     # -------------------------------------------------------------------------
 
+    def load_sounds(self) -> None:
+        """Read feedback sounds into memory (converted to one format)."""
+        rate, width, channels = FEEDBACK_WAV_FORMAT
+        self.sounds = {}
+        for sound_name in ["wake", "recorded", "error"]:
+            wav_path = self.profile.get(f"sounds.{sound_name}", None)
+            if not wav_path:
+                continue
+
+            wav_path = os.path.expandvars(wav_path)
+            try:
+                with open(wav_path, "rb") as wav_file:
+                    wav_data = wav_file.read()
+            except Exception:
+                self._logger.warning(
+                    "Unable to load %s sound from %s", sound_name, wav_path
+                )
+                continue
+
+            try:
+                # Sounds in the same format share one aplay process
+                wav_data = maybe_convert_wav(
+                    wav_data, rate=rate, width=width * 8, channels=channels
+                )
+            except Exception:
+                self._logger.warning(
+                    "Unable to convert %s sound from %s", sound_name, wav_path
+                )
+
+            self.sounds[sound_name] = wav_data
+
+    def play_sound(self, sound_name: str, preempt: bool = False) -> None:
+        """Play a feedback sound from memory at the site that heard the wake word."""
+        wav_data = self.sounds.get(sound_name)
+        if wav_data:
+            self.send(
+                self.player,
+                PlayWavData(
+                    wav_data, siteId=self.wake_site_id or None, preempt=preempt
+                ),
+            )
+
     def load_actors(self) -> None:
         """Load all system actors."""
         self._logger.debug("Loading actors")
+        self.load_sounds()
 
         # Microphone
         mic_system = self.profile.get("microphone.system", "dummy")
@@ -842,13 +895,26 @@ class DialogueManager(RhasspyActor):
 
         # Text to Speech
         speech_system = self.profile.get("text_to_speech.system", "dummy")
-        self.speech_class = get_speech_class(speech_system)
+        self.speech_class = get_speech_class(
+            speech_system,
+            streaming=self.profile.get("text_to_speech.streaming.enabled", False),
+            cache=self.profile.get("text_to_speech.cache.enabled", False),
+        )
         self._speech = self.createActor(self.speech_class)
         self.actors["speech"] = self.speech
 
         # Wake listener
         wake_system = self.profile.get("wake.system", "dummy")
-        self.wake_class = get_wake_class(wake_system)
+        multi_site = self.profile.get("wake.multi_site", False)
+        if multi_site and (self.recorder_class != HermesAudioRecorder):
+            self._logger.warning(
+                "wake.multi_site requires microphone.system = hermes (got %s). "
+                "Using a single wake listener.",
+                mic_system,
+            )
+            multi_site = False
+
+        self.wake_class = get_wake_class(wake_system, multi_site=multi_site)
         self._wake = self.createActor(self.wake_class)
         self.actors["wake"] = self.wake
 
@@ -32,17 +32,23 @@ class StopListeningForWakeWord:
 class WakeWordDetected:
     """Response when wake word is detected."""
 
-    def __init__(self, name: str, audio_data_info: Dict[Any, Any] = None) -> None:
+    def __init__(
+        self, name: str, audio_data_info: Dict[Any, Any] = None, site_id: str = ""
+    ) -> None:
         self.name = name
         self.audio_data_info = audio_data_info or {}
+        self.site_id = site_id or self.audio_data_info.get("site_id", "")
 
 
 class WakeWordNotDetected:
     """Response when wake word is not detected."""
 
-    def __init__(self, name: str, audio_data_info: Dict[Any, Any] = None) -> None:
+    def __init__(
+        self, name: str, audio_data_info: Dict[Any, Any] = None, site_id: str = ""
+    ) -> None:
         self.name = name
         self.audio_data_info = audio_data_info or {}
+        self.site_id = site_id or self.audio_data_info.get("site_id", "")
 
 
 class PauseListeningForWakeWord:
@@ -70,10 +76,12 @@ class PlayWavFile:
         wav_path: str,
         receiver: Optional[RhasspyActor] = None,
         siteId: Optional[str] = None,
+        preempt: bool = False,
     ) -> None:
         self.wav_path = wav_path
         self.receiver = receiver
         self.siteId = siteId
+        self.preempt = preempt
 
 
 class PlayWavData:
@@ -84,10 +92,12 @@ class PlayWavData:
         wav_data: bytes,
         receiver: Optional[RhasspyActor] = None,
         siteId: Optional[str] = None,
+        preempt: bool = False,
     ) -> None:
         self.wav_data = wav_data
         self.receiver = receiver
         self.siteId = siteId
+        self.preempt = preempt
 
 
 class WavPlayed:
@@ -96,6 +106,12 @@ class WavPlayed:
     pass
 
 
+class StopPlaying:
+    """Request to stop the current sound and drop queued sounds."""
+
+    pass
+
+
 # -----------------------------------------------------------------------------
 # Audio Recording
 # -----------------------------------------------------------------------------
@@ -110,10 +126,22 @@ class AudioData:
 
 
 class StartStreaming:
-    """Tells microphone to begin recording. Emits AudioData chunks."""
+    """Tells microphone to begin recording. Emits AudioData chunks.
 
-    def __init__(self, receiver: Optional[RhasspyActor] = None) -> None:
+    If all_sites is True, a microphone that receives audio from multiple
+    sites (e.g., Hermes) streams all of them instead of just the first.
+    If site_id is set, only audio from that site is streamed.
+    """
+
+    def __init__(
+        self,
+        receiver: Optional[RhasspyActor] = None,
+        all_sites: bool = False,
+        site_id: str = "",
+    ) -> None:
         self.receiver = receiver
+        self.all_sites = all_sites
+        self.site_id = site_id
 
 
 class StopStreaming:
@@ -154,11 +182,13 @@ class ListenForCommand:
         handle: bool = True,
         timeout: Optional[float] = None,
         entities: List[Dict[str, Any]] = None,
+        site_id: str = "",
     ) -> None:
         self.receiver = receiver
         self.handle = handle
         self.timeout = timeout
         self.entities = entities or []
+        self.site_id = site_id
 
 
 class VoiceCommand:
@@ -0,0 +1,317 @@
+"""Grapheme to phoneme (pronunciation guessing) with Phonetisaurus."""
+import json
+import logging
+import os
+import re
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+_LOGGER = logging.getLogger(__name__)
+
+# (word, nbest, casing)
+G2pKey = Tuple[str, int, str]
+
+# -----------------------------------------------------------------------------
+
+
+class PhonetisaurusG2p:
+    """Guesses word pronunciations with a Phonetisaurus model that is loaded once.
+
+    The model stays loaded if the Phonetisaurus Python bindings are installed
+    (see build-from-source.sh). Otherwise, each batch of uncached words is
+    guessed by a single phonetisaurus-apply process.
+
+    Guesses are kept in an in-memory LRU cache and (optionally) appended to a
+    JSON lines file, so the same word is never guessed twice for a given model.
+    """
+
+    def __init__(
+        self,
+        model_path: Union[str, Path],
+        cache_path: Optional[Union[str, Path]] = None,
+        cache_size: int = 10000,
+    ) -> None:
+        self.model_path = Path(model_path)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.cache_size = cache_size
+
+        self.hits = 0
+        self.misses = 0
+
+        # Native model from Phonetisaurus Python bindings (if available)
+        self._model: Any = None
+        self._native = True
+
+        self._lock = threading.RLock()
+        self._lru: "OrderedDict[G2pKey, List[str]]" = OrderedDict()
+        self._saved: Dict[G2pKey, List[str]] = {}
+        self._model_info: Dict[str, Any] = {}
+
+        self._load_saved()
+
+    # -------------------------------------------------------------------------
+
+    def guess(
+        self, words: Iterable[str], n: int = 1, casing: str = ""
+    ) -> Dict[str, List[str]]:
+        """Guess up to n pronunciations for each word.
+
+        Words are upper/lower-cased for the model if casing is set.
+        Returns a dict from (original) word to pronunciations.
+        """
+        casing = (casing or "").lower()
+        pronunciations: Dict[str, List[str]] = {}
+
+        with self._lock:
+            self._check_model()
+
+            # Model word -> original words
+            missing: Dict[str, List[str]] = {}
+            for word in words:
+                key = (word, n, casing)
+                cached = self._get_cached(key)
+                if cached is not None:
+                    self.hits += 1
+                    pronunciations[word] = list(cached)
+                    continue
+
+                self.misses += 1
+                missing.setdefault(self._apply_casing(word, casing), []).append(word)
+
+            if not missing:
+                return pronunciations
+
+            guesses = self._guess_model(list(missing), n)
+
+            new_entries: Dict[G2pKey, List[str]] = {}
+            for g2p_word, original_words in missing.items():
+                word_prons = guesses.get(g2p_word, [])
+                for word in original_words:
+                    pronunciations[word] = list(word_prons)
+                    new_entries[(word, n, casing)] = word_prons
+
+            for key, word_prons in new_entries.items():
+                self._put_cached(key, word_prons)
+
+            self._save(new_entries)
+
+        return pronunciations
+
+    # -------------------------------------------------------------------------
+
+    def _guess_model(self, words: List[str], n: int) -> Dict[str, List[str]]:
+        """Run Phonetisaurus on a batch of (already cased) words."""
+        if self._native and (self._model is None):
+            try:
+                # pylint: disable=import-outside-toplevel
+                from Phonetisaurus import PhonetisaurusScript
+
+                _LOGGER.debug("Loading g2p model from %s", self.model_path)
+                self._model = PhonetisaurusScript(str(self.model_path), "")
+            except ImportError:
+                _LOGGER.debug(
+                    "Phonetisaurus Python module not available. "
+                    "Using phonetisaurus-apply."
+                )
+                self._native = False
+
+        if self._native:
+            return self._guess_native(words, n)
+
+        return self._guess_apply(words, n)
+
+    def _guess_native(self, words: List[str], n: int) -> Dict[str, List[str]]:
+        """Guess pronunciations with the loaded model.
+
+        Uses the same beam, threshold, and pmass as phonetisaurus-apply.
+        """
+        guesses: Dict[str, List[str]] = {}
+        for word in words:
+            results = self._model.Phoneticize(
+                word, n, 10000, 99.0, False, False, 99.0
+            )
+            guesses[word] = [
+                " ".join(self._model.FindOsym(u) for u in result.Uniques)
+                for result in results
+            ]
+
+        return guesses
+
+    def _guess_apply(self, words: List[str], n: int) -> Dict[str, List[str]]:
+        """Guess pronunciations with a single phonetisaurus-apply process."""
+        guesses: Dict[str, List[str]] = {word: [] for word in words}
+
+        with tempfile.NamedTemporaryFile(mode="w+", suffix=".txt") as wordlist_file:
+            for word in words:
+                print(word, file=wordlist_file)
+
+            wordlist_file.seek(0)
+
+            g2p_command = [
+                "phonetisaurus-apply",
+                "--model",
+                str(self.model_path),
+                "--word_list",
+                wordlist_file.name,
+                "--nbest",
+                str(n),
+            ]
+
+            _LOGGER.debug(repr(g2p_command))
+            g2p_output = subprocess.check_output(g2p_command, universal_newlines=True)
+
+        for line in g2p_output.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+
+            parts = re.split(r"\s+", line, maxsplit=1)
+            if (len(parts) > 1) and (parts[0] in guesses):
+                guesses[parts[0]].append(parts[1].strip())
+
+        return guesses
+
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _apply_casing(word: str, casing: str) -> str:
+        if casing == "upper":
+            # FST was trained with upper-case letters
+            return word.upper()
+
+        if casing == "lower":
+            # FST was trained with lower-case letters
+            return word.lower()
+
+        return word
+
+    def _get_cached(self, key: G2pKey) -> Optional[List[str]]:
+        word_prons = self._lru.get(key)
+        if word_prons is not None:
+            self._lru.move_to_end(key)
+            return word_prons
+
+        word_prons = self._saved.get(key)
+        if word_prons is not None:
+            self._put_cached(key, word_prons)
+
+        return word_prons
+
+    def _put_cached(self, key: G2pKey, word_prons: List[str]) -> None:
+        self._lru[key] = word_prons
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.cache_size:
+            self._lru.popitem(last=False)
+
+    def _get_model_info(self) -> Dict[str, Any]:
+        """Identify model so cached guesses are dropped when it changes."""
+        try:
+            model_stat = self.model_path.stat()
+            return {
+                "model": str(self.model_path.absolute()),
+                "mtime_ns": model_stat.st_mtime_ns,
+                "size": model_stat.st_size,
+            }
+        except OSError:
+            return {"model": str(self.model_path.absolute())}
+
+    def _check_model(self) -> None:
+        """Reload model and drop guesses if model file has changed."""
+        model_info = self._get_model_info()
+        if model_info != self._model_info:
+            _LOGGER.debug("g2p model changed: %s", self.model_path)
+            self._model = None
+            self._lru.clear()
+            self._saved.clear()
+            self._model_info = model_info
+            self._reset_saved()
+
+    def _load_saved(self) -> None:
+        """Load previous guesses from disk."""
+        self._model_info = self._get_model_info()
+        if (self.cache_path is None) or (not self.cache_path.is_file()):
+            return
+
+        try:
+            with open(self.cache_path, "r") as cache_file:
+                header = json.loads(next(cache_file, "{}"))
+                if header != self._model_info:
+                    _LOGGER.debug("Discarding g2p cache for different model")
+                    self._reset_saved()
+                    return
+
+                for line in cache_file:
+                    line = line.strip()
+                    if line:
+                        entry = json.loads(line)
+                        key = (entry["word"], entry["n"], entry["casing"])
+                        self._saved[key] = entry["pronunciations"]
+
+            _LOGGER.debug(
+                "Loaded %s g2p guess(es) from %s", len(self._saved), self.cache_path
+            )
+        except Exception:
+            _LOGGER.exception("Failed to load g2p cache from %s", self.cache_path)
+            self._saved.clear()
+
+    def _reset_saved(self) -> None:
+        """Start a new cache file for the current model."""
+        if self.cache_path is None:
+            return
+
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, "w") as cache_file:
+                print(json.dumps(self._model_info), file=cache_file)
+        except Exception:
+            _LOGGER.exception("Failed to reset g2p cache at %s", self.cache_path)
+
+    def _save(self, entries: Dict[G2pKey, List[str]]) -> None:
+        """Append new guesses to disk."""
+        self._saved.update(entries)
+        if (self.cache_path is None) or (not entries):
+            return
+
+        try:
+            if not self.cache_path.is_file():
+                self._reset_saved()
+
+            with open(self.cache_path, "a") as cache_file:
+                for (word, n, casing), word_prons in entries.items():
+                    print(
+                        json.dumps(
+                            {
+                                "word": word,
+                                "n": n,
+                                "casing": casing,
+                                "pronunciations": word_prons,
+                            }
+                        ),
+                        file=cache_file,
+                    )
+        except Exception:
+            _LOGGER.exception("Failed to save g2p cache to %s", self.cache_path)
+
+
+# -----------------------------------------------------------------------------
+
+_G2P: Dict[Tuple[str, str], PhonetisaurusG2p] = {}
+_G2P_LOCK = threading.Lock()
+
+
+def get_g2p(
+    model_path: Union[str, Path], cache_path: Optional[Union[str, Path]] = None
+) -> PhonetisaurusG2p:
+    """Get shared g2p guesser for a model (created on first use)."""
+    key = (os.path.abspath(model_path), os.path.abspath(cache_path or ""))
+    with _G2P_LOCK:
+        g2p = _G2P.get(key)
+        if g2p is None:
+            g2p = PhonetisaurusG2p(model_path, cache_path=cache_path)
+            _G2P[key] = g2p
+
+        return g2p
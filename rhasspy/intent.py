@@ -3,20 +3,29 @@ import concurrent.futures
 import json
 import logging
 import os
+import pickle
 import re
 import shutil
 import subprocess
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
+from typing import Any, Callable, Dict, List, Optional, Set, Type
 from urllib.parse import urljoin
 
 import networkx as nx
 import pydash
+import pywrapfst as fst
 import requests
 from rhasspynlu import json_to_graph, recognize
 
 from rhasspy.actor import RhasspyActor
 from rhasspy.events import IntentRecognized, RecognizeIntent, SpeakSentence
-from rhasspy.utils import empty_intent, hass_request_kwargs, load_converters
+from rhasspy.train.jsgf2fst import FstAcceptor, fstaccept
+from rhasspy.utils import (
+    ExamplesIndex,
+    close_converters,
+    empty_intent,
+    hass_request_kwargs,
+    load_converters,
+)
 
 # -----------------------------------------------------------------------------
 
@@ -141,9 +150,14 @@ class FsticuffsRecognizer(RhasspyActor):
         self.fuzzy: bool = True
         self.converters: Dict[str, Callable[..., Any]] = {}
         self.preload: bool = False
+        self.use_acceptor: bool = False
+        self.acceptor: Optional[FstAcceptor] = None
 
     def to_started(self, from_state: str) -> None:
         """Transition to started state."""
+        # True if exact matches should be looked up in intent.fst first
+        self.use_acceptor = self.profile.get("intent.fsticuffs.fst_acceptor", False)
+
         self.preload = self.config.get("preload", False)
         if self.preload:
             try:
@@ -159,6 +173,10 @@ class FsticuffsRecognizer(RhasspyActor):
 
         self.transition("loaded")
 
+    def to_stopped(self, from_state: str) -> None:
+        """Transition to stopped state."""
+        close_converters(self.converters)
+
     def in_loaded(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in loaded state."""
         if isinstance(message, RecognizeIntent):
@@ -173,20 +191,31 @@ class FsticuffsRecognizer(RhasspyActor):
                     # Filter tokens
                     tokens = [w for w in tokens if w in self.words]
 
-                recognitions = recognize(
-                    tokens,
-                    self.graph,
-                    fuzzy=self.fuzzy,
-                    stop_words=self.stop_words,
-                    extra_converters=self.converters,
-                )
-                assert recognitions, "No intent recognized"
+                intents: List[Dict[str, Any]] = []
+                if self.acceptor is not None:
+                    # Try an exact match with the intent FST first
+                    intents = fstaccept(self.acceptor, tokens, max_paths=1)
+
+                if intents:
+                    intent = intents[0]
+                    intent["slots"] = {
+                        e["entity"]: e["value"] for e in intent["entities"]
+                    }
+                else:
+                    recognitions = recognize(
+                        tokens,
+                        self.graph,
+                        fuzzy=self.fuzzy,
+                        stop_words=self.stop_words,
+                        extra_converters=self.converters,
+                    )
+                    assert recognitions, "No intent recognized"
 
-                # Use first intent
-                recognition = recognitions[0]
+                    # Use first intent
+                    recognition = recognitions[0]
 
-                # Convert to JSON
-                intent = recognition.asdict()
+                    # Convert to JSON
+                    intent = recognition.asdict()
             except Exception:
                 self._logger.exception("in_loaded")
                 intent = empty_intent()
@@ -228,6 +257,29 @@ class FsticuffsRecognizer(RhasspyActor):
                         line.strip() for line in stop_words_file if line.strip()
                     }
 
+            if self.use_acceptor:
+                self.load_acceptor()
+
+    def load_acceptor(self):
+        """Index intent FST once for exact matches."""
+        fst_path = self.profile.read_path(
+            self.profile.get("intent.fsticuffs.intent_fst", "intent.fst")
+        )
+
+        intent_fst = fst.Fst.read(fst_path)
+        output_symbols = intent_fst.output_symbols()
+        for i in range(output_symbols.num_symbols()):
+            symbol = output_symbols.find(output_symbols.get_nth_key(i)).decode()
+            if symbol.startswith("__convert__"):
+                # Converters are only applied by the intent graph
+                self._logger.warning(
+                    "Not using intent FST for recognition (profile has converters)"
+                )
+                return
+
+        self._logger.debug("Using intent FST at %s", fst_path)
+        self.acceptor = FstAcceptor(intent_fst)
+
     # -------------------------------------------------------------------------
 
     def get_problems(self) -> Dict[str, Any]:
@@ -262,7 +314,7 @@ class FuzzyWuzzyRecognizer(RhasspyActor):
 
     def __init__(self) -> None:
         RhasspyActor.__init__(self)
-        self.examples: Optional[Dict[str, Any]] = None
+        self.examples: Optional[ExamplesIndex] = None
         self.min_confidence: float = 0
         self.preload = False
 
@@ -304,35 +356,35 @@ class FuzzyWuzzyRecognizer(RhasspyActor):
         if text:
             assert self.examples is not None, "No examples JSON"
 
-            choices: Dict[str, Tuple[str, Dict[str, Any]]] = {}
             with concurrent.futures.ProcessPoolExecutor() as executor:
                 future_to_name = {}
-                for intent_name, intent_examples in self.examples.items():
-                    sentences = []
-                    for example in intent_examples:
-                        example_text = example.get("raw_text", example["text"])
-                        choices[example_text] = (example_text, example)
-                        sentences.append(example_text)
-
+                for intent_name in self.examples.intents:
+                    # Match strings are decoded by the worker
+                    sentences = self.examples.get_texts(intent_name)
                     future = executor.submit(_get_best_fuzzy, text, sentences)
                     future_to_name[future] = intent_name
 
             # Process them as they complete
-            best_text = ""
+            best_intent_name = ""
+            best_index = -1
             best_score = None
             for future in concurrent.futures.as_completed(future_to_name):
                 intent_name = future_to_name[future]
-                text, score = future.result()
+                result = future.result()
+                if result is None:
+                    continue
+
+                _, score, text_index = result
                 if (best_score is None) or (score > best_score):
-                    best_text = text
+                    best_intent_name = intent_name
+                    best_index = text_index
                     best_score = score
 
-            if best_text in choices:
+            if best_index >= 0:
+                # Only the winning example is read
+                best_intent = self.examples.get_example(best_intent_name, best_index)
                 confidence = (best_score / 100) if best_score else 1
                 if confidence >= self.min_confidence:
-                    # (text, intent, slots)
-                    best_text, best_intent = choices[best_text]
-
                     # Update confidence and return example intent
                     best_intent["intent"]["confidence"] = confidence
                     return best_intent
@@ -353,27 +405,73 @@ class FuzzyWuzzyRecognizer(RhasspyActor):
     # -------------------------------------------------------------------------
 
     def load_examples(self) -> None:
-        """Load JSON file with intent examples if not already cached"""
+        """Open (or build) index of intent examples if not already cached"""
+        if (self.examples is not None) and (not self.examples.is_current()):
+            # Examples were retrained
+            self.examples.close()
+            self.examples = None
+
         if self.examples is None:
             examples_path = self.profile.read_path(
-                self.profile.get("intent.fuzzywuzzy.examples_json")
+                self.profile.get(
+                    "intent.fuzzywuzzy.examples_jsonl", "intent_examples.jsonl"
+                )
             )
 
-            if os.path.exists(examples_path):
-                with open(examples_path, "r") as examples_file:
-                    self.examples = json.load(examples_file)
+            if not os.path.exists(examples_path):
+                # Convert JSON file from older training
+                json_path = self.profile.read_path(
+                    self.profile.get("intent.fuzzywuzzy.examples_json")
+                )
 
-                self._logger.debug("Loaded examples from %s", examples_path)
+                if not os.path.exists(json_path):
+                    return
+
+                examples_path = self.profile.write_path(
+                    self.profile.get(
+                        "intent.fuzzywuzzy.examples_jsonl", "intent_examples.jsonl"
+                    )
+                )
+
+                self._logger.debug("Converting %s to %s", json_path, examples_path)
+                with open(json_path, "r") as json_file:
+                    examples_by_intent = json.load(json_file)
+
+                with open(examples_path, "w") as examples_file:
+                    for intent_examples in examples_by_intent.values():
+                        for example in intent_examples:
+                            print(
+                                json.dumps(example, separators=(",", ":")),
+                                file=examples_file,
+                            )
+
+            index_path = self.profile.write_path(
+                self.profile.get(
+                    "intent.fuzzywuzzy.examples_index", "intent_examples.idx"
+                )
+            )
+
+            self.examples = ExamplesIndex.open_or_build(examples_path, index_path)
+            self._logger.debug(
+                "Loaded %s example(s) from %s", len(self.examples), index_path
+            )
 
 
 # -----------------------------------------------------------------------------
 
 
 def _get_best_fuzzy(text, sentences):
-    """Find sentence with lowest string-edit distance."""
+    """Find sentence with lowest string-edit distance.
+
+    Returns (sentence, score, index) or None if there are no sentences.
+    """
     from fuzzywuzzy import process
 
-    return process.extractOne(text, sentences)
+    if isinstance(sentences, bytes):
+        sentences = sentences.decode().split("\n")
+
+    # Dict choices make extractOne return the index too
+    return process.extractOne(text, dict(enumerate(sentences)))
 
 
 # -----------------------------------------------------------------------------
@@ -460,10 +558,14 @@ class AdaptIntentRecognizer(RhasspyActor):
     def __init__(self) -> None:
         RhasspyActor.__init__(self)
         self.engine = None
+        self.num_results = 1
         self.preload = False
 
     def to_started(self, from_state: str) -> None:
         """Transition to started state."""
+        # Number of (best) parses to consider
+        self.num_results = max(1, int(self.profile.get("intent.adapt.num_results", 1)))
+
         self.preload = self.config.get("preload", False)
         if self.preload:
             try:
@@ -497,7 +599,13 @@ class AdaptIntentRecognizer(RhasspyActor):
         """Use Adapt engine to recognize intent."""
         # Get all intents
         assert self.engine is not None, "Adapt engine not loaded"
-        intents = [intent for intent in self.engine.determine_intent(text) if intent]
+        intents = [
+            intent
+            for intent in self.engine.determine_intent(
+                text, num_results=self.num_results
+            )
+            if intent
+        ]
 
         if intents:
             # Return the best intent only
@@ -528,41 +636,63 @@ class AdaptIntentRecognizer(RhasspyActor):
     # -------------------------------------------------------------------------
 
     def load_engine(self) -> None:
-        """Configure Adapt engine if not already cached."""
+        """Load Adapt engine snapshot (or configure engine) if not already cached."""
         if self.engine is None:
-            # pylint: disable=E0401
-            from adapt.intent import IntentBuilder
-            from adapt.engine import IntentDeterminationEngine
-
             config_path = self.profile.read_path("adapt_config.json")
             if not os.path.exists(config_path):
                 return
 
-            # Create empty engine
-            self.engine = IntentDeterminationEngine()
-            assert self.engine is not None
+            snapshot_path = self.profile.read_path(
+                self.profile.get("intent.adapt.engine_snapshot", "adapt_engine.pickle")
+            )
+
+            # Snapshot must be at least as new as the configuration
+            if os.path.exists(snapshot_path) and (
+                os.path.getmtime(snapshot_path) >= os.path.getmtime(config_path)
+            ):
+                try:
+                    with open(snapshot_path, "rb") as snapshot_file:
+                        self.engine = pickle.load(snapshot_file)
+
+                    self._logger.debug("Loaded engine from snapshot %s", snapshot_path)
+                    return
+                except Exception:
+                    self._logger.exception("Failed to load %s", snapshot_path)
 
             # { intents: { ... }, entities: [ ... ] }
             with open(config_path, "r") as config_file:
                 config = json.load(config_file)
 
-            # Register entities
-            for entity_name, entity_values in config["entities"].items():
-                for value in entity_values:
-                    self.engine.register_entity(value, entity_name)
+            self.engine = make_adapt_engine(config)
+            self._logger.debug("Loaded engine from config file %s", config_path)
 
-            # Register intents
-            for intent_name, intent_config in config["intents"].items():
-                intent = IntentBuilder(intent_name)
-                for required_entity in intent_config["require"]:
-                    intent.require(required_entity)
 
-                for optional_entity in intent_config["optionally"]:
-                    intent.optionally(optional_entity)
+def make_adapt_engine(config: Dict[str, Any]):
+    """Create Adapt engine from intent/entity configuration."""
+    # pylint: disable=E0401
+    from adapt.intent import IntentBuilder
+    from adapt.engine import IntentDeterminationEngine
 
-                self.engine.register_intent_parser(intent.build())
+    # Create empty engine
+    engine = IntentDeterminationEngine()
 
-            self._logger.debug("Loaded engine from config file %s", config_path)
+    # Register entities
+    for entity_name, entity_values in config["entities"].items():
+        for value in entity_values:
+            engine.register_entity(value, entity_name)
+
+    # Register intents
+    for intent_name, intent_config in config["intents"].items():
+        intent = IntentBuilder(intent_name)
+        for required_entity in intent_config["require"]:
+            intent.require(required_entity)
+
+        for optional_entity in intent_config["optionally"]:
+            intent.optionally(optional_entity)
+
+        engine.register_intent_parser(intent.build())
+
+    return engine
 
 
 # -----------------------------------------------------------------------------
@@ -132,7 +132,9 @@ class HomeAssistantIntentHandler(RhasspyActor):
                     event_type = intent["hass_event"]["event_type"]
                     event_data = intent["hass_event"]["event_data"]
 
-                self.forward_intent(intent_name, event_type, event_data)
+                self.forward_intent(
+                    intent_name, event_type, event_data, site_id=intent.get("siteId")
+                )
             except Exception as e:
                 self._logger.exception("forward_intent")
                 intent["error"] = str(e)
@@ -154,11 +156,22 @@ class HomeAssistantIntentHandler(RhasspyActor):
         # Add a copy of the event to the intent for easier debugging
         intent["hass_event"] = {"event_type": event_type, "event_data": slots}
 
-        self.forward_intent(intent_name, event_type, slots)
+        self.forward_intent(
+            intent_name, event_type, slots, site_id=intent.get("siteId")
+        )
         return intent
 
-    def forward_intent(self, intent_name: str, event_type: str, slots: Dict[str, Any]):
-        """Forward existing event to Home Assistant."""
+    def forward_intent(
+        self,
+        intent_name: str,
+        event_type: str,
+        slots: Dict[str, Any],
+        site_id: Optional[str] = None,
+    ):
+        """Forward existing event to Home Assistant.
+
+        Speech in the response is spoken at site_id (if given).
+        """
 
         if self.handle_type == HomeAssistantHandleType.INTENT:
             # Call /api/intent/handle
@@ -180,7 +193,7 @@ class HomeAssistantIntentHandler(RhasspyActor):
             # Check for speech
             speech_text = intent.get("speech", {}).get("plain", {}).get("speech", "")
             if speech_text and self.speech_actor:
-                self.send(self.speech_actor, SpeakSentence(speech_text))
+                self.send(self.speech_actor, SpeakSentence(speech_text, siteId=site_id))
         else:
             # Send event
             post_url = urljoin(self.hass_config["url"], "api/events/" + event_type)
@@ -273,7 +286,10 @@ class RemoteIntentHandler(RhasspyActor):
                 speech = intent.get("speech", {})
                 speech_text = speech.get("text", "")
                 if speech_text and self.speech_actor:
-                    self.send(self.speech_actor, SpeakSentence(speech_text))
+                    self.send(
+                        self.speech_actor,
+                        SpeakSentence(speech_text, siteId=message.intent.get("siteId")),
+                    )
             except Exception as e:
                 self._logger.exception("in_started")
                 intent["error"] = str(e)
@@ -346,7 +362,10 @@ class CommandIntentHandler(RhasspyActor):
                 speech = intent.get("speech", {})
                 speech_text = speech.get("text", "")
                 if speech_text and self.speech_actor:
-                    self.send(self.speech_actor, SpeakSentence(speech_text))
+                    self.send(
+                        self.speech_actor,
+                        SpeakSentence(speech_text, siteId=message.intent.get("siteId")),
+                    )
             except Exception as e:
                 self._logger.exception("in_started")
                 intent["error"] = str(e)
@@ -1,16 +1,25 @@
 """Training for intent recognizers."""
+import itertools
 import json
 import os
+import pickle
 import subprocess
-import tempfile
 from collections import Counter, defaultdict
 from io import StringIO
-from typing import Any, Callable, Dict, List, Set, Type
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Type
 from urllib.parse import urljoin
 
 from rhasspy.actor import RhasspyActor
 from rhasspy.events import IntentTrainingComplete, IntentTrainingFailed, TrainIntent
-from rhasspy.utils import make_sentences_by_intent, load_converters
+from rhasspy.intent import make_adapt_engine
+from rhasspy.profiles import Profile
+from rhasspy.utils import (
+    ExamplesIndex,
+    close_converters,
+    iter_sentences_by_intent,
+    load_converters,
+    make_sentences_by_intent,
+)
 
 # -----------------------------------------------------------------------------
 
@@ -66,6 +75,16 @@ def get_intent_trainer_class(
     return DummyIntentTrainer
 
 
+def get_sample_kwargs(profile: Profile) -> Dict[str, Optional[int]]:
+    """Get arguments for sampling training sentences (0 means all sentences)."""
+    return {
+        "num_samples": profile.get("training.intent.num_samples", 0) or None,
+        "samples_per_intent": (
+            profile.get("training.intent.samples_per_intent", 0) or None
+        ),
+    }
+
+
 # -----------------------------------------------------------------------------
 
 
@@ -107,6 +126,10 @@ class FuzzyWuzzyIntentTrainer(RhasspyActor):
         # Load user-defined converters
         self.converters = load_converters(self.profile)
 
+    def to_stopped(self, from_state: str) -> None:
+        """Transition to stopped state."""
+        close_converters(self.converters)
+
     def in_started(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in started state."""
         if isinstance(message, TrainIntent):
@@ -118,19 +141,35 @@ class FuzzyWuzzyIntentTrainer(RhasspyActor):
                 self.send(message.receiver or sender, IntentTrainingFailed(repr(e)))
 
     def train(self, intent_graph) -> None:
-        """Save examples to JSON file."""
+        """Save examples to JSON lines file."""
         examples_path = self.profile.write_path(
-            self.profile.get("intent.fuzzywuzzy.examples_json")
+            self.profile.get(
+                "intent.fuzzywuzzy.examples_jsonl", "intent_examples.jsonl"
+            )
         )
 
-        sentences_by_intent = make_sentences_by_intent(
-            intent_graph, extra_converters=self.converters
+        sentences = iter_sentences_by_intent(
+            intent_graph,
+            extra_converters=self.converters,
+            **get_sample_kwargs(self.profile),
         )
+
+        # Write one compact example per line (sentences are grouped by intent)
         with open(examples_path, "w") as examples_file:
-            json.dump(sentences_by_intent, examples_file, indent=4)
+            for _, intent_sent in sentences:
+                print(
+                    json.dumps(intent_sent, separators=(",", ":")), file=examples_file
+                )
 
         self._logger.debug("Wrote intent examples to %s", examples_path)
 
+        # Index match strings for the recognizer
+        index_path = self.profile.write_path(
+            self.profile.get("intent.fuzzywuzzy.examples_index", "intent_examples.idx")
+        )
+
+        ExamplesIndex.build(examples_path, index_path).close()
+
 
 # -----------------------------------------------------------------------------
 # Rasa NLU Intent Trainer (HTTP API)
@@ -149,6 +188,10 @@ class RasaIntentTrainer(RhasspyActor):
         # Load user-defined converters
         self.converters = load_converters(self.profile)
 
+    def to_stopped(self, from_state: str) -> None:
+        """Transition to stopped state."""
+        close_converters(self.converters)
+
     def in_started(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in started state."""
         if isinstance(message, TrainIntent):
@@ -178,119 +221,132 @@ class RasaIntentTrainer(RhasspyActor):
         )
 
         # Build Markdown sentences
-        sentences_by_intent = make_sentences_by_intent(
-            intent_graph, extra_converters=self.converters
+        sentences = iter_sentences_by_intent(
+            intent_graph,
+            extra_converters=self.converters,
+            **get_sample_kwargs(self.profile),
         )
 
         # Write to YAML/Markdown file
         with open(examples_md_path, "w") as examples_md_file:
-            for intent_name, intent_sents in sentences_by_intent.items():
+            for intent_name, intent_sents in itertools.groupby(
+                sentences, key=lambda s: s[0]
+            ):
                 # Rasa Markdown training format
                 print(f"## intent:{intent_name}", file=examples_md_file)
-                for intent_sent in intent_sents:
-                    raw_index = 0
-                    index_entity = {e["raw_start"]: e for e in intent_sent["entities"]}
-                    entity = None
-                    sentence_tokens = []
-                    entity_tokens = []
-                    for raw_token in intent_sent["raw_tokens"]:
-                        token = raw_token
-                        if entity and (raw_index >= entity["raw_end"]):
-                            # Finish current entity
-                            last_token = entity_tokens[-1]
-                            entity_tokens[-1] = f"{last_token}]({entity['entity']})"
-                            sentence_tokens.extend(entity_tokens)
-                            entity = None
-                            entity_tokens = []
-
-                        new_entity = index_entity.get(raw_index)
-                        if new_entity:
-                            # Begin new entity
-                            assert entity is None, "Unclosed entity"
-                            entity = new_entity
-                            entity_tokens = []
-                            token = f"[{token}"
-
-                        if entity:
-                            # Add to current entity
-                            entity_tokens.append(token)
-                        else:
-                            # Add directly to sentence
-                            sentence_tokens.append(token)
-
-                        raw_index += len(raw_token) + 1
-
-                    if entity:
-                        # Finish final entity
-                        last_token = entity_tokens[-1]
-                        entity_tokens[-1] = f"{last_token}]({entity['entity']})"
-                        sentence_tokens.extend(entity_tokens)
-
+                for _, intent_sent in intent_sents:
                     # Print single example
-                    print("-", " ".join(sentence_tokens), file=examples_md_file)
+                    example = self._get_markdown_example(intent_sent)
+                    print("-", example, file=examples_md_file)
 
                 # Newline between intents
                 print("", file=examples_md_file)
 
-        # Create training YAML file
-        with tempfile.NamedTemporaryFile(
-            suffix=".json", mode="w+", delete=False
-        ) as training_file:
-
-            training_config = StringIO()
-            training_config.write(f'language: "{language}"\n')
-            training_config.write('pipeline: "pretrained_embeddings_spacy"\n')
-
-            # Write markdown directly into YAML.
-            # Because reasons.
-            with open(examples_md_path, "r") as examples_md_file:
-                blank_line = False
-                for line in examples_md_file:
-                    line = line.strip()
-                    if line:
-                        if blank_line:
-                            print("", file=training_file)
-                            blank_line = False
-
-                        print(f"  {line}", file=training_file)
-                    else:
-                        blank_line = True
-
-            # Do training via HTTP API
-            training_url = urljoin(url, "model/train")
-            training_file.seek(0)
-            with open(training_file.name, "rb") as training_data:
-
-                training_body = {
-                    "config": training_config.getvalue(),
-                    "nlu": training_data.read().decode("utf-8"),
-                }
-                training_config.close()
-
-                response = requests.post(
-                    training_url,
-                    data=json.dumps(training_body),
-                    params=json.dumps({"project": project_name}),
-                    headers={"Content-Type": "application/json"},
-                )
+        training_config = (
+            f'language: "{language}"\n' + 'pipeline: "pretrained_embeddings_spacy"\n'
+        )
 
-            self._logger.debug("POSTed training data to %s", training_url)
+        # Do training via HTTP API.
+        # Body is streamed from the Markdown file (chunked transfer encoding).
+        training_url = urljoin(url, "model/train")
+        response = requests.post(
+            training_url,
+            data=self._iter_training_body(training_config, examples_md_path),
+            params=json.dumps({"project": project_name}),
+            headers={"Content-Type": "application/json"},
+        )
 
-            try:
-                response.raise_for_status()
-
-                model_dir = rasa_config.get("model_dir", "")
-                model_file = os.path.join(model_dir, response.headers["filename"])
-                self._logger.debug("Received model %s", model_file)
-
-                # Replace model
-                model_url = urljoin(url, "model")
-                requests.put(model_url, json={"model_file": model_file})
-            except Exception:
-                # Rasa gives quite helpful error messages, so extract them from the response.
-                raise Exception(
-                    f'{response.reason}: {json.loads(response.content)["message"]}'
-                )
+        self._logger.debug("POSTed training data to %s", training_url)
+
+        try:
+            response.raise_for_status()
+
+            model_dir = rasa_config.get("model_dir", "")
+            model_file = os.path.join(model_dir, response.headers["filename"])
+            self._logger.debug("Received model %s", model_file)
+
+            # Replace model
+            model_url = urljoin(url, "model")
+            requests.put(model_url, json={"model_file": model_file})
+        except Exception:
+            # Rasa gives quite helpful error messages, so extract them from the response.
+            raise Exception(
+                f'{response.reason}: {json.loads(response.content)["message"]}'
+            )
+
+    def _iter_training_body(
+        self, training_config: str, examples_md_path: str, chunk_size: int = 64 * 1024
+    ) -> Iterable[bytes]:
+        """Generate JSON training request with Markdown examples in chunks."""
+        chunk = StringIO()
+        chunk.write('{"config": ')
+        chunk.write(json.dumps(training_config))
+        chunk.write(', "nlu": "')
+
+        # Write markdown directly into YAML.
+        # Because reasons.
+        with open(examples_md_path, "r") as examples_md_file:
+            blank_line = False
+            for line in examples_md_file:
+                line = line.strip()
+                if line:
+                    if blank_line:
+                        chunk.write("\\n")
+                        blank_line = False
+
+                    # Escape line as JSON string contents
+                    chunk.write(json.dumps(f"  {line}\n")[1:-1])
+                else:
+                    blank_line = True
+
+                if chunk.tell() >= chunk_size:
+                    yield chunk.getvalue().encode()
+                    chunk = StringIO()
+
+        chunk.write('"}')
+        yield chunk.getvalue().encode()
+
+    def _get_markdown_example(self, intent_sent: Dict[str, Any]) -> str:
+        """Format a single example with [value](entity) annotations."""
+        raw_index = 0
+        index_entity = {e["raw_start"]: e for e in intent_sent["entities"]}
+        entity = None
+        sentence_tokens: List[str] = []
+        entity_tokens: List[str] = []
+        for raw_token in intent_sent["raw_tokens"]:
+            token = raw_token
+            if entity and (raw_index >= entity["raw_end"]):
+                # Finish current entity
+                last_token = entity_tokens[-1]
+                entity_tokens[-1] = f"{last_token}]({entity['entity']})"
+                sentence_tokens.extend(entity_tokens)
+                entity = None
+                entity_tokens = []
+
+            new_entity = index_entity.get(raw_index)
+            if new_entity:
+                # Begin new entity
+                assert entity is None, "Unclosed entity"
+                entity = new_entity
+                entity_tokens = []
+                token = f"[{token}"
+
+            if entity:
+                # Add to current entity
+                entity_tokens.append(token)
+            else:
+                # Add directly to sentence
+                sentence_tokens.append(token)
+
+            raw_index += len(raw_token) + 1
+
+        if entity:
+            # Finish final entity
+            last_token = entity_tokens[-1]
+            entity_tokens[-1] = f"{last_token}]({entity['entity']})"
+            sentence_tokens.extend(entity_tokens)
+
+        return " ".join(sentence_tokens)
 
 
 # -----------------------------------------------------------------------------
@@ -310,6 +366,10 @@ class AdaptIntentTrainer(RhasspyActor):
         # Load user-defined converters
         self.converters = load_converters(self.profile)
 
+    def to_stopped(self, from_state: str) -> None:
+        """Transition to stopped state."""
+        close_converters(self.converters)
+
     def in_started(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in started state."""
         if isinstance(message, TrainIntent):
@@ -331,16 +391,20 @@ class AdaptIntentTrainer(RhasspyActor):
             with open(stop_words_path, "r") as stop_words_file:
                 stop_words = {line.strip() for line in stop_words_file if line.strip()}
 
-        # { intent: [ { 'text': ..., 'entities': { ... } }, ... ] }
-        sentences_by_intent = make_sentences_by_intent(
-            intent_graph, extra_converters=self.converters
+        # (intent, { 'text': ..., 'entities': { ... } }) grouped by intent
+        sentences = iter_sentences_by_intent(
+            intent_graph,
+            extra_converters=self.converters,
+            **get_sample_kwargs(self.profile),
         )
 
         # Generate intent configuration
         entities: Dict[str, Set[str]] = {}
         intents: Dict[str, Dict[str, Any]] = {}
 
-        for intent_name, intent_sents in sentences_by_intent.items():
+        for intent_name, intent_sents in itertools.groupby(
+            sentences, key=lambda s: s[0]
+        ):
             intent: Dict[str, Any] = {
                 "name": intent_name,
                 "require": [],
@@ -352,7 +416,9 @@ class AdaptIntentTrainer(RhasspyActor):
             entity_counts: Dict[str, int] = Counter()
 
             # Process sentences for this intent
-            for intent_sent in intent_sents:
+            num_sentences = 0
+            for _, intent_sent in intent_sents:
+                num_sentences += 1
                 entity_tokens: Set[str] = set()
 
                 # Group slot values by entity
@@ -382,8 +448,6 @@ class AdaptIntentTrainer(RhasspyActor):
                     word_counts[word] += 1
 
             # Decide on required vs. optional for words and entities
-            num_sentences = len(intent_sents)
-
             required_words = set()
             optional_words = set()
             for word, count in word_counts.items():
@@ -434,6 +498,17 @@ class AdaptIntentTrainer(RhasspyActor):
 
         self._logger.debug("Wrote adapt configuration to %s", config_path)
 
+        # Save ready-to-load engine for recognizer
+        snapshot_path = self.profile.write_path(
+            self.profile.get("intent.adapt.engine_snapshot", "adapt_engine.pickle")
+        )
+
+        engine = make_adapt_engine(config)
+        with open(snapshot_path, "wb") as snapshot_file:
+            pickle.dump(engine, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._logger.debug("Wrote adapt engine snapshot to %s", snapshot_path)
+
 
 # -----------------------------------------------------------------------------
 # Command-line Based Intent Trainer
@@ -463,6 +538,10 @@ class CommandIntentTrainer(RhasspyActor):
 
         self.command = [program] + arguments
 
+    def to_stopped(self, from_state: str) -> None:
+        """Transition to stopped state."""
+        close_converters(self.converters)
+
     def in_started(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in started state."""
         if isinstance(message, TrainIntent):
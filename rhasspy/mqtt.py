@@ -1,11 +1,13 @@
 """Support for MQTT input/output."""
+import base64
 import json
+import os
 import socket
 import threading
 import time
-from collections import defaultdict
-from queue import Queue
-from typing import Any, Dict, List
+from collections import OrderedDict
+from queue import Empty, Queue
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar, Union
 
 import pydash
 
@@ -18,6 +20,9 @@ from rhasspy.events import (
     MqttSubscribe,
 )
 
+# Queued messages on these topics are dropped after mqtt.outbox.expire_sec
+OUTBOX_EXPIRE_TOPICS = ["hermes/intent/#", "hermes/audioServer/+/playBytes/#"]
+
 # -----------------------------------------------------------------------------
 # Events
 # -----------------------------------------------------------------------------
@@ -29,6 +34,89 @@ class MessageReady:
     pass
 
 
+# -----------------------------------------------------------------------------
+# Subscriptions
+# -----------------------------------------------------------------------------
+
+T = TypeVar("T")
+
+
+class TopicTrie(Generic[T]):
+    """Maps MQTT topic filters (with + and # wildcards) to receivers."""
+
+    MAX_CACHED_TOPICS = 1024
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "TopicTrie[T]"] = {}
+        self.receivers: List[T] = []
+
+        # topic -> matching receivers (root only)
+        self.cache: Dict[str, List[T]] = {}
+        self.topic_filters: List[str] = []
+
+    def add(self, topic_filter: str, receiver: T) -> bool:
+        """Add receiver for topic filter. Returns True if filter is new."""
+        node = self
+        for level in topic_filter.split("/"):
+            node = node.children.setdefault(level, TopicTrie())
+
+        node.receivers.append(receiver)
+        self.cache.clear()
+
+        if topic_filter in self.topic_filters:
+            return False
+
+        self.topic_filters.append(topic_filter)
+        return True
+
+    def match(self, topic: str) -> List[T]:
+        """Get receivers for all filters that match a topic."""
+        receivers = self.cache.get(topic)
+        if receivers is None:
+            receivers = []
+            levels = topic.split("/")
+
+            # Wildcards don't match topics like $SYS
+            self._match(levels, 0, receivers, levels[0].startswith("$"))
+
+            # Deliver once per receiver even if several filters match
+            receivers = list(dict.fromkeys(receivers))
+
+            if len(self.cache) >= TopicTrie.MAX_CACHED_TOPICS:
+                self.cache.clear()
+
+            self.cache[topic] = receivers
+
+        return receivers
+
+    def _match(
+        self,
+        levels: List[str],
+        index: int,
+        receivers: List[T],
+        no_wildcards: bool = False,
+    ) -> None:
+        """Collect receivers below this node that match remaining levels."""
+        if not no_wildcards:
+            # Multi-level wildcard matches parent and all children
+            multi_node = self.children.get("#")
+            if multi_node is not None:
+                receivers.extend(multi_node.receivers)
+
+        if index >= len(levels):
+            receivers.extend(self.receivers)
+            return
+
+        child = self.children.get(levels[index])
+        if child is not None:
+            child._match(levels, index + 1, receivers)
+
+        if not no_wildcards:
+            single_node = self.children.get("+")
+            if single_node is not None:
+                single_node._match(levels, index + 1, receivers)
+
+
 # -----------------------------------------------------------------------------
 # Interoperability with Snips.AI Hermes protocol
 # https://docs.snips.ai/reference/hermes
@@ -42,9 +130,12 @@ class HermesMqtt(RhasspyActor):
         RhasspyActor.__init__(self)
         self.client = None
         self.connected = False
-        self.subscriptions: Dict[str, List[RhasspyActor]] = defaultdict(list)
-        self.publications: Dict[str, List[bytes]] = defaultdict(list)
+        self.subscriptions: TopicTrie[RhasspyActor] = TopicTrie()
         self.message_queue: Queue = Queue()
+
+        # True if a MessageReady is waiting to be handled
+        self.message_ready = False
+        self.message_ready_lock = threading.Lock()
         self.site_ids: List[str] = []
         self.site_id = "default"
         self.host = "localhost"
@@ -52,8 +143,23 @@ class HermesMqtt(RhasspyActor):
         self.username = ""
         self.password = None
         self.reconnect_sec = 5
+        self.reconnect_max_sec = 60
+        self.qos = 0
         self.publish_intents = True
         self.tls = {"enabled": False}
+        self.enabled = False
+
+        # (topic, payload) -> time queued for messages waiting on a connection
+        self.outbox: "OrderedDict[Tuple[str, bytes], float]" = OrderedDict()
+        self.outbox_max_messages = 1000
+        self.outbox_expire_sec = 30.0
+        self.outbox_path = ""
+        self.outbox_dropped = 0
+
+        # Topics whose queued messages are only useful for a short time
+        self.outbox_expire_topics: TopicTrie[bool] = TopicTrie()
+        for topic_filter in OUTBOX_EXPIRE_TOPICS:
+            self.outbox_expire_topics.add(topic_filter, True)
 
     # -------------------------------------------------------------------------
 
@@ -71,18 +177,36 @@ class HermesMqtt(RhasspyActor):
         self.username = self.profile.get("mqtt.username", "")
         self.password = self.profile.get("mqtt.password", None)
         self.reconnect_sec = self.profile.get("mqtt.reconnect_sec", 5)
+        self.reconnect_max_sec = self.profile.get("mqtt.reconnect_max_sec", 60)
+        self.qos = int(self.profile.get("mqtt.qos", 0))
         self.publish_intents = self.profile.get("mqtt.publish_intents", True)
         self.tls = self.profile.get("mqtt.tls", {"enabled": False})
+        self.enabled = self.profile.get("mqtt.enabled", False)
+
+        if self.enabled:
+            self.outbox_max_messages = int(
+                self.profile.get("mqtt.outbox.max_messages", 1000)
+            )
+            self.outbox_expire_sec = float(
+                self.profile.get("mqtt.outbox.expire_sec", 30)
+            )
+            outbox_path = self.profile.get("mqtt.outbox.path", "mqtt_outbox.jsonl")
+            if outbox_path:
+                self.outbox_path = self.profile.write_path(outbox_path)
+                self.load_outbox()
 
-        if self.profile.get("mqtt.enabled", False):
             self.transition("connecting")
 
     def in_started(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in started state."""
-        self.save_for_later(message, sender)
+        self.handle_any(message, sender)
 
     def to_connecting(self, from_state: str) -> None:
         """Transition to connecting state."""
+        if self.client is not None:
+            # Client will reconnect in its own thread
+            return
+
         import paho.mqtt.client as mqtt
 
         self.client = mqtt.Client()
@@ -117,35 +241,15 @@ class HermesMqtt(RhasspyActor):
             self._logger.debug("Logging in as %s", self.username)
             self.client.username_pw_set(self.username, self.password)
 
-        self._logger.debug("Connecting to MQTT broker %s:%s", self.host, self.port)
+        # Exponential backoff between reconnect attempts
+        min_delay = max(1, int(self.reconnect_sec))
+        max_delay = max(min_delay, int(self.reconnect_max_sec))
+        self.client.reconnect_delay_set(min_delay=min_delay, max_delay=max_delay)
 
-        def do_connect():
-            success = False
-            while not success:
-                try:
-                    ret = self.client.connect(self.host, self.port)
-                    self.client.loop_start()
-                    while (ret != 0) and (self.reconnect_sec > 0):
-                        self._logger.warning("Connection failed: %s", ret)
-                        self._logger.debug(
-                            "Reconnecting in %s second(s)", self.reconnect_sec
-                        )
-                        time.sleep(self.reconnect_sec)
-                        ret = self.client.connect(self.host, self.port)
-
-                    success = True
-                except Exception:
-                    self._logger.exception("connecting")
-                    if self.reconnect_sec > 0:
-                        self._logger.debug(
-                            "Reconnecting in %s second(s)", self.reconnect_sec
-                        )
-                        time.sleep(self.reconnect_sec)
-
-            self._logger.debug("Connection successful.")
-
-        # Connect in a separate thread
-        threading.Thread(target=do_connect, daemon=True).start()
+        # Connect and reconnect in the client's network thread
+        self._logger.debug("Connecting to MQTT broker %s:%s", self.host, self.port)
+        self.client.connect_async(self.host, self.port)
+        self.client.loop_start()
 
     def in_connecting(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in connecting."""
@@ -153,88 +257,191 @@ class HermesMqtt(RhasspyActor):
             self.connected = True
             self.transition("connected")
         elif isinstance(message, MqttDisconnected):
-            if self.reconnect_sec > 0:
-                self._logger.debug("Reconnecting in %s second(s)", self.reconnect_sec)
-                time.sleep(self.reconnect_sec)
-                self.transition("started")
+            self._logger.debug(
+                "Reconnecting in at most %s second(s)", self.reconnect_max_sec
+            )
         else:
-            self.save_for_later(message, sender)
+            self.handle_any(message, sender)
 
     def to_connected(self, from_state: str) -> None:
         """Transition to connected state."""
         assert self.client is not None
         # Subscribe to topics
-        for topic in self.subscriptions:
-            self.client.subscribe(topic)
+        for topic in self.subscriptions.topic_filters:
+            self.client.subscribe(topic, qos=self.qos)
             self._logger.debug("Subscribed to %s", topic)
 
         # Publish outstanding messages
-        for topic, payloads in self.publications.items():
-            for payload in payloads:
-                self.client.publish(topic, payload)
-
-        self.publications.clear()
+        if self.outbox:
+            self._logger.debug("Publishing %s queued message(s)", len(self.outbox))
+            outbox = self.outbox
+            self.outbox = OrderedDict()
+            for (topic, payload), queue_time in outbox.items():
+                if not self.is_expired(topic, queue_time):
+                    self.publish(topic, payload)
+
+        if self.outbox_dropped > 0:
+            self._logger.warning(
+                "Dropped %s message(s) while disconnected", self.outbox_dropped
+            )
+            self.outbox_dropped = 0
 
     def in_connected(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in connected state."""
         if isinstance(message, MqttDisconnected):
-            if self.reconnect_sec > 0:
-                self._logger.debug("Reconnecting in %s second(s)", self.reconnect_sec)
-                time.sleep(self.reconnect_sec)
-                self.transition("started")
-            else:
-                self.transition("connecting")
-        elif isinstance(message, MessageReady):
-            while not self.message_queue.empty():
-                mqtt_message = self.message_queue.get()
-                for receiver in self.subscriptions[mqtt_message.topic]:
-                    self.send(receiver, mqtt_message)
-        elif self.connected:
-            from rhasspy.intent import IntentRecognized
-
-            assert self.client is not None
-            if isinstance(message, MqttSubscribe):
-                receiver = message.receiver or sender
-                self.subscriptions[message.topic].append(receiver)
-                self.client.subscribe(message.topic)
-                self._logger.debug("Subscribed to %s", message.topic)
-            elif isinstance(message, MqttPublish):
-                self.client.publish(message.topic, message.payload)
-            elif isinstance(message, IntentRecognized):
-                if self.publish_intents:
-                    self.publish_intent(message.intent)
+            self.connected = False
+            self.transition("connecting")
         else:
-            self.save_for_later(message, sender)
+            self.handle_any(message, sender)
 
     def to_stopped(self, from_state: str) -> None:
         """Transition to stopped state."""
         if self.client is not None:
             self.connected = False
             self._logger.debug("Stopping MQTT client")
+            self.client.disconnect()
             self.client.loop_stop()
             self.client = None
 
+        self.save_outbox()
+
     # -------------------------------------------------------------------------
 
-    def save_for_later(self, message: Any, sender: RhasspyActor) -> None:
-        """Cache message until connected."""
-        if isinstance(message, MqttSubscribe):
+    def handle_any(self, message: Any, sender: RhasspyActor) -> None:
+        """Handle messages in any state."""
+        if isinstance(message, MessageReady):
+            with self.message_ready_lock:
+                self.message_ready = False
+
+            # Drain all messages that arrived since the last wakeup
+            while True:
+                try:
+                    mqtt_message = self.message_queue.get_nowait()
+                except Empty:
+                    break
+
+                for receiver in self.subscriptions.match(mqtt_message.topic):
+                    self.send(receiver, mqtt_message)
+        elif isinstance(message, MqttSubscribe):
             receiver = message.receiver or sender
-            self.subscriptions[message.topic].append(receiver)
+            is_new_topic = self.subscriptions.add(message.topic, receiver)
+            if self.connected and is_new_topic:
+                assert self.client is not None
+                self.client.subscribe(message.topic, qos=self.qos)
+                self._logger.debug("Subscribed to %s", message.topic)
         elif isinstance(message, MqttPublish):
-            self.publications[message.topic].append(message.payload)
+            self.publish(message.topic, message.payload)
+        else:
+            from rhasspy.intent import IntentRecognized
+
+            if isinstance(message, IntentRecognized):
+                if self.publish_intents:
+                    self.publish_intent(message.intent)
+
+    def publish(
+        self, topic: str, payload: Union[str, bytes], queue_time: Optional[float] = None
+    ) -> None:
+        """Publish message now or queue it until connected. Never blocks."""
+        if not self.enabled:
+            return
+
+        if isinstance(payload, str):
+            payload = payload.encode()
+
+        if self.connected and (self.client is not None):
+            # Only queues the message for the client's network thread
+            info = self.client.publish(topic, payload, qos=self.qos)
+            if info.rc == 0:
+                return
+
+            self._logger.debug("Queueing message for %s (rc=%s)", topic, info.rc)
+
+        # Identical messages are only sent once
+        key = (topic, payload)
+        if key in self.outbox:
+            self.outbox.move_to_end(key)
+
+        self.outbox[key] = time.time() if queue_time is None else queue_time
+        while len(self.outbox) > self.outbox_max_messages:
+            # Drop oldest message
+            self.outbox.popitem(last=False)
+            self.outbox_dropped += 1
+
+    def load_outbox(self) -> None:
+        """Load messages saved while disconnected."""
+        if not os.path.exists(self.outbox_path):
+            return
+
+        try:
+            with open(self.outbox_path, "r") as outbox_file:
+                for line in outbox_file:
+                    line = line.strip()
+                    if line:
+                        message = json.loads(line)
+                        queue_time = message.get("time", 0)
+                        if not self.is_expired(message["topic"], queue_time):
+                            self.publish(
+                                message["topic"],
+                                base64.b64decode(message["payload"]),
+                                queue_time=queue_time,
+                            )
+
+            os.unlink(self.outbox_path)
+            self._logger.debug(
+                "Loaded %s queued message(s) from %s",
+                len(self.outbox),
+                self.outbox_path,
+            )
+        except Exception:
+            self._logger.exception("load_outbox")
+
+    def is_expired(self, topic: str, queue_time: float) -> bool:
+        """True if a queued message is too old to be worth publishing."""
+        if (time.time() - queue_time) < self.outbox_expire_sec:
+            return False
+
+        if self.outbox_expire_topics.match(topic):
+            self.outbox_dropped += 1
+            return True
+
+        return False
+
+    def save_outbox(self) -> None:
+        """Save messages that were never published."""
+        if not (self.outbox_path and self.outbox):
+            return
+
+        try:
+            with open(self.outbox_path, "w") as outbox_file:
+                for (topic, payload), queue_time in self.outbox.items():
+                    message = {
+                        "topic": topic,
+                        "payload": base64.b64encode(payload).decode(),
+                        "time": queue_time,
+                    }
+                    print(json.dumps(message), file=outbox_file)
+
+            self._logger.debug(
+                "Saved %s queued message(s) to %s", len(self.outbox), self.outbox_path
+            )
+        except Exception:
+            self._logger.exception("save_outbox")
 
     # -------------------------------------------------------------------------
 
     def on_connect(self, client, userdata, flags, rc):
         """Callback when connected to broker."""
         try:
+            if rc != 0:
+                self._logger.warning("Connection failed: %s", rc)
+                return
+
             self._logger.info("Connected to %s:%s", self.host, self.port)
             self.send(self.myAddress, MqttConnected())
         except Exception:
             self._logger.exception("on_connect")
 
-    def on_disconnect(self, client, userdata, flags, rc):
+    def on_disconnect(self, client, userdata, rc):
         """Callback when disconnected from broker."""
         try:
             self._logger.warning("Disconnected")
@@ -247,6 +454,14 @@ class HermesMqtt(RhasspyActor):
         """Callback when message received."""
         try:
             self.message_queue.put(MqttMessage(msg.topic, msg.payload))
+
+            # Only wake up actor once per batch of messages
+            with self.message_ready_lock:
+                if self.message_ready:
+                    return
+
+                self.message_ready = True
+
             self.send(self.myAddress, MessageReady())
         except Exception:
             self._logger.exception("on_message")
@@ -258,8 +473,6 @@ class HermesMqtt(RhasspyActor):
         intent_name = pydash.get(intent, "intent.name", "")
         not_recognized = len(intent_name) == 0
 
-        assert self.client is not None
-
         if not_recognized:
             # Publish using Hermes protocol
             topic = "hermes/nlu/intentNotRecognized"
@@ -270,7 +483,7 @@ class HermesMqtt(RhasspyActor):
             payload = json.dumps(
                 {ev["entity"]: ev["value"] for ev in intent["entities"]}
             )
-            self.client.publish(topic, payload)
+            self.publish(topic, payload)
 
             # Publish using Hermes protocol
             topic = f"hermes/intent/{intent_name}"
@@ -295,9 +508,9 @@ class HermesMqtt(RhasspyActor):
                     "asrTokens": [],
                     "asrConfidence": 1,
                 }
-            ).encode()
+            )
 
-        self.client.publish(topic, payload)
+        self.publish(topic, payload)
         self._logger.debug("Published intent to %s", topic)
 
     # -------------------------------------------------------------------------
@@ -1,7 +1,8 @@
 """Settings for Rhasspy."""
 import logging
 import os
-from typing import Any, Dict, List
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
 
 import json5
 import pydash
@@ -12,6 +13,9 @@ from rhasspy.utils import recursive_update
 
 logger = logging.getLogger(__name__)
 
+# Marks settings that are not in the profile
+_MISSING = object()
+
 
 class Profile:
     """Contains all settings for Rhasspy."""
@@ -29,6 +33,13 @@ class Profile:
         self.user_profiles_dir = user_profiles_dir
         self.profiles_dirs: List[str] = [user_profiles_dir, system_profiles_dir]
         self.layers: str = layers
+
+        # setting path -> value (or _MISSING)
+        self._settings: Dict[str, Any] = {}
+
+        # setting path -> number of reads (when counting)
+        self.read_counts: Optional[Counter] = None
+
         self.load_profile()
 
     # -------------------------------------------------------------------------
@@ -45,11 +56,60 @@ class Profile:
 
     def get(self, path: str, default: Any = None) -> Any:
         """Get setting by path."""
-        return pydash.get(self.json, path, default)
+        if self.read_counts is not None:
+            self.read_counts[path] += 1
+
+        try:
+            value = self._settings[path]
+        except KeyError:
+            value = self._lookup(path)
+            self._settings[path] = value
+
+        if value is _MISSING:
+            return default
+
+        return value
 
     def set(self, path: str, value: Any) -> None:
         """Set setting by path."""
         pydash.set_(self.json, path, value)
+        self._settings.clear()
+
+    def _lookup(self, path: str) -> Any:
+        """Find setting by walking dotted path through profile JSON."""
+        if ("[" in path) or ("\\" in path):
+            # Let pydash handle escapes and bracket syntax
+            return pydash.get(self.json, path, _MISSING)
+
+        value: Any = self.json
+        for key in path.split("."):
+            if isinstance(value, dict):
+                if key not in value:
+                    return _MISSING
+
+                value = value[key]
+            elif isinstance(value, list):
+                try:
+                    value = value[int(key)]
+                except (ValueError, IndexError):
+                    return _MISSING
+            else:
+                return _MISSING
+
+        return value
+
+    # -------------------------------------------------------------------------
+
+    def count_reads(self, enabled: bool = True) -> None:
+        """Start (or stop) counting how often each setting is read."""
+        self.read_counts = Counter() if enabled else None
+
+    def most_read(self, n: Optional[int] = 10) -> List[Tuple[str, int]]:
+        """Get most frequently read settings and their read counts."""
+        if self.read_counts is None:
+            return []
+
+        return self.read_counts.most_common(n)
 
     # -------------------------------------------------------------------------
 
@@ -84,6 +144,8 @@ class Profile:
                     with open(json_path, "r") as profile_file:
                         recursive_update(self.json, json5.load(profile_file))
 
+        self._settings.clear()
+
     def read_path(self, *path_parts: str) -> str:
         """Get first readable path in user then system directories."""
         for profiles_dir in self.profiles_dirs:
@@ -1,16 +1,21 @@
 """Support for guessing word pronunciations"""
 import os
-import re
 import subprocess
 import tempfile
-from collections import defaultdict
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from rhasspy.actor import RhasspyActor
 from rhasspy.events import (GetWordPhonemes, GetWordPronunciations,
                             PronunciationFailed, SpeakWord, WordPhonemes,
                             WordPronunciations, WordSpoken)
-from rhasspy.utils import load_phoneme_map, read_dict
+from rhasspy.g2p import get_g2p
+from rhasspy.utils import (
+    DictionaryIndex,
+    get_dictionary_index,
+    load_phoneme_map,
+    read_dict,
+)
 
 # -----------------------------------------------------------------------------
 # Dummy word pronouncer
@@ -21,6 +26,63 @@ class DummyWordPronounce:
     """Returns junk."""
 
 
+# -----------------------------------------------------------------------------
+
+
+class LayeredDictionary:
+    """Looks up pronunciations in custom words first, then the base dictionary."""
+
+    def __init__(
+        self,
+        custom_dict: Dict[str, List[str]],
+        base_dict: Optional[DictionaryIndex] = None,
+    ) -> None:
+        self.custom_dict = custom_dict
+        self.base_dict = base_dict
+
+    def get(self, word: str, default: Any = None) -> Any:
+        """Get custom + base pronunciations for a word or a default value."""
+        pronounces = list(self.custom_dict.get(word, []))
+        if self.base_dict is not None:
+            pronounces.extend(self.base_dict.lookup(word))
+
+        return pronounces or default
+
+    def __contains__(self, word: object) -> bool:
+        return (word in self.custom_dict) or (
+            (self.base_dict is not None) and (word in self.base_dict)
+        )
+
+
+class FileCache:
+    """Caches the result of loading a file until its modification time changes."""
+
+    def __init__(self, load: Callable[[str], Any]) -> None:
+        self.load = load
+        self.path: Optional[str] = None
+        self.mtime_ns: Optional[int] = None
+        self.value: Any = None
+
+    def get(self, path: str, default: Any = None) -> Any:
+        """Get (possibly reloaded) contents of file or a default value if missing."""
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            self.path, self.mtime_ns, self.value = None, None, None
+            return default
+
+        if (path != self.path) or (mtime_ns != self.mtime_ns):
+            self.value = self.load(path)
+            self.path, self.mtime_ns = path, mtime_ns
+
+        return self.value
+
+
+def _load_custom_words(path: str) -> Dict[str, List[str]]:
+    with open(path, "r") as dictionary_file:
+        return read_dict(dictionary_file)
+
+
 # -----------------------------------------------------------------------------
 # Phonetisaurus based word pronouncer
 # https://github.com/AdolfVonKleist/Phonetisaurus
@@ -33,9 +95,15 @@ class PhonetisaurusPronounce(RhasspyActor):
     def __init__(self) -> None:
         RhasspyActor.__init__(self)
         self.speed = 80  # wpm for speaking
-        self.base_dict: Optional[Dict[str, List[str]]] = None
+        self.base_dict: Optional[DictionaryIndex] = None
+        self.custom_words = FileCache(_load_custom_words)
+        self.phoneme_map = FileCache(load_phoneme_map)
         self.speech_system: str = ""
 
+        # (word, voice) -> eSpeak phonemes
+        self.espeak_cache: "OrderedDict[Tuple[str, Optional[str]], str]" = OrderedDict()
+        self.espeak_cache_size = 1024
+
     def to_started(self, from_state: str) -> None:
         """Transition to started state"""
         self.speech_system = self.profile.get("speech_to_text.system", "pocketsphinx")
@@ -97,7 +165,7 @@ class PhonetisaurusPronounce(RhasspyActor):
             self.profile.get(f"speech_to_text.{self.speech_system}.phoneme_map")
         )
 
-        phoneme_map = load_phoneme_map(map_path)
+        phoneme_map = self.phoneme_map.get(map_path, {})
 
         # Convert from Sphinx to espeak phonemes
         espeak_str = "[['%s]]" % "".join(
@@ -115,55 +183,121 @@ class PhonetisaurusPronounce(RhasspyActor):
 
         self._logger.debug("Getting pronunciations for %s", words)
 
-        # Load base and custom dictionaries
-        base_dictionary_path = self.profile.read_path(
-            self.profile.get(f"speech_to_text.{self.speech_system}.base_dictionary")
-        )
-
-        # Load base dictionary once
-        if (self.base_dict is None) and os.path.exists(base_dictionary_path):
-            self.base_dict = defaultdict(list)
-            with open(base_dictionary_path, "r") as dictionary_file:
-                read_dict(dictionary_file, self.base_dict)
-
-        custom_path = self.profile.read_path(
-            self.profile.get(f"speech_to_text.{self.speech_system}.custom_words")
+        word_dict = LayeredDictionary(
+            self.custom_words.get(self._get_custom_words_path(), {}),
+            self._get_base_dict(),
         )
 
-        word_dict: Dict[str, List[str]] = defaultdict(list)
-        if os.path.exists(custom_path):
-            with open(custom_path, "r") as dictionary_file:
-                read_dict(dictionary_file, word_dict)
-
-        # Mix in base dictionary
-        if self.base_dict:
-            for word, prons in self.base_dict.items():
-                word_dict[word].extend(prons)
-        else:
+        if word_dict.base_dict is None:
             self._logger.warning("Missing base dictionary")
 
         pronunciations = self._lookup_words(words, word_dict, n)
 
         # Get phonemes from eSpeak
+        espeak_phonemes = self.get_espeak_phonemes(words)
         for word in words:
-            espeak_command = ["espeak", "-q", "-x"]
+            pronunciations[word]["phonemes"] = espeak_phonemes[word]
+
+        return pronunciations
+
+    # -------------------------------------------------------------------------
+
+    def get_espeak_phonemes(
+        self, words: List[str], voice: Optional[str] = None
+    ) -> Dict[str, str]:
+        """Get eSpeak phonemes for words with a single (batched) espeak call."""
+        voice = self._get_voice(voice)
+        phonemes: Dict[str, str] = {}
+        missing: List[str] = []
+
+        for word in words:
+            key = (word, voice)
+            espeak_str = self.espeak_cache.get(key)
+            if espeak_str is None:
+                if word not in missing:
+                    missing.append(word)
+            else:
+                self.espeak_cache.move_to_end(key)
+                phonemes[word] = espeak_str
 
-            voice = self._get_voice()
+        if missing:
+            espeak_command = ["espeak", "-q", "-x"]
             if voice is not None:
                 espeak_command.extend(["-v", voice])
 
-            espeak_command.append(word)
-
+            # One word per clause, so eSpeak prints one line of phonemes per word
             self._logger.debug(repr(espeak_command))
-            espeak_str = subprocess.check_output(espeak_command).decode().strip()
-            pronunciations[word]["phonemes"] = espeak_str
-
-        return pronunciations
+            espeak_lines = [
+                line.strip()
+                for line in subprocess.check_output(
+                    espeak_command,
+                    input="".join(f"{word}.\n" for word in missing),
+                    universal_newlines=True,
+                ).splitlines()
+                if line.strip()
+            ]
+
+            if len(espeak_lines) != len(missing):
+                # Word broke into multiple clauses; fall back to one call per word
+                self._logger.debug("Falling back to individual espeak calls")
+                espeak_lines = []
+                for word in missing:
+                    self._logger.debug(repr(espeak_command + [word]))
+                    espeak_lines.append(
+                        subprocess.check_output(espeak_command + [word])
+                        .decode()
+                        .strip()
+                    )
+
+            for word, espeak_str in zip(missing, espeak_lines):
+                phonemes[word] = espeak_str
+                self.espeak_cache[(word, voice)] = espeak_str
+
+            while len(self.espeak_cache) > self.espeak_cache_size:
+                self.espeak_cache.popitem(last=False)
+
+        return phonemes
 
     # -------------------------------------------------------------------------
 
+    def _get_base_dict(self) -> Optional[DictionaryIndex]:
+        """Open (memory-mapped) base dictionary index, reopening if it changed."""
+        base_dictionary_path = self.profile.read_path(
+            self.profile.get(f"speech_to_text.{self.speech_system}.base_dictionary")
+        )
+
+        if not os.path.exists(base_dictionary_path):
+            return None
+
+        if (self.base_dict is None) or (
+            not self.base_dict.is_current(base_dictionary_path)
+        ):
+            if self.base_dict is not None:
+                self.base_dict.close()
+
+            index_dir = self.profile.write_path(
+                self.profile.get(
+                    "speech_to_text.dictionary_index_dir", "dictionary_index"
+                )
+            )
+            self.base_dict = get_dictionary_index(base_dictionary_path, index_dir)
+
+        return self.base_dict
+
+    def _get_g2p_cache_path(self) -> str:
+        """Get path to on-disk cache of guessed pronunciations."""
+        return self.profile.write_path(
+            self.profile.get("speech_to_text.g2p_cache", "g2p_cache.jsonl")
+        )
+
+    def _get_custom_words_path(self) -> str:
+        """Get path to user's custom words."""
+        return self.profile.read_path(
+            self.profile.get(f"speech_to_text.{self.speech_system}.custom_words")
+        )
+
     def _lookup_words(
-        self, words: List[str], word_dict: Dict[str, List[str]], n: int = 5
+        self, words: List[str], word_dict: LayeredDictionary, n: int = 5
     ) -> Dict[str, Dict[str, Any]]:
         """Look up or guess word pronunciations."""
 
@@ -201,53 +335,11 @@ class PhonetisaurusPronounce(RhasspyActor):
 
             g2p_casing = self.profile.get("speech_to_text.g2p_casing", "").lower()
 
-            # Case-sensitive mapping from upper/lower cased word back to original casing
-            word_map: Dict[str, str] = {}
-
-            with tempfile.NamedTemporaryFile(mode="w+", suffix=".txt") as wordlist_file:
-                # Write words to a temporary word list file
-                for word in unknown_words:
-                    original_word = word
-                    if g2p_casing == "upper":
-                        # FST was trained with upper-case letters
-                        word = word.upper()
-                    elif g2p_casing == "lower":
-                        # FST was trained with loser-case letters
-                        word = word.lower()
-
-                    print(word, file=wordlist_file)
-                    word_map[word] = original_word
-
-                wordlist_file.seek(0)
-
-                # Output phonetisaurus results to temporary file
-                with tempfile.NamedTemporaryFile(
-                    mode="w+", suffix=".txt"
-                ) as pronounce_file:
-                    # Use phonetisaurus to guess pronunciations
-                    g2p_command = [
-                        "phonetisaurus-apply",
-                        "--model",
-                        g2p_path,
-                        "--word_list",
-                        wordlist_file.name,
-                        "--nbest",
-                        str(n),
-                    ]
-
-                    self._logger.debug(repr(g2p_command))
-                    subprocess.check_call(g2p_command, stdout=pronounce_file)
-
-                    pronounce_file.seek(0)
-
-                    # Read results
-                    ws_pattern = re.compile(r"\s+")
-
-                    for line in pronounce_file:
-                        parts = ws_pattern.split(line)
-                        word = word_map[parts[0].strip()]
-                        phonemes = " ".join(parts[1:]).strip()
-                        pronunciations[word]["pronunciations"].append(phonemes)
+            # Model is loaded once and guesses are cached (in memory and on disk)
+            g2p = get_g2p(g2p_path, cache_path=self._get_g2p_cache_path())
+            guesses = g2p.guess(unknown_words, n=n, casing=g2p_casing)
+            for word, word_prons in guesses.items():
+                pronunciations[word]["pronunciations"].extend(word_prons)
 
         return pronunciations
 
@@ -28,6 +28,7 @@ from rhasspynlu import (
     ini_jsgf,
 )
 
+from rhasspy.g2p import get_g2p
 from rhasspy.train.vocab_dict import make_dict, FORMAT_CMU, FORMAT_JULIUS
 from rhasspy.profiles import Profile
 from rhasspy.utils import (
@@ -107,6 +108,10 @@ def train_profile(profile_dir: Path, profile: Profile) -> Tuple[int, List[str]]:
     )
     grammar_dir = ppath("speech_to_text.grammars_dir", "grammars", write=True)
     fsts_dir = ppath("speech_to_text.fsts_dir", "fsts", write=True)
+    g2p_cache = ppath("speech_to_text.g2p_cache", "g2p_cache.jsonl", write=True)
+    dictionary_index_dir = ppath(
+        "speech_to_text.dictionary_index_dir", "dictionary_index", write=True
+    )
     slots_dir = ppath("speech_to_text.slots_dir", "slots", write=True)
     system_slots_dir = Path(profile.system_profiles_dir) / profile.name / "slots"
     slot_programs_dir = ppath(
@@ -119,7 +124,7 @@ def train_profile(profile_dir: Path, profile: Profile) -> Tuple[int, List[str]]:
     # -----------------------------------------------------------------------------
 
     # Create cache directories
-    for dir_path in [grammar_dir, fsts_dir]:
+    for dir_path in [grammar_dir, fsts_dir, dictionary_index_dir]:
         dir_path.mkdir(parents=True, exist_ok=True)
 
     # -----------------------------------------------------------------------------
@@ -549,7 +554,7 @@ def train_profile(profile_dir: Path, profile: Profile) -> Tuple[int, List[str]]:
             if acoustic_model_type == "julius":
                 dictionary_format = FORMAT_JULIUS
 
-            make_dict(
+            unknown = make_dict(
                 vocab,
                 dictionary_paths,
                 dictionary_file,
@@ -558,24 +563,16 @@ def train_profile(profile_dir: Path, profile: Profile) -> Tuple[int, List[str]]:
                 merge_rule=dict_merge_rule,
                 upper=(word_casing == "upper"),
                 lower=(word_casing == "lower"),
+                index_dir=dictionary_index_dir,
             )
 
-            if unknown_words.exists() and g2p_model.exists():
+            if unknown and g2p_model.exists():
                 # Generate single pronunciation guesses
                 _LOGGER.debug("Guessing pronunciations for unknown word(s)")
 
-                g2p_output = subprocess.check_output(
-                    [
-                        "phonetisaurus-apply",
-                        "--model",
-                        str(g2p_model),
-                        "--word_list",
-                        str(unknown_words),
-                        "--nbest",
-                        "1",
-                    ],
-                    universal_newlines=True,
-                )
+                # Shared model/cache, so words are not guessed again next time
+                g2p = get_g2p(g2p_model, cache_path=g2p_cache)
+                guesses = g2p.guess(unknown, n=1)
 
                 g2p_transform = lambda w: w
                 if g2p_word_casing == "upper":
@@ -586,13 +583,12 @@ def train_profile(profile_dir: Path, profile: Profile) -> Tuple[int, List[str]]:
                 # Append to dictionary and custom words
                 with open(custom_words, "a") as words_file:
                     with open(unknown_words, "w") as unknown_words_file:
-                        for line in g2p_output.splitlines():
-                            line = line.strip()
-                            word, phonemes = re.split(r"\s+", line, maxsplit=1)
-                            word = g2p_transform(word)
-                            print(word, phonemes, file=dictionary_file)
-                            print(word, phonemes, file=words_file)
-                            print(word, phonemes, file=unknown_words_file)
+                        for word in unknown:
+                            g2p_word = g2p_transform(word)
+                            for phonemes in guesses.get(word, []):
+                                print(g2p_word, phonemes, file=dictionary_file)
+                                print(g2p_word, phonemes, file=words_file)
+                                print(g2p_word, phonemes, file=unknown_words_file)
 
     @create_after(executed="vocab")
     def task_vocab_dict():
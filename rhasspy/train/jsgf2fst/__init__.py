@@ -22,7 +22,9 @@ from .DependencyListener import DependencyListener
 
 from .fstaccept import (
     fstaccept,
+    FstAcceptor,
     fstprintall,
+    iter_fst_sentences,
     symbols2intent,
     longest_path,
     filter_words,
@@ -25,14 +25,22 @@ import networkx as nx
 
 logger = logging.getLogger("fstaccept")
 
+# Input symbol that matches any word in FstAcceptor (see make_slot_acceptor)
+ANY_WORD = "__any__"
+
 
 def fstaccept(
-    in_fst: fst.Fst,
+    in_fst: Union[fst.Fst, "FstAcceptor"],
     sentence: Union[str, List[str]],
     intent_name: Optional[str] = None,
     replace_tags: bool = True,
+    max_paths: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
-    """Recognizes an intent from a sentence using a FST."""
+    """Recognizes an intent from a sentence using a FST.
+
+    Pass an FstAcceptor instead of an FST to avoid composing a new FST for
+    every sentence.
+    """
 
     if isinstance(sentence, str):
         # Assume lower case, white-space separated tokens
@@ -44,10 +52,16 @@ def fstaccept(
     intents = []
 
     try:
-        out_fst = apply_fst(words, in_fst)
+        if isinstance(in_fst, FstAcceptor):
+            out_sentences = in_fst.accept(words, max_paths=max_paths)
+        else:
+            out_fst = apply_fst(words, in_fst)
+
+            # Get output symbols (input symbols are the same after projection)
+            out_sentences = fstprintall(
+                out_fst, exclude_meta=False, substitute=True, max_paths=max_paths
+            )
 
-        # Get output symbols
-        out_sentences = fstprintall(out_fst, exclude_meta=False)
         for out_sentence in out_sentences:
             out_intent_name = intent_name
             intent = symbols2intent(
@@ -65,6 +79,119 @@ def fstaccept(
 # -----------------------------------------------------------------------------
 
 
+class FstAcceptor:
+    """Recognizes many sentences with the same intent FST.
+
+    Arcs are indexed by input label once (instead of arc-sorting for compose),
+    so each sentence is accepted with a direct walk through the FST. No linear
+    FST is compiled or composed per sentence. Output symbols are decoded once
+    up front.
+
+    Arcs whose input is any_word match every word (like a sigma matcher), and
+    output the word itself if their output is also any_word.
+    """
+
+    def __init__(
+        self, intent_fst: fst.Fst, eps: str = "<eps>", any_word: str = ANY_WORD
+    ) -> None:
+        self.intent_fst = intent_fst
+        self.eps = eps
+        self.any_word = any_word
+        self.input_symbols = intent_fst.input_symbols()
+        self.start = intent_fst.start()
+
+        in_eps = self.input_symbols.find(eps)
+        in_any = self.input_symbols.find(any_word)
+        zero_weight = fst.Weight.Zero(intent_fst.weight_type())
+
+        # Output label -> symbol (missing for <eps>)
+        out_words = _decode_symbols(intent_fst.output_symbols(), eps)
+
+        # state -> input label -> [(output symbol, next state)]
+        self.arcs: Dict[int, Dict[int, List[Tuple[Optional[str], int]]]] = {}
+
+        # state -> [(output symbol, next state)] for input <eps>
+        self.eps_arcs: Dict[int, List[Tuple[Optional[str], int]]] = {}
+
+        # state -> [(output symbol, next state)] for input any_word
+        self.any_arcs: Dict[int, List[Tuple[Optional[str], int]]] = {}
+
+        self.final_states: Set[int] = set()
+        self.num_states = 0
+
+        for state in intent_fst.states():
+            self.num_states += 1
+            if intent_fst.final(state) != zero_weight:
+                self.final_states.add(state)
+
+            for arc in intent_fst.arcs(state):
+                out_arc = (out_words.get(arc.olabel), arc.nextstate)
+                if arc.ilabel == in_eps:
+                    self.eps_arcs.setdefault(state, []).append(out_arc)
+                elif (in_any >= 0) and (arc.ilabel == in_any):
+                    self.any_arcs.setdefault(state, []).append(out_arc)
+                else:
+                    state_arcs = self.arcs.setdefault(state, {})
+                    state_arcs.setdefault(arc.ilabel, []).append(out_arc)
+
+    def accept(
+        self, words: List[str], max_paths: Optional[int] = None
+    ) -> List[List[str]]:
+        """Get output symbols (without <eps>) for every path that accepts words."""
+        labels = [self.input_symbols.find(word) for word in words]
+        if (not self.any_arcs) and any(label < 0 for label in labels):
+            # Unknown word
+            return []
+
+        num_words = len(labels)
+        sentences: List[List[str]] = []
+
+        # Backpointers: (parent node, output symbol)
+        nodes: List[Tuple[int, Optional[str]]] = [(-1, None)]
+
+        # (state, word position, node, epsilon arcs since last word)
+        state_queue: Deque[Tuple[int, int, int, int]] = deque()
+        state_queue.append((self.start, 0, 0, 0))
+
+        while state_queue:
+            state, position, node, num_eps = state_queue.popleft()
+
+            if (position == num_words) and (state in self.final_states):
+                sentences.append(
+                    [s for s in _follow_backpointers(nodes, node) if s is not None]
+                )
+                if (max_paths is not None) and (len(sentences) >= max_paths):
+                    break
+
+            # Guard against epsilon cycles
+            if num_eps <= self.num_states:
+                for out_word, next_state in self.eps_arcs.get(state, []):
+                    nodes.append((node, out_word))
+                    state_queue.append(
+                        (next_state, position, len(nodes) - 1, num_eps + 1)
+                    )
+
+            if position < num_words:
+                for out_word, next_state in self.arcs.get(state, {}).get(
+                    labels[position], []
+                ):
+                    nodes.append((node, out_word))
+                    state_queue.append((next_state, position + 1, len(nodes) - 1, 0))
+
+                for out_word, next_state in self.any_arcs.get(state, []):
+                    if out_word == self.any_word:
+                        # Pass word through
+                        out_word = words[position]
+
+                    nodes.append((node, out_word))
+                    state_queue.append((next_state, position + 1, len(nodes) - 1, 0))
+
+        return sentences
+
+
+# -----------------------------------------------------------------------------
+
+
 class TagInfo:
     def __init__(
         self, tag, start_index, raw_start_index, symbols=None, raw_symbols=None
@@ -199,51 +326,119 @@ def fstprintall(
     exclude_meta: bool = True,
     eps: str = "<eps>",
     substitute: bool = False,
+    max_paths: Optional[int] = None,
 ) -> List[List[str]]:
     sentences = []
-    input_symbols = in_fst.input_symbols()
-    output_symbols = in_fst.output_symbols()
-    in_eps = input_symbols.find(eps)
-    out_eps = output_symbols.find(eps)
-    zero_weight = fst.Weight.Zero(in_fst.weight_type())
+    for sentence in iter_fst_sentences(
+        in_fst,
+        exclude_meta=exclude_meta,
+        eps=eps,
+        substitute=substitute,
+        max_paths=max_paths,
+    ):
+        if out_file:
+            print(" ".join(sentence), file=out_file)
+        else:
+            sentences.append(sentence)
 
-    state_queue: Deque[Tuple[int, List[str]]] = deque()
-    state_queue.append((in_fst.start(), []))
+    return sentences
 
-    while state_queue:
-        state, sentence = state_queue.popleft()
 
-        if in_fst.final(state) != zero_weight:
-            if out_file:
-                print(" ".join(sentence), file=out_file)
-            else:
-                sentences.append(sentence)
+def iter_fst_sentences(
+    in_fst: fst.Fst,
+    exclude_meta: bool = True,
+    eps: str = "<eps>",
+    substitute: bool = False,
+    max_paths: Optional[int] = None,
+) -> Iterable[List[str]]:
+    """Generate sentences (lists of symbols) from all paths through an FST.
 
-        for arc in in_fst.arcs(state):
-            arc_sentence = list(sentence)
+    Paths are explored breadth first, sharing common prefixes through
+    backpointers. Stops after max_paths sentences if given.
+    """
+    input_words = _decode_symbols(in_fst.input_symbols(), eps)
+    output_words = _decode_symbols(in_fst.output_symbols(), eps)
+    zero_weight = fst.Weight.Zero(in_fst.weight_type())
+
+    # Symbols to add for each (input label, output label)
+    arc_symbols: Dict[Tuple[int, int], List[str]] = {}
+
+    def get_arc_symbols(ilabel: int, olabel: int) -> List[str]:
+        symbols = arc_symbols.get((ilabel, olabel))
+        if symbols is None:
+            symbols = []
+            out_symbol = output_words.get(olabel)
             if substitute:
                 # Use output label
-                if arc.olabel != out_eps:
-                    out_symbol = output_symbols.find(arc.olabel).decode()
-                    if exclude_meta and out_symbol.startswith("__"):
-                        pass  # skip __label__, etc.
-                    else:
-                        arc_sentence.append(out_symbol)
+                if (out_symbol is not None) and not (
+                    exclude_meta and out_symbol.startswith("__")
+                ):
+                    # Skip __label__, etc. if excluding meta
+                    symbols.append(out_symbol)
             else:
                 # Use input label
-                if arc.ilabel != in_eps:
-                    in_symbol = input_symbols.find(arc.ilabel).decode()
-                    arc_sentence.append(in_symbol)
+                in_symbol = input_words.get(ilabel)
+                if in_symbol is not None:
+                    symbols.append(in_symbol)
 
                 # Use meta output labels
-                if not exclude_meta and (arc.olabel != out_eps):
-                    out_symbol = output_symbols.find(arc.olabel).decode()
-                    if out_symbol.startswith("__"):
-                        arc_sentence.append(out_symbol)
+                if (
+                    (not exclude_meta)
+                    and (out_symbol is not None)
+                    and out_symbol.startswith("__")
+                ):
+                    symbols.append(out_symbol)
 
-            state_queue.append((arc.nextstate, arc_sentence))
+            arc_symbols[(ilabel, olabel)] = symbols
 
-    return sentences
+        return symbols
+
+    # Backpointers: (parent node, symbol)
+    nodes: List[Tuple[int, str]] = [(-1, "")]
+
+    state_queue: Deque[Tuple[int, int]] = deque()
+    state_queue.append((in_fst.start(), 0))
+    num_paths = 0
+
+    while state_queue:
+        state, node = state_queue.popleft()
+
+        if in_fst.final(state) != zero_weight:
+            yield _follow_backpointers(nodes, node)
+            num_paths += 1
+            if (max_paths is not None) and (num_paths >= max_paths):
+                break
+
+        for arc in in_fst.arcs(state):
+            next_node = node
+            for symbol in get_arc_symbols(arc.ilabel, arc.olabel):
+                nodes.append((next_node, symbol))
+                next_node = len(nodes) - 1
+
+            state_queue.append((arc.nextstate, next_node))
+
+
+def _decode_symbols(symbols: fst.SymbolTable, eps: str = "<eps>") -> Dict[int, str]:
+    """Decode all symbols in a table once (excluding <eps>)."""
+    words: Dict[int, str] = {}
+    for i in range(symbols.num_symbols()):
+        key = symbols.get_nth_key(i)
+        word = symbols.find(key).decode()
+        if word != eps:
+            words[key] = word
+
+    return words
+
+
+def _follow_backpointers(nodes: List[Tuple[Any, Any]], node: int) -> List[Any]:
+    """Reconstruct path values from a backpointer list (node 0 is the root)."""
+    values: List[Any] = []
+    while node > 0:
+        node, value = nodes[node]
+        values.append(value)
+
+    values.reverse()
+    return values
 
 
 # -----------------------------------------------------------------------------
@@ -251,27 +446,33 @@ def fstprintall(
 
 def longest_path(the_fst: fst.Fst, eps: str = "<eps>") -> fst.Fst:
     output_symbols = the_fst.output_symbols()
-    out_eps = output_symbols.find(eps)
     visited_states: Set[int] = set()
-    best_path: List[int] = []
-    state_queue: Deque[Tuple[int, List[int]]] = deque()
-    state_queue.append((the_fst.start(), []))
+
+    # Backpointers: (parent node, output label)
+    nodes: List[Tuple[int, int]] = [(-1, -1)]
+    best_node = 0
+    best_length = 0
+
+    # (state, node, path length)
+    state_queue: Deque[Tuple[int, int, int]] = deque()
+    state_queue.append((the_fst.start(), 0, 0))
 
     # Determine longest path
     while state_queue:
-        state, path = state_queue.popleft()
+        state, node, length = state_queue.popleft()
         if state in visited_states:
             continue
 
         visited_states.add(state)
 
-        if len(path) > len(best_path):
-            best_path = path
+        if length > best_length:
+            best_node, best_length = node, length
 
         for arc in the_fst.arcs(state):
-            next_path = list(path)
-            next_path.append(arc.olabel)
-            state_queue.append((arc.nextstate, next_path))
+            nodes.append((node, arc.olabel))
+            state_queue.append((arc.nextstate, len(nodes) - 1, length + 1))
+
+    best_path: List[int] = _follow_backpointers(nodes, best_node)
 
     # Create FST with longest path
     path_fst = fst.Fst()
@@ -310,11 +511,25 @@ def filter_words(words: Iterable[str], the_fst: fst.Fst) -> List[str]:
 # -----------------------------------------------------------------------------
 
 
-def make_slot_acceptor(intent_fst: fst.Fst, eps: str = "<eps>") -> fst.Fst:
+def make_slot_acceptor(
+    intent_fst: fst.Fst,
+    eps: str = "<eps>",
+    any_word: Optional[str] = ANY_WORD,
+) -> fst.Fst:
+    """Make an FST that accepts sentences with the slots from an intent FST.
+
+    Words outside of slots are soaked up by a single self-loop with any_word,
+    which FstAcceptor matches against every word. If any_word is None, one
+    self-loop is added per vocabulary word instead (for use with compose).
+    """
     in_eps = intent_fst.input_symbols().find(eps)
     out_eps = intent_fst.output_symbols().find(eps)
     slot_fst = fst.Fst()
 
+    # Decode symbols once
+    input_words = _decode_symbols(intent_fst.input_symbols(), eps)
+    output_words = _decode_symbols(intent_fst.output_symbols(), eps)
+
     # Copy symbol tables
     all_symbols = fst.SymbolTable()
     meta_keys = set()
@@ -328,7 +543,6 @@ def make_slot_acceptor(intent_fst: fst.Fst, eps: str = "<eps>") -> fst.Fst:
                 meta_keys.add(all_key)
 
     weight_one = fst.Weight.One(slot_fst.weight_type())
-    weight_zero = fst.Weight.Zero(slot_fst.weight_type())
 
     # States that will be set to final
     final_states: Set[int] = set()
@@ -338,12 +552,22 @@ def make_slot_acceptor(intent_fst: fst.Fst, eps: str = "<eps>") -> fst.Fst:
 
     all_eps = all_symbols.find(eps)
 
-    # Add self transitions to a state for all input words (besides <eps>)
+    if any_word is not None:
+        any_key = all_symbols.add_symbol(any_word)
+        loop_keys = [any_key]
+    else:
+        # Explicit self transitions for all input words (besides <eps>)
+        all_keys = (
+            all_symbols.get_nth_key(sym_idx)
+            for sym_idx in range(all_symbols.num_symbols())
+        )
+        loop_keys = [
+            key for key in all_keys if (key != all_eps) and (key not in meta_keys)
+        ]
+
     def add_loop_state(state):
-        for sym_idx in range(all_symbols.num_symbols()):
-            all_key = all_symbols.get_nth_key(sym_idx)
-            if (all_key != all_eps) and (all_key not in meta_keys):
-                slot_fst.add_arc(state, fst.Arc(all_key, all_key, weight_one, state))
+        for loop_key in loop_keys:
+            slot_fst.add_arc(state, fst.Arc(loop_key, loop_key, weight_one, state))
 
     slot_fst.set_start(slot_fst.add_state())
 
@@ -351,12 +575,20 @@ def make_slot_acceptor(intent_fst: fst.Fst, eps: str = "<eps>") -> fst.Fst:
     state_queue: Deque[Tuple[int, int, int]] = deque()
     state_queue.append((intent_fst.start(), slot_fst.start(), 0))
 
+    # Alternative words outside of slots lead to the same queue entry
+    visited: Set[Tuple[int, int, int]] = set()
+
     # BFS
     while state_queue:
-        intent_state, slot_state, do_copy = state_queue.popleft()
+        state_info = state_queue.popleft()
+        if state_info in visited:
+            continue
+
+        visited.add(state_info)
+        intent_state, slot_state, do_copy = state_info
         final_states.add(slot_state)
         for intent_arc in intent_fst.arcs(intent_state):
-            out_symbol = intent_fst.output_symbols().find(intent_arc.olabel).decode()
+            out_symbol = output_words.get(intent_arc.olabel, eps)
             all_key = all_symbols.find(out_symbol)
 
             if out_symbol.startswith("__label__"):
@@ -368,7 +600,7 @@ def make_slot_acceptor(intent_fst: fst.Fst, eps: str = "<eps>") -> fst.Fst:
 
                 # Must create a loop here for intents with no slots
                 add_loop_state(next_state)
-                loop_states.add(slot_state)
+                loop_states.add(next_state)
             else:
                 # Non-label arc
                 if out_symbol.startswith("__begin__"):
@@ -384,9 +616,7 @@ def make_slot_acceptor(intent_fst: fst.Fst, eps: str = "<eps>") -> fst.Fst:
                     (intent_arc.ilabel != in_eps) or (intent_arc.olabel != out_eps)
                 ):
                     # Copy state/arc
-                    in_symbol = (
-                        intent_fst.input_symbols().find(intent_arc.ilabel).decode()
-                    )
+                    in_symbol = input_words.get(intent_arc.ilabel, eps)
                     next_state = slot_fst.add_state()
                     slot_fst.add_arc(
                         slot_state,
@@ -431,6 +661,31 @@ def linear_fst(
 ) -> fst.Fst:
     """Produce a linear automata."""
     assert elements, "No elements"
+    if keep_isymbols and (not kwargs):
+        # Build directly, sharing the symbol table
+        input_symbols = automata_op.input_symbols()
+        linear_automata = fst.Fst()
+        weight_one = fst.Weight.One(linear_automata.weight_type())
+        state = linear_automata.add_state()
+        linear_automata.set_start(state)
+
+        for el in elements:
+            label = input_symbols.find(el)
+            if label < 0:
+                raise ValueError(f"Unknown symbol: {el}")
+
+            next_state = linear_automata.add_state()
+            linear_automata.add_arc(
+                state, fst.Arc(label, label, weight_one, next_state)
+            )
+            state = next_state
+
+        linear_automata.set_final(state)
+        linear_automata.set_input_symbols(input_symbols)
+        linear_automata.set_output_symbols(input_symbols)
+
+        return linear_automata
+
     compiler = fst.Compiler(
         isymbols=automata_op.input_symbols().copy(),
         acceptor=keep_isymbols,
@@ -8,7 +8,7 @@ import sys
 from pathlib import Path
 from typing import Iterable, Optional, List, Dict, TextIO, Set
 
-from rhasspy.utils import read_dict
+from rhasspy.utils import get_dictionary_index, read_dict
 
 FORMAT_CMU = "cmu"
 FORMAT_JULIUS = "julius"
@@ -25,6 +25,7 @@ def make_dict(
     dictionary_format: str = FORMAT_CMU,
     silence_words: Set[str] = set(["<s>", "</s>"]),
     merge_rule: str = "all",
+    index_dir: Optional[Path] = None,
 ) -> List[str]:
     transform = lambda w: w
     if upper:
@@ -36,19 +37,6 @@ def make_dict(
 
     is_julius = dictionary_format == FORMAT_JULIUS
 
-    # Read dictionaries
-    word_dict: Dict[str, List[str]] = {}
-    for dict_path in dictionary_paths:
-        if os.path.exists(dict_path):
-            logger.debug(f"Loading dictionary from {dict_path}")
-            with open(dict_path, "r") as dict_file:
-                read_dict(
-                    dict_file,
-                    word_dict,
-                    transform=transform,
-                    silence_words=silence_words,
-                )
-
     # Resolve vocabulary
     words_needed: Set[str] = set()
     with open(vocab_path, "r") as vocab_file:
@@ -62,6 +50,31 @@ def make_dict(
 
     logger.debug(f"Loaded {len(words_needed)} word(s) from {vocab_path}")
 
+    # Read dictionaries
+    word_dict: Dict[str, List[str]] = {}
+    for dict_path in dictionary_paths:
+        if os.path.exists(dict_path):
+            if index_dir is not None:
+                # Only look up needed words in (cached) dictionary index
+                logger.debug(f"Looking up words in index for {dict_path}")
+                casing = "upper" if upper else ("lower" if lower else "")
+                with get_dictionary_index(
+                    dict_path, index_dir, casing=casing, silence_words=silence_words
+                ) as dict_index:
+                    for word in words_needed.union(silence_words):
+                        pronounces = dict_index.lookup(word)
+                        if pronounces:
+                            word_dict.setdefault(word, []).extend(pronounces)
+            else:
+                logger.debug(f"Loading dictionary from {dict_path}")
+                with open(dict_path, "r") as dict_file:
+                    read_dict(
+                        dict_file,
+                        word_dict,
+                        transform=transform,
+                        silence_words=silence_words,
+                    )
+
     # Add silence words
     words_needed.update(silence_words)
 
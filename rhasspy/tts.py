@@ -2,10 +2,12 @@
 import hashlib
 import json
 import os
+import re
 import shutil
 import subprocess
 import tempfile
-from typing import Any, Dict, List, Optional, Type
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Type
 from urllib.parse import urljoin
 
 import requests
@@ -19,13 +21,27 @@ from rhasspy.events import (
     SpeakSentence,
     WavPlayed,
 )
-from rhasspy.utils import hass_request_kwargs
+from rhasspy.utils import concat_wavs, hass_request_kwargs
+
+# Split after sentence/clause punctuation
+SEGMENT_SPLIT = re.compile(r"(?<=[.!?;:,])\s+")
 
 # -----------------------------------------------------------------------------
 
 
-def get_speech_class(system: str) -> Type[RhasspyActor]:
+def get_speech_class(
+    system: str, streaming: bool = False, cache: bool = False
+) -> Type[RhasspyActor]:
     """Get class for profile text to speech system."""
+    if streaming and (system != "dummy"):
+        # Speak sentence segments while the rest are synthesized
+        return StreamingSentenceSpeaker
+
+    if cache and (system not in ["dummy", "wavenet"]):
+        # Re-use WAV data for previously spoken sentences.
+        # WaveNet has its own cache.
+        return CachedSentenceSpeaker
+
     assert system in [
         "dummy",
         "espeak",
@@ -75,6 +91,396 @@ class DummySentenceSpeaker(RhasspyActor):
             self.send(message.receiver or sender, SentenceSpoken())
 
 
+# -----------------------------------------------------------------------------
+# Streaming Text to Speech
+# -----------------------------------------------------------------------------
+
+
+class StreamingSentenceSpeaker(RhasspyActor):
+    """Splits sentences into segments that are synthesized by a child speaker.
+
+    Each segment is played as soon as it is ready, so playback starts before
+    the rest of the sentence has been synthesized.
+    """
+
+    def __init__(self) -> None:
+        RhasspyActor.__init__(self)
+        self.speaker: Optional[RhasspyActor] = None
+        self.player: Optional[RhasspyActor] = None
+        self.receiver: Optional[RhasspyActor] = None
+        self.min_chars = 0
+        self.play = True
+        self.site_id: Optional[str] = None
+        self.wavs: List[bytes] = []
+        self.num_segments = 0
+        self.num_playing = 0
+        self.wake_on_start = False
+        self.disable_wake = True
+        self.enable_wake = False
+        self.wake: Optional[RhasspyActor] = None
+
+    def to_started(self, from_state: str) -> None:
+        """Transition to started state."""
+        self.min_chars = int(self.profile.get("text_to_speech.streaming.min_chars", 20))
+        self.player = self.config["player"]
+        self.wake = self.config.get("wake")
+        self.wake_on_start = self.profile.get("rhasspy.listen_on_start", False)
+        self.disable_wake = self.profile.get("text_to_speech.disable_wake", True)
+
+        # Child actor does the actual synthesis
+        speech_system = self.profile.get("text_to_speech.system", "espeak")
+        speaker_config = dict(self.config)
+        speaker_config["transitions"] = False
+
+        self.speaker = self.createActor(
+            get_speech_class(
+                speech_system,
+                cache=self.profile.get("text_to_speech.cache.enabled", False),
+            )
+        )
+        self.send(self.speaker, ConfigureEvent(self.profile, **speaker_config))
+
+        self.transition("ready")
+
+    def in_ready(self, message: Any, sender: RhasspyActor) -> None:
+        """Handle messages in ready state."""
+        if isinstance(message, SpeakSentence):
+            self.receiver = message.receiver or sender
+            self.play = message.play
+            self.site_id = message.siteId
+            self.wavs = []
+            self.num_playing = 0
+
+            segments = split_sentence(message.sentence, min_chars=self.min_chars)
+            self.num_segments = len(segments)
+            self._logger.debug("Speaking %s segment(s)", self.num_segments)
+
+            if not segments:
+                self.send(self.receiver, SentenceSpoken())
+                return
+
+            # Child speaker synthesizes segments in order
+            for segment in segments:
+                self.send(
+                    self.speaker,
+                    SpeakSentence(
+                        segment,
+                        receiver=self.myAddress,
+                        play=False,
+                        voice=message.voice,
+                        language=message.language,
+                        siteId=message.siteId,
+                    ),
+                )
+
+            if self.play:
+                self.enable_wake = False
+                if self.wake and self.disable_wake:
+                    # Disable wake word
+                    self.send(self.wake, PauseListeningForWakeWord())
+                    self.enable_wake = self.wake_on_start
+
+            self.transition("speaking")
+        elif isinstance(message, Configured):
+            if message.problems:
+                self._logger.warning("%s: %s", message.name, message.problems)
+
+    def in_speaking(self, message: Any, sender: RhasspyActor) -> None:
+        """Handle messages in speaking state."""
+        if isinstance(message, SentenceSpoken):
+            # Segment synthesized
+            self.wavs.append(message.wav_data)
+            if self.play and message.wav_data:
+                # Player queues segments back to back
+                self.num_playing += 1
+                self.send(
+                    self.player,
+                    PlayWavData(
+                        message.wav_data, receiver=self.myAddress, siteId=self.site_id
+                    ),
+                )
+        elif isinstance(message, WavPlayed):
+            self.num_playing -= 1
+        else:
+            return
+
+        if (len(self.wavs) >= self.num_segments) and (self.num_playing < 1):
+            self.transition("ready")
+            self.send(self.receiver, SentenceSpoken(concat_wavs(self.wavs)))
+
+            if self.wake and self.enable_wake:
+                # Re-enable wake word
+                self.send(self.wake, ResumeListeningForWakeWord())
+                self.enable_wake = False
+
+
+class TtsCache:
+    """Size-bounded LRU cache of WAV data on disk with an in-memory hot tier.
+
+    Files are named by a hash of engine, engine settings, voice, language, and
+    text. Their modification times are used to order them for eviction.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, memory_items: int = 32) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+
+        self.hits = 0
+        self.misses = 0
+
+        # key hash -> WAV data
+        self.memory: "OrderedDict[str, bytes]" = OrderedDict()
+
+        # key hash -> file size (least recently used first)
+        self.files: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        wav_files = []
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith(".wav"):
+                wav_stat = os.stat(os.path.join(self.cache_dir, file_name))
+                wav_files.append((wav_stat.st_mtime, file_name[:-4], wav_stat.st_size))
+
+        for _, key_hash, size in sorted(wav_files):
+            self.files[key_hash] = size
+            self.total_bytes += size
+
+        self._evict()
+
+    @staticmethod
+    def get_key(
+        engine: str, settings: Dict[str, Any], voice: str, language: str, text: str
+    ) -> str:
+        """Get cache key for a spoken sentence."""
+        return hashlib.sha256(
+            json.dumps(
+                [engine, settings, voice, language, text], sort_keys=True
+            ).encode()
+        ).hexdigest()
+
+    def get(self, key_hash: str) -> Optional[bytes]:
+        """Get WAV data from memory or disk (None if missing)."""
+        wav_data = self.memory.get(key_hash)
+        if wav_data is None and (key_hash in self.files):
+            wav_path = self._get_path(key_hash)
+            try:
+                with open(wav_path, "rb") as wav_file:
+                    wav_data = wav_file.read()
+
+                # Mark as recently used
+                os.utime(wav_path)
+            except OSError:
+                self.total_bytes -= self.files.pop(key_hash)
+
+        if wav_data is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touch(key_hash, wav_data)
+        return wav_data
+
+    def put(self, key_hash: str, wav_data: bytes) -> None:
+        """Save WAV data to memory and disk."""
+        with open(self._get_path(key_hash), "wb") as wav_file:
+            wav_file.write(wav_data)
+
+        self.total_bytes += len(wav_data) - self.files.get(key_hash, 0)
+        self.files[key_hash] = len(wav_data)
+        self._touch(key_hash, wav_data)
+        self._evict()
+
+    def __contains__(self, key_hash: object) -> bool:
+        return (key_hash in self.memory) or (key_hash in self.files)
+
+    # -------------------------------------------------------------------------
+
+    def _get_path(self, key_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{key_hash}.wav")
+
+    def _touch(self, key_hash: str, wav_data: bytes) -> None:
+        """Move entry to the end of both LRU orders."""
+        self.files.move_to_end(key_hash)
+        self.memory[key_hash] = wav_data
+        self.memory.move_to_end(key_hash)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        """Delete least recently used files until cache fits."""
+        while self.files and (self.total_bytes > self.max_bytes):
+            key_hash, size = self.files.popitem(last=False)
+            self.total_bytes -= size
+            self.memory.pop(key_hash, None)
+            try:
+                os.remove(self._get_path(key_hash))
+            except OSError:
+                pass
+
+
+class CachedSentenceSpeaker(RhasspyActor):
+    """Caches WAV data from a child speaker by engine, voice, language, and text.
+
+    All text_to_speech.<system> settings are part of the key too, so changing
+    any of them (e.g. speed or sample rate) won't replay stale audio.
+    """
+
+    def __init__(self) -> None:
+        RhasspyActor.__init__(self)
+        self.speaker: Optional[RhasspyActor] = None
+        self.player: Optional[RhasspyActor] = None
+        self.cache: Optional[TtsCache] = None
+        self.speech_system = ""
+
+        # Requests waiting for child speaker, in order: (key hash, message, sender)
+        self.pending: Deque[Tuple[str, Optional[SpeakSentence], Any]] = deque()
+
+        # Requests waiting for player, in order: (receiver, WAV data)
+        self.playing: Deque[Tuple[Any, bytes]] = deque()
+        self.wake_on_start = False
+        self.disable_wake = True
+        self.enable_wake = False
+        self.wake: Optional[RhasspyActor] = None
+
+    def to_started(self, from_state: str) -> None:
+        """Transition to started state."""
+        self.player = self.config["player"]
+        self.wake = self.config.get("wake")
+        self.wake_on_start = self.profile.get("rhasspy.listen_on_start", False)
+        self.disable_wake = self.profile.get("text_to_speech.disable_wake", True)
+
+        cache_dir = self.profile.write_dir(
+            self.profile.get("text_to_speech.cache.dir", "tts/cache")
+        )
+        max_mb = float(self.profile.get("text_to_speech.cache.max_size_mb", 100))
+        self.cache = TtsCache(
+            cache_dir,
+            int(max_mb * 1024 * 1024),
+            memory_items=int(self.profile.get("text_to_speech.cache.memory_items", 32)),
+        )
+
+        # Child actor does the actual synthesis
+        self.speech_system = self.profile.get("text_to_speech.system", "espeak")
+        speaker_config = dict(self.config)
+        speaker_config["transitions"] = False
+
+        self.speaker = self.createActor(get_speech_class(self.speech_system))
+        self.send(self.speaker, ConfigureEvent(self.profile, **speaker_config))
+
+        # Synthesize common responses ahead of time
+        for sentence in self.profile.get("text_to_speech.cache.prewarm", []):
+            key_hash = self.get_key(sentence)
+            if key_hash not in self.cache:
+                self.pending.append((key_hash, None, None))
+                self.send(
+                    self.speaker,
+                    SpeakSentence(sentence, receiver=self.myAddress, play=False),
+                )
+
+        self.transition("ready")
+
+    def in_ready(self, message: Any, sender: RhasspyActor) -> None:
+        """Handle messages in ready state."""
+        assert self.cache is not None
+        if isinstance(message, SpeakSentence):
+            key_hash = self.get_key(
+                message.sentence, voice=message.voice, language=message.language
+            )
+
+            wav_data = self.cache.get(key_hash)
+            if wav_data is not None:
+                self._logger.debug(
+                    "Cache hit (hits=%s, misses=%s)", self.cache.hits, self.cache.misses
+                )
+                self.speak(message, message.receiver or sender, wav_data)
+            else:
+                self.pending.append((key_hash, message, message.receiver or sender))
+                self.send(
+                    self.speaker,
+                    SpeakSentence(
+                        message.sentence,
+                        receiver=self.myAddress,
+                        play=False,
+                        voice=message.voice,
+                        language=message.language,
+                        siteId=message.siteId,
+                    ),
+                )
+        elif isinstance(message, SentenceSpoken) and self.pending:
+            # From child speaker
+            key_hash, request, receiver = self.pending.popleft()
+            if message.wav_data:
+                self.cache.put(key_hash, message.wav_data)
+
+            if request is not None:
+                self.speak(request, receiver, message.wav_data)
+        elif isinstance(message, WavPlayed) and self.playing:
+            receiver, wav_data = self.playing.popleft()
+            self.send(receiver, SentenceSpoken(wav_data))
+
+            if (not self.playing) and self.wake and self.enable_wake:
+                # Re-enable wake word
+                self.send(self.wake, ResumeListeningForWakeWord())
+                self.enable_wake = False
+        elif isinstance(message, Configured):
+            if message.problems:
+                self._logger.warning("%s: %s", message.name, message.problems)
+
+    # -------------------------------------------------------------------------
+
+    def speak(self, message: SpeakSentence, receiver: Any, wav_data: bytes) -> None:
+        """Play WAV data (if requested) and reply."""
+        if message.play and wav_data:
+            if (not self.playing) and self.wake and self.disable_wake:
+                # Disable wake word
+                self.send(self.wake, PauseListeningForWakeWord())
+                self.enable_wake = self.wake_on_start
+
+            self.playing.append((receiver, wav_data))
+            self.send(
+                self.player,
+                PlayWavData(wav_data, receiver=self.myAddress, siteId=message.siteId),
+            )
+        else:
+            self.send(receiver, SentenceSpoken(wav_data))
+
+    def get_key(
+        self, sentence: str, voice: Optional[str] = None, language: Optional[str] = None
+    ) -> str:
+        """Get cache key using profile voice/language by default."""
+        return TtsCache.get_key(
+            self.speech_system,
+            self.profile.get(f"text_to_speech.{self.speech_system}", {}) or {},
+            voice
+            or self.profile.get(f"text_to_speech.{self.speech_system}.voice", "")
+            or "",
+            language or self.profile.get("language", "") or "",
+            sentence,
+        )
+
+
+def split_sentence(sentence: str, min_chars: int = 0) -> List[str]:
+    """Split text into sentences/clauses of at least min_chars characters."""
+    segments: List[str] = []
+    segment = ""
+    for part in SEGMENT_SPLIT.split(sentence.strip()):
+        segment = f"{segment} {part}" if segment else part
+        if len(segment) >= min_chars:
+            segments.append(segment)
+            segment = ""
+
+    if segment:
+        if segments and (len(segment) < min_chars):
+            # Attach short remainder to last segment
+            segments[-1] = f"{segments[-1]} {segment}"
+        else:
+            segments.append(segment)
+
+    return segments
+
+
 # -----------------------------------------------------------------------------
 # eSpeak Text to Speech
 # http://espeak.sourceforge.net
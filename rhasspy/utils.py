@@ -1,20 +1,36 @@
 """Rhasspy utility functions."""
 import collections
 import gzip
+import hashlib
 import io
 import itertools
 import json
 import logging
 import math
+import mmap
 import os
 import random
 import re
+import select
+import struct
 import subprocess
 import threading
+import time
 import wave
 from collections import defaultdict
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import networkx as nx
 import rhasspynlu
@@ -22,6 +38,7 @@ import rhasspynlu
 from num2words import num2words
 
 WHITESPACE_PATTERN = re.compile(r"\s+")
+DICT_SPLIT_PATTERN = re.compile(r"[ \t]+")
 _LOGGER = logging.getLogger(__name__)
 
 # -----------------------------------------------------------------------------
@@ -56,6 +73,8 @@ def read_dict(
     if word_dict is None:
         word_dict = {}
 
+    split_line = DICT_SPLIT_PATTERN.split
+
     for i, line in enumerate(dict_file):
         line = line.strip()
         if not line:
@@ -63,11 +82,11 @@ def read_dict(
 
         try:
             # Use explicit whitespace (avoid 0xA0)
-            parts = re.split(r"[ \t]+", line)
-            word = parts[0]
+            word, *parts = split_line(line)
 
-            # Skip Julius extras
-            parts = [p for p in parts[1:] if p[0] not in ["[", "@"]]
+            if ("[" in line) or ("@" in line):
+                # Skip Julius extras
+                parts = [p for p in parts if p[0] not in "[@"]
 
             idx = word.find("(")
             if idx > 0:
@@ -79,6 +98,8 @@ def read_dict(
             else:
                 words = [word]
 
+            pronounce = " ".join(parts)
+
             for word in words:
                 # Don't transform silence words
                 if transform and (
@@ -86,18 +107,488 @@ def read_dict(
                 ):
                     word = transform(word)
 
-                pronounce = " ".join(parts)
-
-                if word in word_dict:
-                    word_dict[word].append(pronounce)
-                else:
+                word_prons = word_dict.get(word)
+                if word_prons is None:
                     word_dict[word] = [pronounce]
+                else:
+                    word_prons.append(pronounce)
         except Exception as e:
             _LOGGER.warning("read_dict: %s (line %s)", e, i + 1)
 
     return word_dict
 
 
+class DictionaryIndex:
+    """Memory-mapped, sorted index over a CMU/Julius word dictionary.
+
+    The index file holds a header, a table of offsets, and one line per word
+    (sorted by UTF-8 bytes) with tab-separated pronunciations.
+    Lookups are a binary search, so only the requested words are ever decoded.
+    """
+
+    MAGIC = b"RHDXv002"
+
+    # magic, source mtime (ns), source size, number of words, casing,
+    # silence words hash
+    HEADER = struct.Struct("<8sQQQ8s16s")
+    OFFSET = struct.Struct("<Q")
+
+    def __init__(self, index_path: Union[str, Path]) -> None:
+        self.index_path = Path(index_path)
+        self._file = open(self.index_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            self.source_mtime_ns,
+            self.source_size,
+            self.num_words,
+            casing,
+            self.silence_hash,
+        ) = DictionaryIndex.HEADER.unpack_from(self._mmap, 0)
+
+        assert magic == DictionaryIndex.MAGIC, f"Not a dictionary index: {index_path}"
+        self.casing = casing.rstrip(b"\0").decode()
+
+        # Offsets are relative to start of data section (num_words + 1 entries)
+        self._offsets_start = DictionaryIndex.HEADER.size
+        self._data_start = self._offsets_start + (
+            (self.num_words + 1) * DictionaryIndex.OFFSET.size
+        )
+
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def build(
+        cls,
+        dict_path: Union[str, Path],
+        index_path: Union[str, Path],
+        casing: str = "",
+        silence_words: Optional[Set[str]] = None,
+    ) -> "DictionaryIndex":
+        """Create an index file for a dictionary (overwrites existing index)."""
+        dict_path, index_path = Path(dict_path), Path(index_path)
+        source_stat = dict_path.stat()
+
+        transform = get_casing_transform(casing)
+        word_dict: Dict[str, List[str]] = {}
+        with open(dict_path, "r") as dict_file:
+            read_dict(
+                dict_file, word_dict, transform=transform, silence_words=silence_words
+            )
+
+        # Sort by encoded bytes so binary search can compare raw bytes
+        entries = sorted(
+            (word.encode(), "\t".join(prons).encode())
+            for word, prons in word_dict.items()
+        )
+
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = index_path.with_name(index_path.name + ".tmp")
+        with open(temp_path, "wb") as index_file:
+            index_file.write(
+                DictionaryIndex.HEADER.pack(
+                    DictionaryIndex.MAGIC,
+                    source_stat.st_mtime_ns,
+                    source_stat.st_size,
+                    len(entries),
+                    casing.encode(),
+                    DictionaryIndex.hash_words(silence_words),
+                )
+            )
+
+            offset = 0
+            for word_bytes, prons_bytes in entries:
+                index_file.write(DictionaryIndex.OFFSET.pack(offset))
+                offset += len(word_bytes) + len(prons_bytes) + 2
+
+            index_file.write(DictionaryIndex.OFFSET.pack(offset))
+
+            for word_bytes, prons_bytes in entries:
+                index_file.write(word_bytes + b"\t" + prons_bytes + b"\n")
+
+        os.replace(temp_path, index_path)
+        _LOGGER.debug(
+            "Indexed %s word(s) from %s to %s", len(entries), dict_path, index_path
+        )
+
+        return cls(index_path)
+
+    @classmethod
+    def open_or_build(
+        cls,
+        dict_path: Union[str, Path],
+        index_path: Union[str, Path],
+        casing: str = "",
+        silence_words: Optional[Set[str]] = None,
+    ) -> "DictionaryIndex":
+        """Open an existing index, rebuilding it if the dictionary has changed."""
+        if os.path.exists(index_path):
+            try:
+                index = cls(index_path)
+                if index.is_current(dict_path, casing, silence_words):
+                    return index
+
+                index.close()
+            except Exception:
+                _LOGGER.exception("Failed to open dictionary index %s", index_path)
+
+        return cls.build(
+            dict_path, index_path, casing=casing, silence_words=silence_words
+        )
+
+    def is_current(
+        self,
+        dict_path: Union[str, Path],
+        casing: str = "",
+        silence_words: Optional[Set[str]] = None,
+    ) -> bool:
+        """True if index was built from the current version of a dictionary."""
+        source_stat = os.stat(dict_path)
+        return (
+            (self.source_mtime_ns == source_stat.st_mtime_ns)
+            and (self.source_size == source_stat.st_size)
+            and (self.casing == casing)
+            and (self.silence_hash == DictionaryIndex.hash_words(silence_words))
+        )
+
+    @staticmethod
+    def hash_words(words: Optional[Iterable[str]]) -> bytes:
+        """Get a short digest of a set of words (order doesn't matter)."""
+        return hashlib.blake2b(
+            "\n".join(sorted(words or [])).encode(), digest_size=16
+        ).digest()
+
+    # -------------------------------------------------------------------------
+
+    def lookup(self, word: str) -> List[str]:
+        """Get pronunciations for a word (empty if missing)."""
+        line = self._find(word.encode())
+        if line is None:
+            return []
+
+        return line.decode().split("\t")[1:]
+
+    def get(self, word: str, default: Any = None) -> Any:
+        """Get pronunciations for a word or a default value."""
+        return self.lookup(word) or default
+
+    def __contains__(self, word: object) -> bool:
+        return isinstance(word, str) and (self._find(word.encode()) is not None)
+
+    def __len__(self) -> int:
+        return self.num_words
+
+    def __iter__(self):
+        for i in range(self.num_words):
+            line = self._line(i)
+            yield line[: line.index(b"\t")].decode()
+
+    def close(self) -> None:
+        """Release memory map and file handle."""
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # -------------------------------------------------------------------------
+
+    def _line(self, i: int) -> bytes:
+        """Get the index line for the i-th word (without newline)."""
+        start, end = struct.unpack_from(
+            "<2Q", self._mmap, self._offsets_start + (i * DictionaryIndex.OFFSET.size)
+        )
+        return self._mmap[self._data_start + start : self._data_start + end - 1]
+
+    def _find(self, word_bytes: bytes) -> Optional[bytes]:
+        """Binary search for a word's index line."""
+        key = word_bytes + b"\t"
+        lo, hi = 0, self.num_words
+        while lo < hi:
+            mid = (lo + hi) // 2
+            line = self._line(mid)
+            line_key = line[: line.index(b"\t") + 1]
+            if line_key == key:
+                return line
+
+            if line_key < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return None
+
+
+def get_casing_transform(casing: str) -> Optional[Callable[[str], str]]:
+    """Get word transformation function for upper/lower casing."""
+    casing = (casing or "").lower()
+    if casing == "upper":
+        return str.upper
+
+    if casing == "lower":
+        return str.lower
+
+    return None
+
+
+def get_dictionary_index(
+    dict_path: Union[str, Path],
+    index_dir: Union[str, Path],
+    casing: str = "",
+    silence_words: Optional[Set[str]] = None,
+) -> DictionaryIndex:
+    """Open (or build) the index for a dictionary inside an index directory."""
+    casing = (casing or "").lower()
+    if casing not in ["upper", "lower"]:
+        casing = ""
+
+    # Dictionaries with the same name in different directories get their own index
+    path_hash = hashlib.blake2b(
+        str(Path(dict_path).absolute()).encode(), digest_size=4
+    ).hexdigest()
+    words_hash = DictionaryIndex.hash_words(silence_words).hex()[:8]
+    index_path = Path(index_dir) / (
+        f"{Path(dict_path).name}.{path_hash}.{words_hash}.{casing or 'ignore'}.idx"
+    )
+    index = DictionaryIndex.open_or_build(
+        dict_path, index_path, casing=casing, silence_words=silence_words
+    )
+
+    # Remove indexes left over from other paths, silence words, or casing
+    name_prefix = Path(dict_path).name + "."
+    for file_name in os.listdir(index_path.parent):
+        if (
+            (file_name != index_path.name)
+            and file_name.startswith(name_prefix)
+            and file_name.endswith(".idx")
+            and (len(file_name[len(name_prefix) : -4].split(".")) == 3)
+        ):
+            _LOGGER.debug("Removing old dictionary index %s", file_name)
+            try:
+                os.unlink(index_path.parent / file_name)
+            except OSError:
+                pass
+
+    return index
+
+
+# -----------------------------------------------------------------------------
+
+
+class ExamplesIndex:
+    """Memory-mapped table of intent example sentences for fuzzy matching.
+
+    The index file holds a header, a table of intents (example count and
+    location of match strings), a table of line offsets into the JSON lines
+    examples file, the intent names, and the match strings (grouped by intent).
+    Match strings are handed out as raw bytes per intent, and an example's
+    recognition payload is read from the examples file when it is requested.
+    """
+
+    MAGIC = b"RHEXv002"
+
+    # magic, source mtime (ns), source size, intents, examples, names size
+    HEADER = struct.Struct("<8sQQQQQ")
+
+    # examples, texts offset, texts size
+    INTENT = struct.Struct("<QQQ")
+    PAYLOAD = struct.Struct("<QQ")
+
+    def __init__(
+        self, index_path: Union[str, Path], examples_path: Union[str, Path]
+    ) -> None:
+        self.index_path = Path(index_path)
+        self.examples_path = Path(examples_path)
+        self._file = open(self.index_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            self.source_mtime_ns,
+            self.source_size,
+            self.num_intents,
+            self.num_examples,
+            names_size,
+        ) = ExamplesIndex.HEADER.unpack_from(self._mmap, 0)
+
+        assert magic == ExamplesIndex.MAGIC, f"Not an examples index: {index_path}"
+
+        intents_start = ExamplesIndex.HEADER.size
+        self._payloads_start = intents_start + (
+            self.num_intents * ExamplesIndex.INTENT.size
+        )
+
+        names_start = self._payloads_start + (
+            self.num_examples * ExamplesIndex.PAYLOAD.size
+        )
+        names = (
+            self._mmap[names_start : names_start + names_size].decode().split("\n")
+            if self.num_intents > 0
+            else []
+        )
+
+        # intent name -> (index of first example, example count, texts offset, size)
+        self.intents: Dict[str, Tuple[int, int, int, int]] = {}
+        first_example = 0
+        for intent_index, intent_name in enumerate(names):
+            count, texts_offset, texts_size = ExamplesIndex.INTENT.unpack_from(
+                self._mmap, intents_start + (intent_index * ExamplesIndex.INTENT.size)
+            )
+            self.intents[intent_name] = (first_example, count, texts_offset, texts_size)
+            first_example += count
+
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def build(
+        cls, examples_path: Union[str, Path], index_path: Union[str, Path]
+    ) -> "ExamplesIndex":
+        """Create an index file for a JSON lines examples file."""
+        examples_path, index_path = Path(examples_path), Path(index_path)
+        source_stat = examples_path.stat()
+
+        # intent name -> [(match string, payload start, payload end)]
+        intent_examples: Dict[str, List[Tuple[str, int, int]]] = defaultdict(list)
+        with open(examples_path, "rb") as examples_file:
+            start = 0
+            for line in examples_file:
+                end = start + len(line)
+                if line.strip():
+                    example = json.loads(line)
+                    example_text = example.get("raw_text", example["text"])
+                    intent_examples[example["intent"]["name"]].append(
+                        (" ".join(example_text.splitlines()), start, end)
+                    )
+
+                start = end
+
+        num_examples = sum(len(examples) for examples in intent_examples.values())
+        names_bytes = "\n".join(intent_examples).encode()
+        texts_start = (
+            ExamplesIndex.HEADER.size
+            + (len(intent_examples) * ExamplesIndex.INTENT.size)
+            + (num_examples * ExamplesIndex.PAYLOAD.size)
+            + len(names_bytes)
+        )
+
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = index_path.with_name(index_path.name + ".tmp")
+        with open(temp_path, "wb") as index_file:
+            index_file.write(
+                ExamplesIndex.HEADER.pack(
+                    ExamplesIndex.MAGIC,
+                    source_stat.st_mtime_ns,
+                    source_stat.st_size,
+                    len(intent_examples),
+                    num_examples,
+                    len(names_bytes),
+                )
+            )
+
+            texts_blocks = [
+                "\n".join(example[0] for example in examples).encode()
+                for examples in intent_examples.values()
+            ]
+
+            texts_offset = texts_start
+            for examples, texts_bytes in zip(intent_examples.values(), texts_blocks):
+                index_file.write(
+                    ExamplesIndex.INTENT.pack(
+                        len(examples), texts_offset, len(texts_bytes)
+                    )
+                )
+                texts_offset += len(texts_bytes)
+
+            # Payloads are lines in the original file
+            for examples in intent_examples.values():
+                for _, start, end in examples:
+                    index_file.write(ExamplesIndex.PAYLOAD.pack(start, end))
+
+            index_file.write(names_bytes)
+            for texts_bytes in texts_blocks:
+                index_file.write(texts_bytes)
+
+        os.replace(temp_path, index_path)
+        _LOGGER.debug(
+            "Indexed %s example(s) from %s to %s",
+            num_examples,
+            examples_path,
+            index_path,
+        )
+
+        return cls(index_path, examples_path)
+
+    @classmethod
+    def open_or_build(
+        cls, examples_path: Union[str, Path], index_path: Union[str, Path]
+    ) -> "ExamplesIndex":
+        """Open an existing index, rebuilding it if the examples have changed."""
+        if os.path.exists(index_path):
+            try:
+                index = cls(index_path, examples_path)
+                if index.is_current():
+                    return index
+
+                index.close()
+            except Exception:
+                _LOGGER.exception("Failed to open examples index %s", index_path)
+
+        return cls.build(examples_path, index_path)
+
+    def is_current(self) -> bool:
+        """True if index was built from the current version of its examples file."""
+        try:
+            source_stat = os.stat(self.examples_path)
+        except OSError:
+            # Examples were removed or can't be read
+            return False
+
+        return (self.source_mtime_ns == source_stat.st_mtime_ns) and (
+            self.source_size == source_stat.st_size
+        )
+
+    # -------------------------------------------------------------------------
+
+    def get_texts(self, intent_name: str) -> bytes:
+        """Get newline-separated match strings (UTF-8) for an intent."""
+        _, _, texts_offset, texts_size = self.intents[intent_name]
+        return self._mmap[texts_offset : texts_offset + texts_size]
+
+    def get_example(self, intent_name: str, text_index: int) -> Dict[str, Any]:
+        """Read and decode an example by its position within an intent."""
+        first_example, count, _, _ = self.intents[intent_name]
+        if not 0 <= text_index < count:
+            raise IndexError(text_index)
+
+        start, end = ExamplesIndex.PAYLOAD.unpack_from(
+            self._mmap,
+            self._payloads_start
+            + ((first_example + text_index) * ExamplesIndex.PAYLOAD.size),
+        )
+
+        with open(self.examples_path, "rb") as examples_file:
+            examples_file.seek(start)
+            return json.loads(examples_file.read(end - start).decode())
+
+    def __len__(self) -> int:
+        return self.num_examples
+
+    def close(self) -> None:
+        """Release memory map and file handle."""
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
 # -----------------------------------------------------------------------------
 
 
@@ -142,15 +633,75 @@ def recursive_remove(base_dict: Dict[Any, Any], new_dict: Dict[Any, Any]) -> Non
 
 def buffer_to_wav(buffer: bytes) -> bytes:
     """Wraps a buffer of raw audio data (16-bit, 16Khz mono) in a WAV"""
-    with io.BytesIO() as wav_buffer:
-        wav_file: wave.Wave_write = wave.open(wav_buffer, mode="wb")
-        with wav_file:
-            wav_file.setframerate(16000)
-            wav_file.setsampwidth(2)
-            wav_file.setnchannels(1)
-            wav_file.writeframes(buffer)
+    return make_wav_header(len(buffer)) + buffer
+
+
+# Canonical 44-byte header of a PCM WAV file:
+# RIFF, RIFF size, WAVE, fmt, fmt size, format, channels, rate, byte rate,
+# block align, bits per sample, data, data size
+WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+def make_wav_header(num_bytes: int, rate=16000, width=2, channels=1) -> bytes:
+    """Create a 44-byte WAV header for num_bytes of PCM audio."""
+    return WAV_HEADER.pack(
+        b"RIFF",
+        36 + num_bytes,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        channels,
+        rate,
+        rate * width * channels,
+        width * channels,
+        width * 8,
+        b"data",
+        num_bytes,
+    )
+
 
-        return wav_buffer.getvalue()
+def parse_wav_header(
+    wav_data: Union[bytes, memoryview], offset: int = 0
+) -> Optional[Tuple[int, int, int, int, int]]:
+    """Parse a canonical 44-byte PCM WAV header.
+
+    Returns (rate, width, channels, data offset, data size) or None if the
+    header has any other layout (use the wave module instead).
+    """
+    if len(wav_data) < offset + WAV_HEADER.size:
+        return None
+
+    (
+        riff,
+        _,
+        wave_id,
+        fmt_id,
+        fmt_size,
+        audio_format,
+        channels,
+        rate,
+        _,
+        _,
+        bits,
+        data_id,
+        data_size,
+    ) = WAV_HEADER.unpack_from(wav_data, offset)
+
+    if (
+        (riff != b"RIFF")
+        or (wave_id != b"WAVE")
+        or (fmt_id != b"fmt ")
+        or (fmt_size != 16)
+        or (audio_format != 1)
+        or (data_id != b"data")
+    ):
+        return None
+
+    data_offset = offset + WAV_HEADER.size
+    data_size = min(data_size, len(wav_data) - data_offset)
+
+    return rate, bits // 8, channels, data_offset, data_size
 
 
 def convert_wav(wav_data: bytes, rate=16000, width=16, channels=1) -> bytes:
@@ -186,12 +737,12 @@ def maybe_convert_wav(wav_data: bytes, rate=16000, width=16, channels=1) -> byte
         with wav_file:
             if (
                 (wav_file.getframerate() != rate)
-                or (wav_file.getsampwidth() != width)
+                or ((wav_file.getsampwidth() * 8) != width)
                 or (wav_file.getnchannels() != channels)
             ):
                 return convert_wav(wav_data, rate=rate, width=width, channels=channels)
 
-            return wav_file.readframes(wav_file.getnframes())
+            return wav_data
 
 
 # -----------------------------------------------------------------------------
@@ -331,13 +882,77 @@ def grouper(iterable, n, fillvalue=None):
 
 
 def make_sentences_by_intent(
-    intent_graph: nx.DiGraph, num_samples: Optional[int] = None, extra_converters=None
+    intent_graph: nx.DiGraph,
+    num_samples: Optional[int] = None,
+    extra_converters=None,
+    samples_per_intent: Optional[int] = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
     """Get all sentences from a graph."""
 
     # { intent: [ { 'text': ..., 'entities': { ... } }, ... ] }
     sentences_by_intent: Dict[str, Any] = defaultdict(list)
 
+    for intent_name, recognition in iter_sentences_by_intent(
+        intent_graph,
+        num_samples=num_samples,
+        samples_per_intent=samples_per_intent,
+        extra_converters=extra_converters,
+    ):
+        sentences_by_intent[intent_name].append(recognition)
+
+    return sentences_by_intent
+
+
+def iter_sentences_by_intent(
+    intent_graph: nx.DiGraph,
+    num_samples: Optional[int] = None,
+    samples_per_intent: Optional[int] = None,
+    extra_converters=None,
+) -> Iterable[Tuple[str, Dict[str, Any]]]:
+    """Generate (intent name, recognition dict) for paths through a graph.
+
+    Sentences are grouped by intent. If num_samples (total) or
+    samples_per_intent is given, paths are sampled uniformly at random without
+    replacement using path counts, so the full set of paths is never
+    materialized. samples_per_intent takes precedence over num_samples.
+    """
+    start_node, end_node = get_start_end_nodes(intent_graph)
+
+    # Branches from start node grouped by intent label
+    intent_branches: Dict[str, List[Any]] = defaultdict(list)
+    for branch_node in intent_graph.successors(start_node):
+        label = intent_graph.edges[start_node, branch_node].get("olabel", "")
+        intent_branches[label].append(branch_node)
+
+    if (num_samples is None) and (samples_per_intent is None):
+        # Enumerate all paths
+        paths: Iterable[List[Any]] = (
+            [start_node] + path
+            for label in sorted(intent_branches)
+            for branch_node in intent_branches[label]
+            for path in nx.all_simple_paths(intent_graph, branch_node, end_node)
+        )
+    else:
+        paths = _sample_paths(
+            intent_graph,
+            start_node,
+            end_node,
+            [intent_branches[label] for label in sorted(intent_branches)],
+            num_samples=num_samples,
+            samples_per_intent=samples_per_intent,
+        )
+
+    # TODO: Add converters
+    for path in paths:
+        _, recognition = rhasspynlu.fsticuffs.path_to_recognition(
+            path, intent_graph, extra_converters=extra_converters
+        )
+        assert recognition, "Path failed"
+        yield recognition.intent.name, recognition.asdict()
+
+
+def get_start_end_nodes(intent_graph: nx.DiGraph) -> Tuple[Any, Any]:
+    """Find start and final nodes of an intent graph."""
     start_node = None
     end_node = None
     for node, node_data in intent_graph.nodes(data=True):
@@ -353,24 +968,114 @@ def make_sentences_by_intent(
         end_node is not None
     ), "Missing start/end node(s)"
 
-    if num_samples is not None:
-        # Randomly sample
-        paths = random.sample(
-            list(nx.all_simple_paths(intent_graph, start_node, end_node)), num_samples
-        )
+    return start_node, end_node
+
+
+def count_paths(intent_graph: nx.DiGraph, end_node: Any) -> Dict[Any, int]:
+    """Count paths from every node to the end node (graph must be acyclic)."""
+    path_counts: Dict[Any, int] = {}
+    for node in reversed(list(nx.topological_sort(intent_graph))):
+        if node == end_node:
+            path_counts[node] = 1
+        else:
+            path_counts[node] = sum(
+                path_counts[next_node] for next_node in intent_graph.successors(node)
+            )
+
+    return path_counts
+
+
+def _sample_paths(
+    intent_graph: nx.DiGraph,
+    start_node: Any,
+    end_node: Any,
+    branch_groups: List[List[Any]],
+    num_samples: Optional[int] = None,
+    samples_per_intent: Optional[int] = None,
+) -> Iterable[List[Any]]:
+    """Sample distinct paths uniformly at random by unranking path indexes."""
+    path_counts = count_paths(intent_graph, end_node)
+    group_counts = [
+        sum(path_counts[branch_node] for branch_node in branches)
+        for branches in branch_groups
+    ]
+
+    if samples_per_intent is not None:
+        # Separate quota for each intent
+        group_indexes = [
+            _sample_indexes(group_count, samples_per_intent)
+            for group_count in group_counts
+        ]
     else:
-        # Use generator
-        paths = nx.all_simple_paths(intent_graph, start_node, end_node)
+        # Uniform over all paths
+        assert num_samples is not None
+        all_indexes = _sample_indexes(sum(group_counts), num_samples)
+
+        # Split sorted indexes into groups
+        group_indexes = [[] for _ in group_counts]
+        group_index = 0
+        group_offset = 0
+        for index in all_indexes:
+            while index >= (group_offset + group_counts[group_index]):
+                group_offset += group_counts[group_index]
+                group_index += 1
+
+            group_indexes[group_index].append(index - group_offset)
+
+    for branches, indexes in zip(branch_groups, group_indexes):
+        for index in indexes:
+            # Find branch for this index
+            for branch_node in branches:
+                if index < path_counts[branch_node]:
+                    break
+
+                index -= path_counts[branch_node]
+
+            yield [start_node] + _unrank_path(
+                intent_graph, branch_node, end_node, index, path_counts
+            )
 
-    # TODO: Add converters
-    for path in paths:
-        _, recognition = rhasspynlu.fsticuffs.path_to_recognition(
-            path, intent_graph, extra_converters=extra_converters
-        )
-        assert recognition, "Path failed"
-        sentences_by_intent[recognition.intent.name].append(recognition.asdict())
 
-    return sentences_by_intent
+def _sample_indexes(count: int, num_samples: int) -> List[int]:
+    """Get up to num_samples distinct random indexes below count (sorted).
+
+    Path counts can be larger than sys.maxsize, which random.sample(range(...))
+    can't handle. Sparse samples are drawn with randrange instead.
+    """
+    num_samples = min(num_samples, count)
+    if (2 * num_samples) > count:
+        # Dense (count is small)
+        return sorted(random.sample(range(count), num_samples))
+
+    indexes: Set[int] = set()
+    while len(indexes) < num_samples:
+        # Retry on collision (at most half of the indexes are taken)
+        indexes.add(random.randrange(count))
+
+    return sorted(indexes)
+
+
+def _unrank_path(
+    intent_graph: nx.DiGraph,
+    node: Any,
+    end_node: Any,
+    index: int,
+    path_counts: Dict[Any, int],
+) -> List[Any]:
+    """Get the path with a given index (in successor order) from node to end node."""
+    path = [node]
+    while node != end_node:
+        for next_node in intent_graph.successors(node):
+            next_count = path_counts[next_node]
+            if index < next_count:
+                node = next_node
+                break
+
+            index -= next_count
+
+        path.append(node)
+
+    return path
 
 
 # -----------------------------------------------------------------------------
@@ -438,6 +1143,36 @@ def get_wav_duration(wav_bytes: bytes) -> float:
             return frames / float(rate)
 
 
+def concat_wavs(wavs: Iterable[bytes]) -> bytes:
+    """Join WAV buffers with the same format into a single WAV."""
+    params = None
+    with io.BytesIO() as frames_buffer:
+        for wav_data in wavs:
+            if not wav_data:
+                continue
+
+            with io.BytesIO(wav_data) as wav_buffer:
+                wav_file: wave.Wave_read = wave.open(wav_buffer, "rb")
+                with wav_file:
+                    if params is None:
+                        params = wav_file.getparams()
+
+                    frames_buffer.write(wav_file.readframes(wav_file.getnframes()))
+
+        if params is None:
+            return bytes()
+
+        with io.BytesIO() as wav_buffer:
+            wav_out: wave.Wave_write = wave.open(wav_buffer, mode="wb")
+            with wav_out:
+                wav_out.setnchannels(params.nchannels)
+                wav_out.setsampwidth(params.sampwidth)
+                wav_out.setframerate(params.framerate)
+                wav_out.writeframes(frames_buffer.getvalue())
+
+            return wav_buffer.getvalue()
+
+
 # -----------------------------------------------------------------------------
 
 
@@ -504,15 +1239,81 @@ def get_all_intents(ini_paths: List[Path]) -> Dict[str, Any]:
 
 
 class CliConverter:
-    """Command-line converter for intent recognition"""
+    """Command-line converter for intent recognition.
+
+    In persistent mode, a single converter process is kept running and is sent
+    one JSON request per line on stdin: {"args": [...], "values": [...]}.
+    It must reply with one JSON list of converted values per line on stdout
+    within timeout seconds, or it is stopped and the conversion is run once.
+    Otherwise, a new process is started for each conversion.
+
+    If cache_size > 0, results are kept in an LRU cache keyed by converter
+    arguments and values.
+    """
 
-    def __init__(self, name: str, command_path: Path):
+    def __init__(
+        self,
+        name: str,
+        command_path: Path,
+        persistent: bool = False,
+        cache_size: int = 0,
+        timeout: float = 10,
+    ):
         self.name = name
         self.command_path = command_path
+        self.persistent = persistent
+        self.cache_size = cache_size
+        self.timeout = timeout
+
+        self.proc: Optional[subprocess.Popen] = None
+        self.stdout_buffer = bytearray()
+        self.lock = threading.Lock()
+
+        # (converter args, values) -> JSON list of results
+        self.cache: "collections.OrderedDict[Tuple[str, str], str]" = (
+            collections.OrderedDict()
+        )
 
     def __call__(self, *args, converter_args=None):
         """Runs external program to convert JSON values"""
         converter_args = converter_args or []
+        key = (json.dumps(converter_args), json.dumps(args))
+
+        with self.lock:
+            result_json = self.cache.get(key)
+            if result_json is not None:
+                self.cache.move_to_end(key)
+                return json.loads(result_json)
+
+            if self.persistent:
+                result_json = self._convert_persistent(converter_args, args)
+            else:
+                result_json = json.dumps(self._convert_once(converter_args, args))
+
+            if self.cache_size > 0:
+                self.cache[key] = result_json
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+
+            return json.loads(result_json)
+
+    def close(self) -> None:
+        """Stop persistent converter process."""
+        with self.lock:
+            proc = self.proc
+            if proc is not None:
+                _LOGGER.debug("Stopping converter %s", self.name)
+                try:
+                    assert proc.stdin is not None
+                    proc.stdin.close()
+                    proc.wait(timeout=1)
+                except Exception:
+                    proc.kill()
+
+                self.proc = None
+
+    def _convert_once(self, converter_args: List[str], args) -> List[Any]:
+        """Run converter program for a single conversion."""
         proc = subprocess.Popen(
             [str(self.command_path)] + converter_args,
             stdin=subprocess.PIPE,
@@ -528,6 +1329,77 @@ class CliConverter:
 
             return [json.loads(line) for line in stdout.splitlines() if line.strip()]
 
+    def _convert_persistent(self, converter_args: List[str], args) -> str:
+        """Send a conversion request to the running converter program."""
+        request = json.dumps({"args": converter_args, "values": list(args)})
+
+        # Restart once if the converter has exited
+        for attempt in range(2):
+            proc = self.proc
+            if (proc is None) or (proc.poll() is not None):
+                _LOGGER.debug("Starting converter %s", self.name)
+                proc = subprocess.Popen(
+                    [str(self.command_path)],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    bufsize=0,
+                )
+                self.proc = proc
+                self.stdout_buffer = bytearray()
+
+            assert proc.stdin is not None
+            try:
+                proc.stdin.write(request.encode() + b"\n")
+                response = self._read_response()
+                if response is None:
+                    _LOGGER.warning(
+                        "Converter %s did not reply within %s second(s)",
+                        self.name,
+                        self.timeout,
+                    )
+                    proc.kill()
+                    self.proc = None
+
+                    return json.dumps(self._convert_once(converter_args, args))
+
+                if response.strip():
+                    # Validate before caching
+                    return json.dumps(json.loads(response))
+            except (BrokenPipeError, ValueError):
+                if attempt > 0:
+                    raise
+
+            proc.kill()
+            self.proc = None
+
+        raise RuntimeError(f"No response from converter {self.name}")
+
+    def _read_response(self) -> Optional[str]:
+        """Read one line from the running converter.
+
+        Returns None on timeout and an empty string if the converter exited.
+        """
+        assert (self.proc is not None) and (self.proc.stdout is not None)
+        deadline = time.monotonic() + self.timeout
+        stdout_fd = self.proc.stdout.fileno()
+
+        while b"\n" not in self.stdout_buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+
+            ready, _, _ = select.select([stdout_fd], [], [], remaining)
+            if ready:
+                chunk = os.read(stdout_fd, 4096)
+                if not chunk:
+                    # Converter exited
+                    return ""
+
+                self.stdout_buffer.extend(chunk)
+
+        line, _, self.stdout_buffer = self.stdout_buffer.partition(b"\n")
+        return line.decode()
+
 
 def load_converters(profile) -> Dict[str, Any]:
     # Load user-defined converters
@@ -537,6 +1409,11 @@ def load_converters(profile) -> Dict[str, Any]:
         profile.read_path(profile.get("intent.fsticuffs.converters_dir", "converters"))
     )
 
+    # true for all converters or a list of converter names
+    persistent = profile.get("intent.fsticuffs.converters_persistent", False)
+    cache_size = int(profile.get("intent.fsticuffs.converters_cache_size", 0))
+    timeout = float(profile.get("intent.fsticuffs.converters_timeout", 10))
+
     if converters_dir.is_dir():
         _LOGGER.debug("Loading converters from %s", converters_dir)
         for converter_path in converters_dir.glob("**/*"):
@@ -551,7 +1428,14 @@ def load_converters(profile) -> Dict[str, Any]:
             # Run converter as external program.
             # Input arguments are encoded as JSON on individual lines.
             # Output values should be encoded as JSON on individual lines.
-            converter = CliConverter(converter_name, converter_path)
+            converter = CliConverter(
+                converter_name,
+                converter_path,
+                persistent=(persistent is True)
+                or (isinstance(persistent, list) and (converter_name in persistent)),
+                cache_size=cache_size,
+                timeout=timeout,
+            )
 
             # Key off name without file extension
             converters[converter_name] = converter
@@ -559,3 +1443,10 @@ def load_converters(profile) -> Dict[str, Any]:
             _LOGGER.debug("Loaded converter %s from %s", converter_name, converter_path)
 
     return converters
+
+
+def close_converters(converters: Dict[str, Any]) -> None:
+    """Stop any persistent converter processes."""
+    for converter in converters.values():
+        if isinstance(converter, CliConverter):
+            converter.close()
@@ -1,4 +1,6 @@
 """Wake word support."""
+import audioop
+import concurrent.futures
 import json
 import os
 import re
@@ -6,15 +8,16 @@ import shutil
 import struct
 import subprocess
 import threading
-import time
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Type
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Type
 
-from rhasspy.actor import RhasspyActor
+from rhasspy.actor import ConfigureEvent, Configured, RhasspyActor, StateTransition
 from rhasspy.events import (
     AudioData,
     ListenForWakeWord,
     MqttMessage,
+    MqttPublish,
     MqttSubscribe,
     PauseListeningForWakeWord,
     ResumeListeningForWakeWord,
@@ -26,11 +29,18 @@ from rhasspy.events import (
 )
 from rhasspy.utils import read_dict
 
+# Wake systems that detect wake words from AudioData
+LOCAL_WAKE_SYSTEMS = ["pocketsphinx", "snowboy", "precise", "porcupine"]
+
 # -----------------------------------------------------------------------------
 
 
-def get_wake_class(system: str) -> Type[RhasspyActor]:
+def get_wake_class(system: str, multi_site: bool = False) -> Type[RhasspyActor]:
     """Get type for profile wake system."""
+    if multi_site and (system in LOCAL_WAKE_SYSTEMS):
+        # One detector per site id
+        return MultiSiteWakeListener
+
     assert system in [
         "dummy",
         "pocketsphinx",
@@ -67,6 +77,164 @@ def get_wake_class(system: str) -> Type[RhasspyActor]:
 # -----------------------------------------------------------------------------
 
 
+class SilenceGate:
+    """Cheap pre-filter that only passes audio chunks with acoustic activity.
+
+    Systems are "energy" (RMS threshold), "zcr" (RMS, or a lower RMS floor
+    with a high zero-crossing rate to catch quiet fricatives), and
+    "webrtcvad". The gate stays open for
+    hangover_sec after the last active chunk, and replays up to preroll_sec
+    of audio from before it opened so the wake word onset is not lost.
+    """
+
+    def __init__(
+        self,
+        system: str = "energy",
+        energy_threshold: float = 300,
+        zcr_threshold: float = 0.3,
+        zcr_energy_ratio: float = 0.25,
+        vad_mode: int = 3,
+        hangover_sec: float = 1.0,
+        preroll_sec: float = 0.5,
+        sample_rate: int = 16000,
+        sample_width: int = 2,
+    ) -> None:
+        self.system = system
+        self.energy_threshold = energy_threshold
+        self.zcr_threshold = zcr_threshold
+        self.zcr_energy_ratio = zcr_energy_ratio
+        self.hangover_sec = hangover_sec
+        self.preroll_sec = preroll_sec
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+
+        self.is_open = False
+        self.hangover_left = 0.0
+        self.preroll: Deque[bytes] = deque()
+        self.preroll_bytes = 0
+        self.max_preroll_bytes = int(preroll_sec * sample_rate * sample_width)
+
+        self.vad: Any = None
+        if self.system == "webrtcvad":
+            import webrtcvad
+
+            self.vad = webrtcvad.Vad()
+            self.vad.set_mode(vad_mode)
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> Optional["SilenceGate"]:
+        """Create gate from profile settings (None if disabled)."""
+        system = settings.get("system", "none")
+        if system in ["", "none"]:
+            return None
+
+        assert system in [
+            "energy",
+            "zcr",
+            "webrtcvad",
+        ], f"Invalid gate system: {system}"
+
+        return cls(
+            system=system,
+            energy_threshold=float(settings.get("energy_threshold", 300)),
+            zcr_threshold=float(settings.get("zcr_threshold", 0.3)),
+            zcr_energy_ratio=float(settings.get("zcr_energy_ratio", 0.25)),
+            vad_mode=int(settings.get("vad_mode", 3)),
+            hangover_sec=float(settings.get("hangover_sec", 1.0)),
+            preroll_sec=float(settings.get("preroll_sec", 0.5)),
+        )
+
+    def process(self, chunk: bytes) -> List[bytes]:
+        """Get chunks that should be passed on to the wake word model."""
+        chunk_sec = len(chunk) / (self.sample_rate * self.sample_width)
+        was_open = self.is_open
+
+        if self.is_active(chunk):
+            self.is_open = True
+            self.hangover_left = self.hangover_sec
+        elif self.is_open:
+            self.hangover_left -= chunk_sec
+            if self.hangover_left < 0:
+                self.is_open = False
+
+        if self.is_open:
+            if was_open or (not self.preroll):
+                return [chunk]
+
+            # Replay audio from just before activity started
+            chunks = list(self.preroll)
+            chunks.append(chunk)
+            self.preroll.clear()
+            self.preroll_bytes = 0
+
+            return chunks
+
+        # Closed: remember recent audio
+        if self.max_preroll_bytes > 0:
+            self.preroll.append(chunk)
+            self.preroll_bytes += len(chunk)
+            while self.preroll and (
+                (self.preroll_bytes - len(self.preroll[0])) >= self.max_preroll_bytes
+            ):
+                self.preroll_bytes -= len(self.preroll.popleft())
+
+        return []
+
+    def reset(self) -> None:
+        """Close gate and forget pre-roll audio."""
+        self.is_open = False
+        self.hangover_left = 0.0
+        self.preroll.clear()
+        self.preroll_bytes = 0
+
+    def is_active(self, chunk: bytes) -> bool:
+        """True if chunk likely contains sound worth processing."""
+        if self.vad is not None:
+            return self._is_speech(chunk)
+
+        rms = audioop.rms(chunk, self.sample_width)
+        if rms >= self.energy_threshold:
+            return True
+
+        if self.system == "zcr":
+            # Low-level hiss also has a high zero-crossing rate
+            if rms < (self.energy_threshold * self.zcr_energy_ratio):
+                return False
+
+            num_samples = len(chunk) // self.sample_width
+            if num_samples > 0:
+                zcr = audioop.cross(chunk, self.sample_width) / num_samples
+                return zcr >= self.zcr_threshold
+
+        return False
+
+    def _is_speech(self, chunk: bytes) -> bool:
+        # webrtcvad only accepts 10, 20, or 30 ms frames
+        bytes_per_ms = (self.sample_rate * self.sample_width) // 1000
+        for frame_ms in [30, 20, 10]:
+            frame_size = frame_ms * bytes_per_ms
+            if len(chunk) >= frame_size:
+                for offset in range(0, len(chunk) - frame_size + 1, frame_size):
+                    frame = chunk[offset : offset + frame_size]
+                    if self.vad.is_speech(frame, self.sample_rate):
+                        return True
+
+                return False
+
+        # Too short to judge
+        return True
+
+
+def get_wake_gate(profile: Any, system: str) -> Optional[SilenceGate]:
+    """Create silence gate for a wake system from wake.gate and wake.<system>.gate."""
+    settings = dict(profile.get("wake.gate", {}))
+    settings.update(profile.get(f"wake.{system}.gate", {}))
+    return SilenceGate.from_settings(settings)
+
+
+# -----------------------------------------------------------------------------
+
+
 class DummyWakeListener(RhasspyActor):
     """Does nothing"""
 
@@ -93,6 +261,9 @@ class PocketsphinxWakeListener(RhasspyActor):
         self.recorder: Optional[RhasspyActor] = None
         self.threshold = 0.0
         self.keyphrase = ""
+        self.gate: Optional[SilenceGate] = None
+        self.hyp_interval = 1
+        self.chunks_since_hyp = 0
 
     def to_started(self, from_state: str) -> None:
         """Transition to started state."""
@@ -100,6 +271,10 @@ class PocketsphinxWakeListener(RhasspyActor):
         self.preload = self.config.get("preload", False)
         self.not_detected = self.config.get("not_detected", False)
         self.chunk_size = self.profile.get("wake.pocketsphinx.chunk_size", 960)
+        self.hyp_interval = max(
+            1, int(self.profile.get("wake.pocketsphinx.hyp_interval", 1))
+        )
+        self.gate = get_wake_gate(self.profile, "pocketsphinx")
         if self.preload:
             with self._lock:
                 try:
@@ -122,18 +297,27 @@ class PocketsphinxWakeListener(RhasspyActor):
     def in_listening(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in listening state."""
         if isinstance(message, AudioData):
-            if not self.decoder_started:
-                assert self.decoder is not None
-                self.decoder.start_utt()
-                self.decoder_started = True
-
-            audio_data = message.data
-            chunk = audio_data[: self.chunk_size]
             detected = False
-            while chunk:
-                result = self.process_data(chunk)
-                if result is not None:
-                    detected = True
+            audio_view = memoryview(message.data)
+            for offset in range(0, len(audio_view), self.chunk_size):
+                chunk = audio_view[offset : offset + self.chunk_size].tobytes()
+                if self.gate is None:
+                    chunks = [chunk]
+                else:
+                    # Skip keyword search during silence
+                    chunks = self.gate.process(chunk)
+                    if not self.gate.is_open and self.decoder_started:
+                        # Check final hypothesis and start fresh next time
+                        hyp = self.process_data(bytes(), force_hyp=True)
+                        detected = hyp is not None
+                        self.end_utterance()
+
+                for gated_chunk in chunks:
+                    if self.process_data(gated_chunk) is not None:
+                        detected = True
+                        break
+
+                if detected:
                     self._logger.debug("Hotword detected (%s)", self.keyphrase)
                     detected_msg = WakeWordDetected(
                         self.keyphrase, audio_data_info=message.info
@@ -143,14 +327,9 @@ class PocketsphinxWakeListener(RhasspyActor):
 
                     break
 
-                audio_data = audio_data[self.chunk_size :]
-                chunk = audio_data[: self.chunk_size]
-
             # End utterance
-            if detected and self.decoder_started:
-                assert self.decoder is not None
-                self.decoder.end_utt()
-                self.decoder_started = False
+            if detected:
+                self.end_utterance()
 
             if not detected and self.not_detected:
                 # Report non-detection
@@ -170,10 +349,9 @@ class PocketsphinxWakeListener(RhasspyActor):
 
             if not self.receivers:
                 # End utterance
-                if self.decoder_started:
-                    assert self.decoder is not None
-                    self.decoder.end_utt()
-                    self.decoder_started = False
+                self.end_utterance()
+                if self.gate is not None:
+                    self.gate.reset()
 
                 if message.record:
                     self.send(self.recorder, StopStreaming(self.myAddress))
@@ -189,20 +367,40 @@ class PocketsphinxWakeListener(RhasspyActor):
 
     # -------------------------------------------------------------------------
 
-    def process_data(self, data: bytes) -> Optional[str]:
-        """Process single chunk of audio."""
+    def process_data(self, data: bytes, force_hyp: bool = False) -> Optional[str]:
+        """Process single chunk of audio.
+
+        The keyword hypothesis is only checked every hyp_interval chunks
+        (or when force_hyp is True).
+        """
         assert self.decoder is not None
-        self.decoder.process_raw(data, False, False)
+        if not self.decoder_started:
+            self.decoder.start_utt()
+            self.decoder_started = True
+            self.chunks_since_hyp = 0
+
+        if data:
+            self.decoder.process_raw(data, False, False)
+            self.chunks_since_hyp += 1
+
+        if (not force_hyp) and (self.chunks_since_hyp < self.hyp_interval):
+            return None
+
+        self.chunks_since_hyp = 0
         hyp = self.decoder.hyp()
         if hyp:
-            if self.decoder_started:
-                self.decoder.end_utt()
-                self.decoder_started = False
-
+            self.end_utterance()
             return hyp.hypstr
 
         return None
 
+    def end_utterance(self) -> None:
+        """End current decoder utterance (if started)."""
+        if self.decoder_started:
+            assert self.decoder is not None
+            self.decoder.end_utt()
+            self.decoder_started = False
+
     # -------------------------------------------------------------------------
 
     def load_decoder(self) -> None:
@@ -289,6 +487,14 @@ class SnowboyWakeListener(RhasspyActor):
         self.models: Dict[str, Any] = {}
         self.model_names: List[str] = []
         self.single_detection: bool = True
+        self.gate: Optional[SilenceGate] = None
+
+        # sequential, parallel, or shared
+        self.detection = "sequential"
+        self.executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+        # Number of hotwords in each model (shared detector only)
+        self.hotword_counts: List[int] = []
 
     def to_started(self, from_state: str) -> None:
         """Transition to started state."""
@@ -297,6 +503,8 @@ class SnowboyWakeListener(RhasspyActor):
         self.not_detected = self.config.get("not_detected", False)
         self.chunk_size = self.profile.get("wake.snowboy.chunk_size", 960)
         self.single_detection = self.profile.get("wake.snowboy.single_detection", True)
+        self.detection = self.profile.get("wake.snowboy.detection", "sequential")
+        self.gate = get_wake_gate(self.profile, "snowboy")
 
         if self.preload:
             try:
@@ -321,22 +529,31 @@ class SnowboyWakeListener(RhasspyActor):
     def in_listening(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in listening state."""
         if isinstance(message, AudioData):
-            audio_data = message.data
-            chunk = audio_data[: self.chunk_size]
+            audio_view = memoryview(message.data)
             detected = []
-            while chunk:
-                for detector_index, result_index in enumerate(self.process_data(chunk)):
-                    if result_index > 0:
-                        detected.append(detector_index)
+            for offset in range(0, len(audio_view), self.chunk_size):
+                chunk = audio_view[offset : offset + self.chunk_size].tobytes()
+                if self.gate is None:
+                    chunks = [chunk]
+                else:
+                    # Skip detection during silence
+                    chunks = self.gate.process(chunk)
+
+                for gated_chunk in chunks:
+                    for model_index, result_index in enumerate(
+                        self.process_data(gated_chunk)
+                    ):
+                        if result_index > 0:
+                            detected.append(model_index)
+
+                    if detected:
+                        break
 
                 if detected:
                     # Don't process the rest of the audio data if hotword has
                     # already been detected.
                     break
 
-                audio_data = audio_data[self.chunk_size :]
-                chunk = audio_data[: self.chunk_size]
-
             # Handle results
             if detected:
                 # Detected
@@ -374,6 +591,10 @@ class SnowboyWakeListener(RhasspyActor):
             if not self.receivers:
                 if message.record:
                     self.send(self.recorder, StopStreaming(self.myAddress))
+
+                if self.gate is not None:
+                    self.gate.reset()
+
                 self.transition("loaded")
         elif isinstance(message, PauseListeningForWakeWord):
             self.transition("paused")
@@ -383,23 +604,55 @@ class SnowboyWakeListener(RhasspyActor):
         if isinstance(message, ResumeListeningForWakeWord):
             self.transition("listening")
 
+    def to_stopped(self, from_state: str) -> None:
+        """Transition to stopped state."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
     # -------------------------------------------------------------------------
 
-    def process_data(self, data: bytes) -> Iterable[int]:
-        """Process single chunk of audio data."""
+    def process_data(self, data: bytes) -> List[int]:
+        """Process single chunk of audio data. Returns one result per model."""
         try:
-            for detector in self.detectors:
-                # Return is:
-                # -2 silence
-                # -1 error
-                #  0 voice
-                #  n index n-1
-                yield detector.RunDetection(data)
+            # Return is:
+            # -2 silence
+            # -1 error
+            #  0 voice
+            #  n index n-1
+            if self.hotword_counts:
+                return self._split_shared_result(self.detectors[0].RunDetection(data))
+
+            if self.executor is not None:
+                # Native detectors run concurrently
+                return list(
+                    self.executor.map(
+                        lambda detector: detector.RunDetection(data), self.detectors
+                    )
+                )
+
+            return [detector.RunDetection(data) for detector in self.detectors]
         except Exception:
             self._logger.exception("process_data")
 
         # All silences
-        return [-2] * len(self.detectors)
+        return [-2] * len(self.model_names)
+
+    def _split_shared_result(self, result: int) -> List[int]:
+        """Map result of shared detector back to individual models."""
+        if result <= 0:
+            return [result] * len(self.hotword_counts)
+
+        # Hotword indexes are numbered consecutively across models
+        model_results = [0] * len(self.hotword_counts)
+        for model_index, num_hotwords in enumerate(self.hotword_counts):
+            if result <= num_hotwords:
+                model_results[model_index] = result
+                break
+
+            result -= num_hotwords
+
+        return model_results
 
     # -------------------------------------------------------------------------
 
@@ -412,6 +665,10 @@ class SnowboyWakeListener(RhasspyActor):
             self.models = self._parse_models()
             self.model_names = sorted(self.models)
 
+            if (self.detection == "shared") and (len(self.model_names) > 1):
+                self._load_shared_detector()
+                return
+
             # Create snowboy detectors
             for model_name in self.model_names:
                 model_settings = self.models[model_name]
@@ -432,6 +689,54 @@ class SnowboyWakeListener(RhasspyActor):
                     "Loaded snowboy model %s (%s)", model_name, model_settings
                 )
 
+            if (self.detection == "parallel") and (len(self.detectors) > 1):
+                self.executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=len(self.detectors)
+                )
+
+    def _load_shared_detector(self) -> None:
+        """Load all snowboy models into a single detector."""
+        from snowboy import snowboydetect, snowboydecoder
+
+        model_paths: List[str] = []
+        sensitivities: List[str] = []
+        self.hotword_counts = []
+
+        for model_name in self.model_names:
+            model_path = Path(self.profile.read_path(model_name))
+            assert model_path.is_file(), f"Missing {model_path}"
+            model_paths.append(str(model_path))
+
+            # Sensitivities are given per hotword, so models with multiple
+            # embedded hotwords have comma-separated values.
+            model_sensitivities = [
+                s.strip()
+                for s in str(self.models[model_name]["sensitivity"]).split(",")
+            ]
+            sensitivities.extend(model_sensitivities)
+            self.hotword_counts.append(len(model_sensitivities))
+
+        # Audio gain and frontend apply to all models
+        first_settings = self.models[self.model_names[0]]
+        self._logger.debug("Loading shared snowboy detector for %s", model_paths)
+
+        detector = snowboydetect.SnowboyDetect(
+            snowboydecoder.RESOURCE_FILE.encode(), ",".join(model_paths).encode()
+        )
+
+        detector.SetSensitivity(",".join(sensitivities).encode())
+        detector.SetAudioGain(float(first_settings["audio_gain"]))
+        detector.ApplyFrontend(bool(first_settings["apply_frontend"]))
+
+        assert detector.NumHotwords() == sum(
+            self.hotword_counts
+        ), "Number of sensitivities does not match number of hotwords"
+
+        self.detectors.append(detector)
+        self._logger.debug(
+            "Loaded shared snowboy detector (%s hotword(s))", sum(self.hotword_counts)
+        )
+
     # -------------------------------------------------------------------------
 
     def _parse_models(self) -> Dict[str, Dict[str, Any]]:
@@ -512,22 +817,31 @@ class PreciseWakeListener(RhasspyActor):
         from precise_runner import ReadWriteStream
 
         RhasspyActor.__init__(self)
-        self.audio_buffer: bytes = bytes()
+        self.audio_buffer = bytearray()
         self.audio_info: Dict[Any, Any] = {}
-        self.chunk_delay = 0
         self.chunk_size = 2048
-        self.detected: bool = False
+        self.max_pending_chunks = 16
         self.engine = None
         self.engine_path = ""
         self.model_name = ""
         self.model_path = ""
-        self.prediction_sem = threading.Semaphore()
         self.preload = False
         self.receivers: List[RhasspyActor] = []
         self.recorder: Optional[RhasspyActor] = None
         self.runner = None
+        self.trigger = None
+        self.sensitivity = 0.5
+        self.trigger_level = 3
         self.send_not_detected = False
         self.stream: Optional[ReadWriteStream] = None
+        self.gate: Optional[SilenceGate] = None
+
+        # [chunks without prediction, audio info, detected] for each AudioData
+        self.pending: Deque[List[Any]] = deque()
+        self.num_pending_chunks = 0
+
+        # Predictions still to come for chunks from a previous listening session
+        self.num_stale_predictions = 0
 
     def to_started(self, from_state: str) -> None:
         """Transition to started state."""
@@ -535,7 +849,10 @@ class PreciseWakeListener(RhasspyActor):
         self.preload = self.config.get("preload", False)
         self.send_not_detected = self.config.get("not_detected", False)
         self.chunk_size = self.profile.get("wake.precise.chunk_size", 2048)
-        self.chunk_delay = self.profile.get("wake.precise.chunk_delay", 0)
+        self.max_pending_chunks = self.profile.get(
+            "wake.precise.max_pending_chunks", 16
+        )
+        self.gate = get_wake_gate(self.profile, "precise")
 
         if self.preload:
             try:
@@ -556,40 +873,41 @@ class PreciseWakeListener(RhasspyActor):
                     self.send(self.recorder, StartStreaming(self.myAddress))
             except Exception:
                 self._logger.exception("in_loaded")
+        elif isinstance(message, float):
+            # Prediction for audio sent before listening stopped
+            self.num_stale_predictions = max(0, self.num_stale_predictions - 1)
 
     def in_listening(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in listening state."""
         try:
             if isinstance(message, AudioData):
                 self.audio_info = message.info
-                self.detected = False
-                self.audio_buffer += message.data
-                num_chunks = len(self.audio_buffer) // self.chunk_size
 
+                if self.gate is None:
+                    self.audio_buffer += message.data
+                else:
+                    # Skip model during silence
+                    gated_data = b"".join(self.gate.process(message.data))
+                    if (not gated_data) and self.send_not_detected:
+                        not_detected_event = WakeWordNotDetected(
+                            self.model_name, audio_data_info=message.info
+                        )
+                        for receiver in self.receivers:
+                            self.send(receiver, not_detected_event)
+
+                    self.audio_buffer += gated_data
+
+                num_chunks = self.write_chunks()
                 if num_chunks > 0:
-                    assert self.stream is not None
-                    self.prediction_sem = threading.Semaphore()
-                    for _ in range(num_chunks):
-                        chunk = self.audio_buffer[: self.chunk_size]
-                        if chunk:
-                            self.stream.write(chunk)
-
-                        self.audio_buffer = self.audio_buffer[self.chunk_size :]
-
-                    if self.send_not_detected:
-                        # Wait for all chunks to finish processing
-                        for _ in range(num_chunks):
-                            self.prediction_sem.acquire(timeout=0.1)
-
-                        # Wait a little bit for the precise engine to finish processing
-                        time.sleep(self.chunk_delay)
-                        if not self.detected:
-                            # Not detected
-                            not_detected_event = WakeWordNotDetected(
-                                self.model_name, audio_data_info=message.info
-                            )
-                            for receiver in self.receivers:
-                                self.send(receiver, not_detected_event)
+                    # Predictions arrive later as messages
+                    self.pending.append([num_chunks, message.info, False])
+            elif isinstance(message, float):
+                if self.num_stale_predictions > 0:
+                    # Prediction for audio from a previous session
+                    self.num_stale_predictions -= 1
+                else:
+                    # Prediction from Precise engine
+                    self.handle_prediction(message)
             elif isinstance(message, StopListeningForWakeWord):
                 if message.clear_all:
                     self.receivers.clear()
@@ -602,16 +920,11 @@ class PreciseWakeListener(RhasspyActor):
                 if not self.receivers:
                     if message.record:
                         self.send(self.recorder, StopStreaming(self.myAddress))
+
+                    self.end_session()
                     self.transition("loaded")
-            elif isinstance(message, str):
-                # Detected
-                self._logger.debug("Hotword detected (%s)", self.model_name)
-                detected_event = WakeWordDetected(
-                    self.model_name, audio_data_info=self.audio_info
-                )
-                for receiver in self.receivers:
-                    self.send(receiver, detected_event)
             elif isinstance(message, PauseListeningForWakeWord):
+                self.end_session()
                 self.transition("paused")
         except Exception:
             self._logger.exception("in_listening")
@@ -620,6 +933,9 @@ class PreciseWakeListener(RhasspyActor):
         """Handle messages in paused state."""
         if isinstance(message, ResumeListeningForWakeWord):
             self.transition("listening")
+        elif isinstance(message, float):
+            # Prediction for audio sent before pausing
+            self.num_stale_predictions = max(0, self.num_stale_predictions - 1)
 
     def to_stopped(self, from_state: str) -> None:
         """Transition to stopped state."""
@@ -630,6 +946,95 @@ class PreciseWakeListener(RhasspyActor):
 
     # -------------------------------------------------------------------------
 
+    def write_chunks(self) -> int:
+        """Write complete chunks from audio buffer to Precise (returns count)."""
+        assert self.stream is not None
+        num_chunks = len(self.audio_buffer) // self.chunk_size
+        if num_chunks < 1:
+            return 0
+
+        num_written = 0
+        buffer_view = memoryview(self.audio_buffer)
+        for chunk_index in range(num_chunks):
+            if self.num_pending_chunks >= self.max_pending_chunks:
+                # Engine is behind; drop audio instead of falling further behind
+                self._logger.debug("Dropping %s chunk(s)", num_chunks - chunk_index)
+                break
+
+            offset = chunk_index * self.chunk_size
+            self.stream.write(bytes(buffer_view[offset : offset + self.chunk_size]))
+            self.num_pending_chunks += 1
+            num_written += 1
+
+        buffer_view.release()
+
+        # Keep only the partial chunk at the end
+        del self.audio_buffer[: num_chunks * self.chunk_size]
+
+        return num_written
+
+    def handle_prediction(self, prob: float) -> None:
+        """Update trigger with a single prediction and report detections."""
+        assert self.trigger is not None
+        self.num_pending_chunks = max(0, self.num_pending_chunks - 1)
+        activated = self.trigger.update(prob)
+
+        if self.pending:
+            pending_audio = self.pending[0]
+            audio_info = pending_audio[1]
+        else:
+            pending_audio = None
+            audio_info = self.audio_info
+
+        if activated:
+            # Detected
+            self._logger.debug("Hotword detected (%s)", self.model_name)
+            detected_event = WakeWordDetected(
+                self.model_name, audio_data_info=audio_info
+            )
+            for receiver in self.receivers:
+                self.send(receiver, detected_event)
+
+        if pending_audio is not None:
+            pending_audio[2] = pending_audio[2] or activated
+            pending_audio[0] -= 1
+            if pending_audio[0] <= 0:
+                # All chunks from this audio have been predicted
+                self.pending.popleft()
+                if self.send_not_detected and (not pending_audio[2]):
+                    not_detected_event = WakeWordNotDetected(
+                        self.model_name, audio_data_info=audio_info
+                    )
+                    for receiver in self.receivers:
+                        self.send(receiver, not_detected_event)
+
+    def end_session(self) -> None:
+        """Forget buffered audio and ignore predictions that are still coming."""
+        self.audio_buffer.clear()
+        self.pending.clear()
+
+        # Engine still has to predict chunks that were already written
+        self.num_stale_predictions += self.num_pending_chunks
+        self.num_pending_chunks = 0
+
+        if self.gate is not None:
+            self.gate.reset()
+
+        self.reset_trigger()
+
+    def reset_trigger(self) -> None:
+        """Start activation over so old predictions don't trigger a detection."""
+        # pylint: disable=E0401
+        from precise_runner.runner import TriggerDetector
+
+        self.trigger = TriggerDetector(
+            self.chunk_size,
+            sensitivity=self.sensitivity,
+            trigger_level=self.trigger_level,
+        )
+
+    # -------------------------------------------------------------------------
+
     def load_runner(self) -> None:
         """Load precise runner."""
         if self.engine is None:
@@ -655,20 +1060,21 @@ class PreciseWakeListener(RhasspyActor):
 
             sensitivity = float(self.profile.get("wake.precise.sensitivity", 0.5))
             trigger_level = int(self.profile.get("wake.precise.trigger_level", 3))
+            self.sensitivity = sensitivity
+            self.trigger_level = trigger_level
 
-            def on_prediction(prob: float) -> None:
-                self.prediction_sem.release()
+            # Activation is decided in the actor thread, so it is always
+            # ordered with the predictions for each chunk.
+            self.reset_trigger()
 
-            def on_activation() -> None:
-                self.detected = True
-                self.send(self.myAddress, "activated")
+            def on_prediction(prob: float) -> None:
+                self.send(self.myAddress, float(prob))
 
             self.runner = PreciseRunner(
                 self.engine,
                 stream=self.stream,
                 sensitivity=sensitivity,
                 trigger_level=trigger_level,
-                on_activation=on_activation,
                 on_prediction=on_prediction,
             )
 
@@ -787,6 +1193,162 @@ class HermesWakeListener(RhasspyActor):
             self.transition("listening")
 
 
+# -----------------------------------------------------------------------------
+# Multi-site wake listener
+# -----------------------------------------------------------------------------
+
+
+class MultiSiteWakeListener(RhasspyActor):
+    """Runs a separate local wake listener for each site id.
+
+    Audio from all sites is streamed from the microphone (e.g., Hermes), and
+    routed to the listener for its site. Each listener is its own actor, so
+    sites keep independent detector state and are processed concurrently.
+    """
+
+    def __init__(self) -> None:
+        RhasspyActor.__init__(self)
+        self.receivers: List[RhasspyActor] = []
+        self.recorder: Optional[RhasspyActor] = None
+        self.mqtt: Optional[RhasspyActor] = None
+        self.site_ids: List[str] = []
+        self.wake_system = "dummy"
+        self.wakeword_id = "default"
+        self.publish_detected = False
+
+        # site id -> wake listener
+        self.listeners: Dict[str, RhasspyActor] = {}
+        self.listener_sites: Dict[RhasspyActor, str] = {}
+
+    def to_started(self, from_state: str) -> None:
+        """Transition to started state."""
+        self.recorder = self.config["recorder"]
+        self.mqtt = self.config.get("mqtt")
+        self.site_ids = self.profile.get("mqtt.site_id", "default").split(",")
+        self.wake_system = self.profile.get("wake.system", "dummy")
+        self.wakeword_id = self.profile.get("wake.hermes.wakeword_id", "default")
+        self.publish_detected = self.profile.get("mqtt.enabled", False)
+
+        wake_class = get_wake_class(self.wake_system)
+        listener_config = dict(self.config)
+        listener_config["transitions"] = False
+
+        for site_id in self.site_ids:
+            listener = self.createActor(wake_class)
+            self.listeners[site_id] = listener
+            self.listener_sites[listener] = site_id
+            self.send(listener, ConfigureEvent(self.profile, **listener_config))
+
+        self._logger.debug(
+            "Started %s listener(s) for site(s) %s", self.wake_system, self.site_ids
+        )
+
+        self.transition("loaded")
+
+    def in_loaded(self, message: Any, sender: RhasspyActor) -> None:
+        """Handle messages in loaded state."""
+        if isinstance(message, ListenForWakeWord):
+            self.receivers.append(message.receiver or sender)
+            for listener in self.listeners.values():
+                self.send(listener, ListenForWakeWord(self.myAddress, record=False))
+
+            self.transition("listening")
+            if message.record:
+                self.send(
+                    self.recorder, StartStreaming(self.myAddress, all_sites=True)
+                )
+        else:
+            self.handle_any(message, sender)
+
+    def in_listening(self, message: Any, sender: RhasspyActor) -> None:
+        """Handle messages in listening state."""
+        if isinstance(message, AudioData):
+            site_id = message.info.get("site_id") or self.site_ids[0]
+            listener = self.listeners.get(site_id)
+            if listener is not None:
+                self.send(listener, message)
+        elif isinstance(message, (WakeWordDetected, WakeWordNotDetected)):
+            site_id = self.listener_sites.get(sender, message.site_id)
+            message.site_id = site_id
+
+            if isinstance(message, WakeWordDetected):
+                self._logger.debug("Hotword detected (%s, %s)", message.name, site_id)
+                if self.publish_detected:
+                    self.publish_hotword(message)
+
+            for receiver in self.receivers:
+                self.send(receiver, message)
+        elif isinstance(message, StopListeningForWakeWord):
+            if message.clear_all:
+                self.receivers.clear()
+            else:
+                try:
+                    self.receivers.remove(message.receiver or sender)
+                except ValueError:
+                    pass
+
+            if not self.receivers:
+                for listener in self.listeners.values():
+                    self.send(
+                        listener, StopListeningForWakeWord(self.myAddress, record=False)
+                    )
+
+                if message.record:
+                    self.send(self.recorder, StopStreaming(self.myAddress))
+
+                self.transition("loaded")
+        elif isinstance(message, PauseListeningForWakeWord):
+            for listener in self.listeners.values():
+                self.send(listener, message)
+
+            self.transition("paused")
+        else:
+            self.handle_any(message, sender)
+
+    def in_paused(self, message: Any, sender: RhasspyActor) -> None:
+        """Handle messages in paused state."""
+        if isinstance(message, ResumeListeningForWakeWord):
+            for listener in self.listeners.values():
+                self.send(listener, message)
+
+            self.transition("listening")
+        else:
+            self.handle_any(message, sender)
+
+    def handle_any(self, message: Any, sender: RhasspyActor) -> None:
+        """Handle messages from wake listeners in any state."""
+        if isinstance(message, Configured):
+            if message.problems:
+                self._logger.warning(
+                    "Problems with %s for site %s: %s",
+                    message.name,
+                    self.listener_sites.get(sender, ""),
+                    message.problems,
+                )
+        elif not isinstance(message, StateTransition):
+            self._logger.debug("Unhandled message in %s: %s", self._state, message)
+
+    # -------------------------------------------------------------------------
+
+    def publish_hotword(self, message: WakeWordDetected) -> None:
+        """Publish detection using Hermes protocol."""
+        topic = f"hermes/hotword/{self.wakeword_id}/detected"
+        payload = json.dumps(
+            {"siteId": message.site_id, "modelId": message.name}
+        ).encode()
+        self.send(self.mqtt, MqttPublish(topic, payload))
+
+    def get_problems(self) -> Dict[str, Any]:
+        """Get problems at startup."""
+        problems: Dict[str, Any] = {}
+        if self.wake_system not in LOCAL_WAKE_SYSTEMS:
+            problems[
+                "Not a local wake system"
+            ] = f"Multi-site wake listening does not work with {self.wake_system}"
+
+        return problems
+
+
 # -----------------------------------------------------------------------------
 # Porcupine Wake Listener
 # https://github.com/Picovoice/Porcupine
@@ -810,10 +1372,12 @@ class PorcupineWakeListener(RhasspyActor):
         self.recorder: Optional[RhasspyActor] = None
         self.sensitivities = []
         self.wake_proc = None
+        self.gate: Optional[SilenceGate] = None
 
     def to_started(self, from_state: str) -> None:
         """Transition to started state."""
         self.recorder = self.config["recorder"]
+        self.gate = get_wake_gate(self.profile, "porcupine")
         self.library_path = self.profile.read_path(
             self.profile.get(
                 "wake.porcupine.library_path", "porcupine/libpv_porcupine.so"
@@ -860,7 +1424,12 @@ class PorcupineWakeListener(RhasspyActor):
     def in_listening(self, message: Any, sender: RhasspyActor) -> None:
         """Handle messages in listening state."""
         if isinstance(message, AudioData):
-            self.audio_buffer += message.data
+            if self.gate is None:
+                self.audio_buffer += message.data
+            else:
+                # Skip model during silence
+                self.audio_buffer += b"".join(self.gate.process(message.data))
+
             num_chunks = len(self.audio_buffer) // self.chunk_size
 
             if num_chunks > 0:
@@ -912,6 +1481,9 @@ class PorcupineWakeListener(RhasspyActor):
                     self.handle.delete()
                     self.handle = None
 
+                if self.gate is not None:
+                    self.gate.reset()
+
                 self.transition("started")
         elif isinstance(message, PauseListeningForWakeWord):
             self.transition("paused")
@@ -56,6 +56,8 @@ const profileDefaults = {
         },
         "fuzzywuzzy": {
             "examples_json": "intent_examples.json",
+            "examples_jsonl": "intent_examples.jsonl",
+            "examples_index": "intent_examples.idx",
             "min_confidence": 0.0
         },
         "rasa": {
@@ -107,6 +109,13 @@ const profileDefaults = {
         "password": "",
         "port": 1883,
         "reconnect_sec": 5,
+        "reconnect_max_sec": 60,
+        "qos": 0,
+        "outbox": {
+            "max_messages": 1000,
+            "expire_sec": 30,
+            "path": "mqtt_outbox.jsonl"
+        },
         "site_id": "default",
         "username": "",
         "publish_intents": true,
@@ -1,14 +1,36 @@
 """Tests for Rhasspy."""
 import argparse
+import array
 import asyncio
 import json
 import logging
 import os
+import stat
 import sys
 import tempfile
 import unittest
 
+import networkx as nx
+import pywrapfst as fst
+
 from rhasspy.core import RhasspyCore
+from rhasspy.utils import (
+    ExamplesIndex,
+    _sample_paths,
+    count_paths,
+    get_dictionary_index,
+)
+from rhasspy.g2p import PhonetisaurusG2p
+from rhasspy.mqtt import TopicTrie
+from rhasspy.profiles import Profile
+from rhasspy.train.jsgf2fst.fstaccept import (
+    FstAcceptor,
+    fstaccept,
+    linear_fst,
+    make_slot_acceptor,
+)
+from rhasspy.tts import TtsCache, split_sentence
+from rhasspy.wake import SilenceGate
 
 logging.basicConfig(level=logging.DEBUG)
 loop = asyncio.get_event_loop()
@@ -203,6 +225,711 @@ class RhasspyTestCase(unittest.TestCase):
                 )
 
 
+# -----------------------------------------------------------------------------
+
+
+class DictionaryIndexTestCase(unittest.TestCase):
+    """Tests for memory-mapped dictionary index."""
+
+    def test_lookup(self):
+        """Look up words in index"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dict_path = os.path.join(temp_dir, "base.dict")
+            with open(dict_path, "w") as dict_file:
+                print("hello HH AH L OW", file=dict_file)
+                print("hello(2) HH EH L OW", file=dict_file)
+                print("world W ER L D", file=dict_file)
+                print("<s> SIL", file=dict_file)
+
+            index_dir = os.path.join(temp_dir, "index")
+            with get_dictionary_index(
+                dict_path, index_dir, casing="upper", silence_words=set(["<s>"])
+            ) as index:
+                self.assertEqual(len(index), 3)
+                self.assertEqual(index.lookup("HELLO"), ["HH AH L OW", "HH EH L OW"])
+                self.assertEqual(index.lookup("hello"), [])
+                self.assertIn("<s>", index)
+                self.assertEqual(list(index), ["<s>", "HELLO", "WORLD"])
+                self.assertTrue(index.is_current(dict_path, "upper", set(["<s>"])))
+                self.assertFalse(index.is_current(dict_path, "upper"))
+
+    def test_separate_indexes(self):
+        """Dictionaries with the same name don't share an index"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_dir = os.path.join(temp_dir, "index")
+            dict_paths = []
+            for i, word in enumerate(["first", "second"]):
+                dict_dir = os.path.join(temp_dir, str(i))
+                os.makedirs(dict_dir)
+                dict_path = os.path.join(dict_dir, "base.dict")
+                with open(dict_path, "w") as dict_file:
+                    print(f"{word} F ER S T", file=dict_file)
+
+                dict_paths.append(dict_path)
+
+            with get_dictionary_index(dict_paths[0], index_dir) as index:
+                self.assertIn("first", index)
+
+            with get_dictionary_index(dict_paths[1], index_dir) as index:
+                self.assertIn("second", index)
+                self.assertNotIn("first", index)
+
+            # Old index is removed
+            self.assertEqual(len(os.listdir(index_dir)), 1)
+
+    def test_remove_stale(self):
+        """Indexes for old casing/silence words are removed"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dict_path = os.path.join(temp_dir, "base.dict")
+            with open(dict_path, "w") as dict_file:
+                print("hello HH AH L OW", file=dict_file)
+
+            index_dir = os.path.join(temp_dir, "index")
+            other_path = os.path.join(
+                index_dir, "other.dict.1234abcd.5678abcd.ignore.idx"
+            )
+            os.makedirs(index_dir)
+            with open(other_path, "wb"):
+                pass
+
+            get_dictionary_index(dict_path, index_dir).close()
+            with get_dictionary_index(dict_path, index_dir, casing="upper") as index:
+                self.assertIn("HELLO", index)
+
+            # Other dictionaries are left alone
+            self.assertEqual(len(os.listdir(index_dir)), 2)
+            self.assertTrue(os.path.exists(other_path))
+
+
+# -----------------------------------------------------------------------------
+
+
+class SilenceGateTestCase(unittest.TestCase):
+    """Tests for wake word silence gate."""
+
+    @staticmethod
+    def make_chunk(amplitude: int, num_samples: int = 480) -> bytes:
+        """Make 16-bit chunk that alternates between +/- amplitude (high ZCR)."""
+        samples = [
+            amplitude if (i % 2) == 0 else -amplitude for i in range(num_samples)
+        ]
+        return array.array("h", samples).tobytes()
+
+    def test_energy(self):
+        """Gate opens on loud audio and closes after hangover"""
+        gate = SilenceGate("energy", hangover_sec=0.06, preroll_sec=0.03)
+        silence = bytes(960)
+        loud = self.make_chunk(1000)
+
+        self.assertEqual(gate.process(silence), [])
+        self.assertEqual(gate.process(silence), [])
+
+        # Pre-roll is replayed when gate opens
+        self.assertEqual(gate.process(loud), [silence, loud])
+        self.assertEqual(gate.process(silence), [silence])
+        self.assertEqual(gate.process(silence), [silence])
+        self.assertEqual(gate.process(silence), [])
+
+    def test_zcr(self):
+        """Quiet noisy audio passes in zcr mode only above energy floor"""
+        gate = SilenceGate("zcr", energy_threshold=300, preroll_sec=0)
+
+        # Hiss: high zero-crossing rate, but too quiet
+        self.assertFalse(gate.is_active(self.make_chunk(20)))
+
+        # Fricative: high zero-crossing rate, some energy
+        self.assertTrue(gate.is_active(self.make_chunk(150)))
+
+        # Energy gate ignores zero-crossing rate
+        energy_gate = SilenceGate("energy", energy_threshold=300, preroll_sec=0)
+        self.assertFalse(energy_gate.is_active(self.make_chunk(150)))
+        self.assertTrue(energy_gate.is_active(self.make_chunk(1000)))
+
+
+class PathSamplingTestCase(unittest.TestCase):
+    """Tests for sampling training sentences from an intent graph."""
+
+    @staticmethod
+    def make_graph(num_diamonds: int = 0) -> nx.DiGraph:
+        """Make graph with two intents: A (2 * 2^num_diamonds paths) and B (1 path)."""
+        graph = nx.DiGraph()
+        graph.add_edges_from(
+            [("S", "a"), ("S", "b"), ("a", "c"), ("a", "d"), ("c", "x0"), ("d", "x0")]
+        )
+
+        for i in range(num_diamonds):
+            graph.add_edges_from(
+                [
+                    (f"x{i}", f"l{i}"),
+                    (f"x{i}", f"r{i}"),
+                    (f"l{i}", f"x{i+1}"),
+                    (f"r{i}", f"x{i+1}"),
+                ]
+            )
+
+        graph.add_edges_from([(f"x{num_diamonds}", "E"), ("b", "E")])
+        return graph
+
+    def test_count_paths(self):
+        """Count paths from every node to end node"""
+        graph = self.make_graph(num_diamonds=3)
+        path_counts = count_paths(graph, "E")
+        self.assertEqual(path_counts["E"], 1)
+        self.assertEqual(path_counts["b"], 1)
+        self.assertEqual(path_counts["a"], 16)
+        self.assertEqual(path_counts["S"], 17)
+        self.assertEqual(
+            path_counts["S"], len(list(nx.all_simple_paths(graph, "S", "E")))
+        )
+
+    def test_sample_all(self):
+        """Asking for more samples than paths gives every path once"""
+        graph = self.make_graph(num_diamonds=2)
+        paths = list(_sample_paths(graph, "S", "E", [["a"], ["b"]], num_samples=100))
+        expected = sorted(nx.all_simple_paths(graph, "S", "E"))
+        self.assertEqual(len(paths), 9)
+        self.assertEqual(sorted(paths), expected)
+
+    def test_sample_distinct(self):
+        """Sampled paths are distinct, valid, and grouped by intent"""
+        graph = self.make_graph(num_diamonds=5)
+        all_paths = set(tuple(p) for p in nx.all_simple_paths(graph, "S", "E"))
+        paths = list(_sample_paths(graph, "S", "E", [["a"], ["b"]], num_samples=20))
+        self.assertEqual(len(paths), 20)
+        self.assertEqual(len(set(tuple(p) for p in paths)), 20)
+        self.assertTrue(all(tuple(p) in all_paths for p in paths))
+
+        # Intent A paths come before intent B
+        branches = [p[1] for p in paths]
+        self.assertEqual(branches, sorted(branches))
+
+    def test_samples_per_intent(self):
+        """Each intent gets its own quota"""
+        graph = self.make_graph(num_diamonds=3)
+        paths = list(
+            _sample_paths(graph, "S", "E", [["a"], ["b"]], samples_per_intent=4)
+        )
+        self.assertEqual(sum(1 for p in paths if p[1] == "a"), 4)
+        self.assertEqual(sum(1 for p in paths if p[1] == "b"), 1)
+
+    def test_sample_huge(self):
+        """Path counts beyond sys.maxsize can be sampled"""
+        graph = self.make_graph(num_diamonds=70)
+        self.assertGreater(count_paths(graph, "E")["S"], sys.maxsize)
+
+        for kwargs in [{"num_samples": 10}, {"samples_per_intent": 10}]:
+            paths = list(_sample_paths(graph, "S", "E", [["a"], ["b"]], **kwargs))
+            self.assertEqual(len(set(tuple(p) for p in paths)), len(paths))
+            self.assertGreaterEqual(len(paths), 10)
+
+
+class ExamplesIndexTestCase(unittest.TestCase):
+    """Tests for memory-mapped intent examples index."""
+
+    EXAMPLES = [
+        {"intent": {"name": "LightOn"}, "text": "turn on the light"},
+        {"intent": {"name": "LightOff"}, "text": "turn off the light"},
+        {"intent": {"name": "LightOn"}, "text": "light on", "raw_text": "lights on"},
+    ]
+
+    def write_examples(self, examples_path: str) -> None:
+        """Write examples as JSON lines."""
+        with open(examples_path, "w") as examples_file:
+            for example in self.EXAMPLES:
+                print(json.dumps(example), file=examples_file)
+
+    def test_lookup(self):
+        """Match strings are grouped by intent and point back to examples"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            examples_path = os.path.join(temp_dir, "examples.jsonl")
+            index_path = os.path.join(temp_dir, "examples.idx")
+            self.write_examples(examples_path)
+
+            with ExamplesIndex.build(examples_path, index_path) as index:
+                self.assertEqual(len(index), 3)
+                self.assertEqual(list(index.intents), ["LightOn", "LightOff"])
+                self.assertEqual(
+                    index.get_texts("LightOn"), b"turn on the light\nlights on"
+                )
+                self.assertEqual(index.get_texts("LightOff"), b"turn off the light")
+                self.assertEqual(index.get_example("LightOn", 1), self.EXAMPLES[2])
+                self.assertEqual(index.get_example("LightOff", 0), self.EXAMPLES[1])
+                self.assertTrue(index.is_current())
+
+            # Index doesn't copy the examples
+            with open(index_path, "rb") as index_file:
+                self.assertNotIn(b'"intent"', index_file.read())
+
+    def test_rebuild(self):
+        """Index is rebuilt when examples change"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            examples_path = os.path.join(temp_dir, "examples.jsonl")
+            index_path = os.path.join(temp_dir, "examples.idx")
+            self.write_examples(examples_path)
+            ExamplesIndex.build(examples_path, index_path).close()
+
+            with open(examples_path, "a") as examples_file:
+                print(
+                    json.dumps({"intent": {"name": "LightOff"}, "text": "off"}),
+                    file=examples_file,
+                )
+
+            with ExamplesIndex.open_or_build(examples_path, index_path) as index:
+                self.assertTrue(index.is_current())
+                self.assertEqual(len(index), 4)
+                self.assertEqual(index.get_example("LightOff", 1)["text"], "off")
+
+    def test_missing_examples(self):
+        """Index is not current when its examples file is gone"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            examples_path = os.path.join(temp_dir, "examples.jsonl")
+            index_path = os.path.join(temp_dir, "examples.idx")
+            self.write_examples(examples_path)
+
+            with ExamplesIndex.build(examples_path, index_path) as index:
+                os.remove(examples_path)
+                self.assertFalse(index.is_current())
+
+
+class SplitSentenceTestCase(unittest.TestCase):
+    """Tests for splitting text to speak into segments."""
+
+    def test_split(self):
+        """Split after sentence and clause punctuation"""
+        self.assertEqual(
+            split_sentence("Hello there. How are you? Fine, thanks!"),
+            ["Hello there.", "How are you?", "Fine,", "thanks!"],
+        )
+
+        # No punctuation or extra white space
+        self.assertEqual(split_sentence("  hello world  "), ["hello world"])
+        self.assertEqual(split_sentence("3.14 is pi"), ["3.14 is pi"])
+
+    def test_min_chars(self):
+        """Short segments are joined with the next one or the last one"""
+        self.assertEqual(
+            split_sentence("Yes. It is on. The light in the kitchen.", min_chars=10),
+            ["Yes. It is on.", "The light in the kitchen."],
+        )
+
+        # Short remainder is attached to the previous segment
+        self.assertEqual(
+            split_sentence("The light is on. Ok.", min_chars=10),
+            ["The light is on. Ok."],
+        )
+
+        # Text shorter than min_chars is still spoken
+        self.assertEqual(split_sentence("Ok.", min_chars=10), ["Ok."])
+
+
+class TtsCacheTestCase(unittest.TestCase):
+    """Tests for text to speech WAV cache."""
+
+    def test_key(self):
+        """Keys change with any engine setting"""
+        settings = {"voice": "en", "arguments": ["-s", "80"]}
+        reordered = {"arguments": ["-s", "80"], "voice": "en"}
+        faster = {"voice": "en", "arguments": ["-s", "120"]}
+
+        # Setting order doesn't matter
+        self.assertEqual(
+            TtsCache.get_key("espeak", settings, "en", "en", "hello"),
+            TtsCache.get_key("espeak", reordered, "en", "en", "hello"),
+        )
+
+        keys = [
+            TtsCache.get_key("espeak", settings, "en", "en", "hello"),
+            TtsCache.get_key("espeak", faster, "en", "en", "hello"),
+            TtsCache.get_key("flite", settings, "en", "en", "hello"),
+            TtsCache.get_key("espeak", settings, "de", "en", "hello"),
+            TtsCache.get_key("espeak", settings, "en", "en", "bye"),
+        ]
+        self.assertEqual(len(set(keys)), len(keys))
+
+    def test_evict(self):
+        """Least recently used files are deleted when cache is full"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = TtsCache(temp_dir, max_bytes=20, memory_items=1)
+            cache.put("a", bytes(8))
+            cache.put("b", bytes(8))
+            self.assertEqual(cache.get("a"), bytes(8))
+
+            # "b" is least recently used
+            cache.put("c", bytes(8))
+            self.assertIn("a", cache)
+            self.assertNotIn("b", cache)
+            self.assertEqual(sorted(os.listdir(temp_dir)), ["a.wav", "c.wav"])
+
+            # Files are found again after restart
+            cache = TtsCache(temp_dir, max_bytes=20)
+            self.assertEqual(cache.get("c"), bytes(8))
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+class TopicTrieTestCase(unittest.TestCase):
+    """Tests for MQTT topic filter matching."""
+
+    def test_wildcards(self):
+        """Match + and # wildcards"""
+        trie = TopicTrie()
+        self.assertTrue(trie.add("hermes/hotword/+/detected", "wake"))
+        self.assertTrue(trie.add("hermes/audioServer/#", "audio"))
+        self.assertTrue(trie.add("hermes/intent/LightOn", "intent"))
+        self.assertFalse(trie.add("hermes/intent/LightOn", "handler"))
+
+        self.assertEqual(trie.match("hermes/hotword/default/detected"), ["wake"])
+        self.assertEqual(trie.match("hermes/hotword/detected"), [])
+        self.assertEqual(trie.match("hermes/hotword/a/b/detected"), [])
+
+        # Multi-level wildcard includes parent level
+        self.assertEqual(trie.match("hermes/audioServer"), ["audio"])
+        self.assertEqual(trie.match("hermes/audioServer/default/audioFrame"), ["audio"])
+
+        self.assertEqual(trie.match("hermes/intent/LightOn"), ["intent", "handler"])
+        self.assertEqual(trie.match("hermes/intent/LightOff"), [])
+        self.assertEqual(
+            trie.topic_filters,
+            [
+                "hermes/hotword/+/detected",
+                "hermes/audioServer/#",
+                "hermes/intent/LightOn",
+            ],
+        )
+
+    def test_once_per_receiver(self):
+        """Receivers get each message once, even if several filters match"""
+        trie = TopicTrie()
+        trie.add("#", "all")
+        trie.add("hermes/+/default", "all")
+        trie.add("hermes/tts/+", "tts")
+        self.assertCountEqual(trie.match("hermes/tts/default"), ["all", "tts"])
+
+        # Cached result is replaced when a filter is added
+        trie.add("hermes/tts/default", "exact")
+        self.assertCountEqual(trie.match("hermes/tts/default"), ["all", "tts", "exact"])
+
+    def test_sys_topics(self):
+        """Wildcards at the first level don't match $ topics"""
+        trie = TopicTrie()
+        trie.add("#", "all")
+        trie.add("+/broker/uptime", "uptime")
+        trie.add("$SYS/#", "sys")
+        self.assertEqual(trie.match("$SYS/broker/uptime"), ["sys"])
+        self.assertCountEqual(trie.match("status/broker/uptime"), ["all", "uptime"])
+
+
+class G2pTestCase(unittest.TestCase):
+    """Tests for cached pronunciation guessing."""
+
+    class FakeModel:
+        """Stands in for a loaded Phonetisaurus model."""
+
+        class Result:
+            """Phoneticize result with output symbol ids."""
+
+            def __init__(self, uniques):
+                self.Uniques = uniques
+
+        def __init__(self):
+            self.words = []
+            self.symbols = ["HH", "AH", "L", "OW"]
+
+        def Phoneticize(self, word, nbest, *args):
+            """Guess the same pronunciation(s) for every word."""
+            self.words.append(word)
+            return [self.Result([0, 1, 2, 3]), self.Result([0, 2, 3])][:nbest]
+
+        def FindOsym(self, symbol_id):
+            """Map id to phoneme."""
+            return self.symbols[symbol_id]
+
+    def make_g2p(self, temp_dir: str) -> PhonetisaurusG2p:
+        """Create guesser with a fake model."""
+        model_path = os.path.join(temp_dir, "g2p.fst")
+        if not os.path.exists(model_path):
+            with open(model_path, "w") as model_file:
+                model_file.write("model")
+
+        g2p = PhonetisaurusG2p(
+            model_path, cache_path=os.path.join(temp_dir, "g2p_cache.jsonl")
+        )
+
+        g2p._model = G2pTestCase.FakeModel()
+        return g2p
+
+    def test_cache(self):
+        """Words are only guessed once, even across restarts"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            g2p = self.make_g2p(temp_dir)
+            guesses = g2p.guess(["hello", "Hello"], n=2, casing="upper")
+            self.assertEqual(guesses["hello"], ["HH AH L OW", "HH L OW"])
+            self.assertEqual(guesses["Hello"], guesses["hello"])
+
+            # Casing is applied before guessing
+            self.assertEqual(g2p._model.words, ["HELLO"])
+            self.assertEqual(
+                g2p.guess(["hello"], n=2, casing="upper"), {"hello": guesses["hello"]}
+            )
+            self.assertEqual(g2p._model.words, ["HELLO"])
+            self.assertEqual((g2p.hits, g2p.misses), (1, 2))
+
+            # Different n is a different key
+            self.assertEqual(g2p.guess(["hello"], n=1), {"hello": ["HH AH L OW"]})
+            self.assertEqual(g2p._model.words, ["HELLO", "hello"])
+
+            # Guesses are loaded from disk
+            g2p = self.make_g2p(temp_dir)
+            g2p.guess(["hello", "world"], n=1)
+            self.assertEqual(g2p._model.words, ["world"])
+
+    def test_model_changed(self):
+        """Guesses are dropped when the model changes"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            g2p = self.make_g2p(temp_dir)
+            g2p.guess(["hello"])
+
+            with open(os.path.join(temp_dir, "g2p.fst"), "w") as model_file:
+                model_file.write("new model")
+
+            g2p = self.make_g2p(temp_dir)
+            g2p.guess(["hello"])
+            self.assertEqual(g2p._model.words, ["hello"])
+
+    def test_apply(self):
+        """Fall back to one phonetisaurus-apply per batch without bindings"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            apply_path = os.path.join(temp_dir, "phonetisaurus-apply")
+            with open(apply_path, "w") as apply_file:
+                print("#!/bin/sh", file=apply_file)
+                print('echo "$@" >> "$0.log"', file=apply_file)
+                print('sed -e "s/$/ HH AH L OW/" "$4"', file=apply_file)
+
+            os.chmod(apply_path, os.stat(apply_path).st_mode | stat.S_IEXEC)
+
+            g2p = self.make_g2p(temp_dir)
+            g2p._model = None
+            g2p._native = False
+
+            old_path = os.environ["PATH"]
+            os.environ["PATH"] = temp_dir + os.pathsep + old_path
+            try:
+                guesses = g2p.guess(["hello", "world"])
+                g2p.guess(["hello", "world"])
+            finally:
+                os.environ["PATH"] = old_path
+
+            self.assertEqual(
+                guesses, {"hello": ["HH AH L OW"], "world": ["HH AH L OW"]}
+            )
+
+            with open(apply_path + ".log", "r") as log_file:
+                self.assertEqual(len(log_file.readlines()), 1)
+
+
+class FstAcceptorTestCase(unittest.TestCase):
+    """Tests for recognizing with an indexed intent FST."""
+
+    def make_fst(self) -> fst.Fst:
+        """Create a small intent FST with one tag."""
+        symbols = fst.SymbolTable()
+        for symbol in [
+            "<eps>",
+            "set",
+            "the",
+            "light",
+            "lamp",
+            "to",
+            "red",
+            "blue",
+            "__label__SetColor",
+            "__begin__color",
+            "__end__color",
+        ]:
+            symbols.add_symbol(symbol)
+
+        compiler = fst.Compiler(
+            isymbols=symbols, osymbols=symbols, keep_isymbols=True, keep_osymbols=True
+        )
+
+        for line in [
+            "0 1 <eps> __label__SetColor",
+            "1 2 set set",
+            "2 3 the the",
+            "3 4 light light",
+            "3 4 lamp light",
+            "4 5 to to",
+            "5 6 <eps> __begin__color",
+            "6 7 red red",
+            "6 7 blue blue",
+            "7 8 <eps> __end__color",
+            "8",
+        ]:
+            print(line, file=compiler)
+
+        return compiler.compile()
+
+    def test_accept(self):
+        """Direct walk gives the same intents as compose"""
+        intent_fst = self.make_fst()
+        acceptor = FstAcceptor(intent_fst)
+
+        for sentence in ["set the light to red", "set the lamp to blue"]:
+            intents = fstaccept(acceptor, sentence)
+            self.assertEqual(intents, fstaccept(intent_fst, sentence))
+            self.assertEqual(len(intents), 1)
+            self.assertEqual(intents[0]["intent"]["name"], "SetColor")
+            self.assertEqual(len(intents[0]["entities"]), 1)
+
+        self.assertEqual(intents[0]["text"], "set the light to blue")
+        self.assertEqual(intents[0]["entities"][0]["value"], "blue")
+
+        # Acceptor can be reused
+        self.assertEqual(
+            acceptor.accept(["set", "the", "lamp", "to", "red"]),
+            [
+                [
+                    "__label__SetColor",
+                    "set",
+                    "the",
+                    "light",
+                    "to",
+                    "__begin__color",
+                    "red",
+                    "__end__color",
+                ]
+            ],
+        )
+
+        # Unknown words or incomplete sentences are not accepted
+        self.assertEqual(acceptor.accept(["set", "the", "light", "to", "green"]), [])
+        self.assertEqual(acceptor.accept(["set", "the", "light"]), [])
+        self.assertEqual(fstaccept(acceptor, "set the light to green"), [])
+
+    def test_slot_acceptor(self):
+        """Words outside of slots are matched by a single any-word loop"""
+        slot_fst = make_slot_acceptor(self.make_fst())
+        self_loops = [
+            arc
+            for state in slot_fst.states()
+            for arc in slot_fst.arcs(state)
+            if arc.nextstate == state
+        ]
+        self.assertEqual(len(self_loops), 1)
+
+        # Exactly one path (label state does not get a second loop)
+        words = ["__label__SetColor", "please", "set", "the", "lamp", "to", "red"]
+        self.assertEqual(
+            FstAcceptor(slot_fst).accept(words),
+            [words[:-1] + ["__begin__color", "red", "__end__color"]],
+        )
+
+        # Compose needs one loop per (known) word
+        slot_fst = make_slot_acceptor(self.make_fst(), any_word=None)
+        intents = fstaccept(slot_fst, words[:1] + words[2:])
+        self.assertEqual(len(intents), 1)
+        self.assertEqual(intents[0]["intent"]["name"], "SetColor")
+        self.assertEqual(intents[0]["entities"][0]["value"], "red")
+
+    def test_linear_fst(self):
+        """Linear FST is built directly with the intent FST symbols"""
+        intent_fst = self.make_fst()
+        linear = linear_fst(["set", "the", "light"], intent_fst)
+
+        labels = []
+        state = linear.start()
+        while linear.num_arcs(state) > 0:
+            arc = next(iter(linear.arcs(state)))
+            self.assertEqual(arc.ilabel, arc.olabel)
+            labels.append(intent_fst.input_symbols().find(arc.ilabel).decode())
+            state = arc.nextstate
+
+        self.assertEqual(labels, ["set", "the", "light"])
+        self.assertNotEqual(linear.final(state), fst.Weight.Zero(linear.weight_type()))
+
+        with self.assertRaises(ValueError):
+            linear_fst(["set", "the", "green"], intent_fst)
+
+
+class ProfileCacheTestCase(unittest.TestCase):
+    """Tests for cached profile settings."""
+
+    def make_profile(self, temp_dir: str) -> Profile:
+        """Create profile with defaults and a user profile.json."""
+        system_dir = os.path.join(temp_dir, "system")
+        user_dir = os.path.join(temp_dir, "user")
+        for profiles_dir in [system_dir, user_dir]:
+            os.makedirs(os.path.join(profiles_dir, "test"))
+
+        with open(os.path.join(system_dir, "defaults.json"), "w") as defaults_file:
+            json.dump({"mqtt": {"enabled": False, "port": 1883}}, defaults_file)
+
+        with open(os.path.join(system_dir, "test", "profile.json"), "w") as json_file:
+            json.dump({}, json_file)
+
+        with open(os.path.join(user_dir, "test", "profile.json"), "w") as json_file:
+            json.dump({"mqtt": {"host": "broker"}}, json_file)
+
+        return Profile("test", system_dir, user_dir)
+
+    def test_get(self):
+        """Settings are looked up once, missing settings use the default"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profile = self.make_profile(temp_dir)
+            self.assertEqual(profile.get("mqtt.host"), "broker")
+            self.assertEqual(profile.get("mqtt.port"), 1883)
+
+            # Cached value is returned without walking the JSON again
+            profile.json["mqtt"]["host"] = "other"
+            self.assertEqual(profile.get("mqtt.host"), "broker")
+
+            # Missing settings are cached too, but the default can differ
+            self.assertIsNone(profile.get("mqtt.username"))
+            self.assertEqual(profile.get("mqtt.username", "user"), "user")
+            self.assertEqual(profile.get("mqtt.port.number", 0), 0)
+            self.assertEqual(profile.get("missing.path", [1]), [1])
+
+    def test_set(self):
+        """Setting a value invalidates cached parent and child paths"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profile = self.make_profile(temp_dir)
+            self.assertFalse(profile.get("mqtt.enabled"))
+            self.assertEqual(profile.get("mqtt")["port"], 1883)
+            self.assertIsNone(profile.get("mqtt.password"))
+
+            # Child path changes parent
+            profile.set("mqtt.port", 1884)
+            self.assertEqual(profile.get("mqtt")["port"], 1884)
+
+            # Parent path changes children
+            profile.set("mqtt", {"enabled": True, "password": "secret"})
+            self.assertTrue(profile.get("mqtt.enabled"))
+            self.assertEqual(profile.get("mqtt.password"), "secret")
+            self.assertIsNone(profile.get("mqtt.port"))
+
+    def test_most_read(self):
+        """Reads are only counted when enabled"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profile = self.make_profile(temp_dir)
+            profile.get("mqtt.host")
+            self.assertEqual(profile.most_read(), [])
+
+            profile.count_reads()
+            for _ in range(3):
+                profile.get("mqtt.host")
+
+            profile.get("mqtt.port")
+            profile.get("missing.path", "default")
+            self.assertEqual(profile.most_read(1), [("mqtt.host", 3)])
+            self.assertCountEqual(
+                profile.most_read(),
+                [("mqtt.host", 3), ("mqtt.port", 1), ("missing.path", 1)],
+            )
+
+            profile.count_reads(False)
+            self.assertEqual(profile.most_read(), [])
+
+
 # -----------------------------------------------------------------------------
 
 if __name__ == "__main__":